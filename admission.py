@@ -0,0 +1,267 @@
+import functools
+import json
+import math
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+# -------------------------------------
+# ADMISSION CONTROL
+# -------------------------------------
+# Every expensive route belongs to an endpoint class. A request is admitted only if
+#   1. the caller's session bucket and IP bucket (token buckets) both have a token, and
+#   2. the class is below its concurrency cap in this worker process.
+# Otherwise it is rejected immediately with 429 + Retry-After, before any body parsing,
+# PDF extraction or LLM call. Separate caps per class keep a flood of uploads from
+# taking the worker threads that in-progress interviews need.
+#
+# Buckets live in process memory by default. ADMISSION_DB=/path/to/admission.sqlite
+# shares them between the workers on one host. ADMISSION_CONTROL=0 disables it all
+# (the decorator then returns the view unchanged).
+
+# rate = tokens per second, burst = bucket size, concurrency = in-flight cap per worker
+DEFAULT_LIMITS = {
+    "interview": {"session_rate": 0.5, "session_burst": 5, "ip_rate": 2.0, "ip_burst": 30, "concurrency": 6},
+    "upload": {"session_rate": 0.1, "session_burst": 3, "ip_rate": 0.2, "ip_burst": 10, "concurrency": 2},
+    "feedback": {"session_rate": 0.2, "session_burst": 3, "ip_rate": 1.0, "ip_burst": 15, "concurrency": 3},
+    "retry": {"session_rate": 0.5, "session_burst": 5, "ip_rate": 2.0, "ip_burst": 30, "concurrency": 4},
+    "report": {"session_rate": 1.0, "session_burst": 10, "ip_rate": 2.0, "ip_burst": 30, "concurrency": 4},
+    "bulk": {"session_rate": 0.02, "session_burst": 3, "ip_rate": 0.02, "ip_burst": 5, "concurrency": 1},
+}
+
+BUSY_RETRY_AFTER = 1.0       # seconds suggested when a class is at its concurrency cap
+PRUNE_EVERY = 1000           # bucket takes between sweeps of idle buckets
+
+
+# -------------------------------------
+# TOKEN BUCKET BACKENDS
+# -------------------------------------
+
+def _refill(tokens, updated, now, rate, burst):
+    return min(burst, tokens + (now - updated) * rate)
+
+
+class MemoryBuckets:
+    """Token buckets in process memory"""
+
+    def __init__(self):
+        self._buckets = {}  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def take(self, key, rate, burst, now=None):
+        """Take one token; returns 0 if admitted, else seconds until a token is available"""
+        now = now or time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = _refill(tokens, updated, now, rate, burst)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (1 - tokens) / rate
+            self._takes += 1
+            if self._takes % PRUNE_EVERY == 0:
+                self._prune(now)
+        return wait
+
+    def _prune(self, now, idle=3600):
+        # A bucket idle this long has refilled completely, so forgetting it changes nothing
+        for key in [key for key, (_, updated) in self._buckets.items() if now - updated > idle]:
+            del self._buckets[key]
+
+
+class SqliteBuckets:
+    """Token buckets in a local SQLite file, shared by every worker process on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._takes = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, rate, burst, now=None):
+        now = now or time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens = _refill(row[0], row[1], now, rate, burst) if row else burst
+                if tokens >= 1:
+                    tokens -= 1
+                    wait = 0.0
+                else:
+                    wait = (1 - tokens) / rate
+                conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+                self._takes += 1
+                if self._takes % PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM buckets WHERE updated < ?", (now - 3600,))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return wait
+        except sqlite3.Error as e:
+            # Fail open: a locked or broken limiter must not take the app down
+            print(f"Admission backend error (request admitted): {e}")
+            return 0.0
+
+
+# -------------------------------------
+# CONTROLLER
+# -------------------------------------
+
+class AdmissionController:
+    def __init__(self, limits=None, buckets=None, trust_forwarded=False):
+        self.limits = {name: dict(config) for name, config in DEFAULT_LIMITS.items()}
+        for name, config in (limits or {}).items():
+            self.limits.setdefault(name, dict(DEFAULT_LIMITS["interview"])).update(config)
+        self.buckets = buckets or MemoryBuckets()
+        self.trust_forwarded = trust_forwarded
+        self._inflight = {name: 0 for name in self.limits}
+        self._lock = threading.Lock()
+        self.rejected = {name: 0 for name in self.limits}
+
+    def try_acquire(self, endpoint_class, session_key, ip):
+        """Admit a request: returns 0 on success (release() must follow), else a Retry-After in seconds"""
+        config = self.limits[endpoint_class]
+
+        # Concurrency first: it's the cheapest check and needs no shared state
+        with self._lock:
+            if self._inflight[endpoint_class] >= config["concurrency"]:
+                self.rejected[endpoint_class] += 1
+                return BUSY_RETRY_AFTER
+            self._inflight[endpoint_class] += 1
+
+        wait = 0.0
+        if session_key:
+            wait = self.buckets.take(f"{endpoint_class}:s:{session_key}", config["session_rate"], config["session_burst"])
+        if not wait and ip:
+            wait = self.buckets.take(f"{endpoint_class}:ip:{ip}", config["ip_rate"], config["ip_burst"])
+        if wait:
+            self.release(endpoint_class)
+            with self._lock:
+                self.rejected[endpoint_class] += 1
+        return wait
+
+    def release(self, endpoint_class):
+        with self._lock:
+            self._inflight[endpoint_class] -= 1
+
+    def client_ip(self, request):
+        if self.trust_forwarded:
+            forwarded = request.headers.get("X-Forwarded-For", "")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.remote_addr
+
+    def limit(self, endpoint_class):
+        """Route decorator: 429 + Retry-After unless the request is admitted"""
+        if endpoint_class not in self.limits:
+            raise ValueError(f"Unknown endpoint class '{endpoint_class}'")
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                from flask import request, session
+
+                wait = self.try_acquire(endpoint_class, client_key(session), self.client_ip(request))
+                if wait:
+                    return too_many_requests(wait)
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self.release(endpoint_class)
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {"inflight": self._inflight[name], "rejected": self.rejected[name], **self.limits[name]}
+                for name in self.limits
+            }
+
+
+class DisabledAdmission:
+    """Stand-in when admission control is off: no checks, no wrapping"""
+
+    def limit(self, endpoint_class):
+        return lambda view: view
+
+    def try_acquire(self, endpoint_class, session_key, ip):
+        return 0.0
+
+    def release(self, endpoint_class):
+        pass
+
+    def client_ip(self, request):
+        return request.remote_addr
+
+    def snapshot(self):
+        return {}
+
+
+def client_key(session):
+    """Stable per-browser key kept in the session cookie (survives between interviews)"""
+    key = session.get("client_id")
+    if not key:
+        key = secrets.token_urlsafe(12)
+        session["client_id"] = key
+    return key
+
+
+def retry_after_seconds(wait):
+    return max(1, math.ceil(wait))
+
+
+def too_many_requests(retry_after):
+    from flask import jsonify
+
+    seconds = retry_after_seconds(retry_after)
+    response = jsonify({
+        "error": f"Too many requests - please wait {seconds} second{'s' if seconds != 1 else ''} and try again.",
+        "retry_after": seconds,
+    })
+    response.status_code = 429
+    response.headers["Retry-After"] = str(seconds)
+    return response
+
+
+def load_admission():
+    """Build the controller from ADMISSION_CONTROL / ADMISSION_LIMITS / ADMISSION_DB / ADMISSION_TRUST_FORWARDED"""
+    if os.environ.get("ADMISSION_CONTROL", "1") == "0":
+        return DisabledAdmission()
+
+    limits = {}
+    raw_limits = os.environ.get("ADMISSION_LIMITS")
+    if raw_limits:
+        try:
+            limits = json.loads(raw_limits)
+        except ValueError as e:
+            raise RuntimeError(f"ADMISSION_LIMITS is not valid JSON: {e}")
+
+    db_path = os.environ.get("ADMISSION_DB")
+    buckets = SqliteBuckets(db_path) if db_path else MemoryBuckets()
+    return AdmissionController(
+        limits,
+        buckets,
+        trust_forwarded=os.environ.get("ADMISSION_TRUST_FORWARDED") == "1",
+    )
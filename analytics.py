@@ -0,0 +1,332 @@
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, insort
+
+# -------------------------------------
+# COACHING ANALYTICS
+# -------------------------------------
+# Every finished interview appends one event (role, persona, overall and category
+# scores, per-answer scores) to an append-only log. Hourly and daily rollup tables are
+# materialized from that log: one row per (bucket, role, persona), one flat array per
+# metric, so a dashboard query sums a few hundred array slots instead of reading raw
+# interviews. Each worker tails the log from its last offset before answering a
+# query, so rollups stay incremental and agree across workers; a periodic snapshot
+# (tables + log offset) keeps restarts from re-reading the whole log.
+
+ANALYTICS_DIR = os.environ.get("ANALYTICS_DIR", os.path.join("data", "analytics"))
+SNAPSHOT_EVERY = 500  # events applied between snapshots
+
+CATEGORIES = ["communication", "technical_depth", "clarity", "confidence"]
+SCORE_BINS = 10  # overall score histogram: 0-9, 10-19, ..., 90-100
+
+GRANULARITIES = {"hour": 3600, "day": 86400}
+
+COUNT_COLUMNS = ["interviews", "scored", "answers", "llm_calls_saved"] + [f"{c}_n" for c in CATEGORIES] + [f"{c}_weakest" for c in CATEGORIES]
+SUM_COLUMNS = ["score_sum", "score_sumsq", "answer_sum"] + [f"{c}_sum" for c in CATEGORIES]
+TREND_COLUMNS = ["interviews", "scored", "score_sum", "answers", "answer_sum"]
+
+
+def interview_event(role, persona, feedback, answer_scores, ts=None, llm_calls_saved=0):
+    """Analytics event for a finished interview (get_feedback output + per-answer scores)"""
+    categories = {}
+    for category in CATEGORIES:
+        value = feedback.get(category)
+        score = _number(value.get("score")) if isinstance(value, dict) else None
+        if score is not None:
+            categories[category] = score
+    return {
+        "ts": round(ts or time.time()),
+        "role": role,
+        "persona": persona,
+        "overall_score": _number(feedback.get("overall_score")),
+        "categories": categories,
+        "answer_scores": [score for score in map(_number, answer_scores or []) if score is not None],
+        "llm_calls_saved": int(llm_calls_saved or 0),
+    }
+
+
+def _number(value):
+    # LLM-produced scores are usually numbers but sometimes numeric strings
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+# -------------------------------------
+# ROLLUP TABLES
+# -------------------------------------
+
+class RollupTable:
+    """Columnar rollup keyed by (bucket start, role, persona)"""
+
+    def __init__(self, bucket_seconds):
+        self.bucket_seconds = bucket_seconds
+        self.index = {}  # (bucket, role, persona) -> row
+        self.buckets = array("q")
+        self.roles = []
+        self.personas = []
+        self.counts = {name: array("q") for name in COUNT_COLUMNS}
+        self.sums = {name: array("d") for name in SUM_COLUMNS}
+        self.histogram = array("q")  # row-major, SCORE_BINS slots per row
+        self.bucket_rows = {}  # bucket -> rows, so time-range queries skip old buckets
+        self.sorted_buckets = []
+
+    def _row(self, bucket, role, persona):
+        key = (bucket, role, persona)
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.buckets)
+            self.index[key] = row
+            self.buckets.append(bucket)
+            self.roles.append(role)
+            self.personas.append(persona)
+            for column in self.counts.values():
+                column.append(0)
+            for column in self.sums.values():
+                column.append(0.0)
+            self.histogram.extend([0] * SCORE_BINS)
+            if bucket not in self.bucket_rows:
+                self.bucket_rows[bucket] = []
+                insort(self.sorted_buckets, bucket)
+            self.bucket_rows[bucket].append(row)
+        return row
+
+    def add(self, event):
+        bucket = int(event["ts"]) // self.bucket_seconds * self.bucket_seconds
+        row = self._row(bucket, event.get("role") or "unknown", event.get("persona") or "neutral")
+        counts, sums = self.counts, self.sums
+
+        counts["interviews"][row] += 1
+        overall = event.get("overall_score")
+        if overall is not None:
+            counts["scored"][row] += 1
+            sums["score_sum"][row] += overall
+            sums["score_sumsq"][row] += overall * overall
+            self.histogram[row * SCORE_BINS + min(max(int(overall // 10), 0), SCORE_BINS - 1)] += 1
+
+        categories = {c: score for c, score in (event.get("categories") or {}).items() if c in CATEGORIES}
+        for category, score in categories.items():
+            counts[f"{category}_n"][row] += 1
+            sums[f"{category}_sum"][row] += score
+        if categories:
+            counts[f"{min(categories, key=categories.get)}_weakest"][row] += 1
+
+        answers = event.get("answer_scores") or []
+        counts["answers"][row] += len(answers)
+        sums["answer_sum"][row] += sum(answers)
+        counts["llm_calls_saved"][row] += int(event.get("llm_calls_saved") or 0)
+
+    def buckets_since(self, since):
+        return self.sorted_buckets[bisect_left(self.sorted_buckets, since):]
+
+    def rows(self, since, role=None, persona=None, buckets=None):
+        return [
+            row
+            for bucket in (buckets if buckets is not None else self.buckets_since(since))
+            for row in self.bucket_rows[bucket]
+            if (role is None or self.roles[row] == role)
+            and (persona is None or self.personas[row] == persona)
+        ]
+
+    def totals(self, rows, columns=None):
+        """Sum columns (default: all of them, plus the histogram) over rows"""
+        totals = {}
+        for name in columns or COUNT_COLUMNS + SUM_COLUMNS:
+            column = self.counts[name] if name in self.counts else self.sums[name]
+            totals[name] = sum(column[row] for row in rows)
+        if columns is None:
+            totals["histogram"] = [
+                sum(self.histogram[row * SCORE_BINS + slot] for row in rows) for slot in range(SCORE_BINS)
+            ]
+        return totals
+
+    def to_dict(self):
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "buckets": self.buckets.tolist(),
+            "roles": self.roles,
+            "personas": self.personas,
+            "counts": {name: column.tolist() for name, column in self.counts.items()},
+            "sums": {name: column.tolist() for name, column in self.sums.items()},
+            "histogram": self.histogram.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        table = cls(data["bucket_seconds"])
+        table.buckets = array("q", data["buckets"])
+        table.roles = data["roles"]
+        table.personas = data["personas"]
+        table.counts = {name: array("q", data["counts"].get(name, [0] * len(table.buckets))) for name in COUNT_COLUMNS}
+        table.sums = {name: array("d", data["sums"].get(name, [0.0] * len(table.buckets))) for name in SUM_COLUMNS}
+        table.histogram = array("q", data["histogram"])
+        table.index = {key: row for row, key in enumerate(zip(table.buckets, table.roles, table.personas))}
+        for row, bucket in enumerate(table.buckets):
+            table.bucket_rows.setdefault(bucket, []).append(row)
+        table.sorted_buckets = sorted(table.bucket_rows)
+        return table
+
+
+def describe(totals):
+    """Dashboard stats from summed columns"""
+    scored = totals["scored"]
+    mean = totals["score_sum"] / scored if scored else None
+    variance = max(totals["score_sumsq"] / scored - mean * mean, 0.0) if scored else None
+    interviews = totals["interviews"]
+    return {
+        "interviews": interviews,
+        "mean_score": round(mean, 1) if mean is not None else None,
+        "stdev": round(math.sqrt(variance), 1) if variance is not None else None,
+        "histogram": totals["histogram"],
+        "categories": {
+            category: round(totals[f"{category}_sum"] / totals[f"{category}_n"], 2) if totals[f"{category}_n"] else None
+            for category in CATEGORIES
+        },
+        "answers_per_interview": round(totals["answers"] / interviews, 1) if interviews else None,
+        "mean_answer_score": round(totals["answer_sum"] / totals["answers"], 2) if totals["answers"] else None,
+        "llm_calls_saved": totals["llm_calls_saved"],
+    }
+
+
+def weakest_areas(totals):
+    """Categories from weakest to strongest, with how often each was an interview's lowest"""
+    interviews = totals["interviews"]
+    areas = [
+        {
+            "category": category,
+            "mean": round(totals[f"{category}_sum"] / totals[f"{category}_n"], 2),
+            "weakest_share": round(totals[f"{category}_weakest"] / interviews, 3) if interviews else 0.0,
+        }
+        for category in CATEGORIES if totals[f"{category}_n"]
+    ]
+    return sorted(areas, key=lambda area: area["mean"])
+
+
+# -------------------------------------
+# LOG + ROLLUPS
+# -------------------------------------
+
+class Analytics:
+    def __init__(self, directory=ANALYTICS_DIR):
+        self.log_path = os.path.join(directory, "interviews.jsonl")
+        self.snapshot_path = os.path.join(directory, "rollups.json")
+        self.tables = {name: RollupTable(seconds) for name, seconds in GRANULARITIES.items()}
+        self.offset = 0
+        self._applied = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._load_snapshot()
+
+    def record(self, event):
+        """Append an event; rollups pick it up on the next refresh (in every worker)"""
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            with self._write_lock, open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(event) + "\n")
+        except OSError as e:
+            print(f"Could not record analytics event: {e}")
+
+    def refresh(self):
+        """Apply log lines written since the last refresh"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.log_path)
+            except FileNotFoundError:
+                return
+            if size < self.offset:
+                # Log was truncated or replaced: rebuild from scratch
+                self.tables = {name: RollupTable(seconds) for name, seconds in GRANULARITIES.items()}
+                self.offset = 0
+            if size == self.offset:
+                return
+            with open(self.log_path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+            # A line still being written stays for the next refresh
+            complete = data[:data.rfind(b"\n") + 1]
+            for line in complete.splitlines():
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                for table in self.tables.values():
+                    table.add(event)
+                self._applied += 1
+            self.offset += len(complete)
+            if self._applied >= SNAPSHOT_EVERY:
+                self._save_snapshot()
+                self._applied = 0
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self.tables = {name: RollupTable.from_dict(data) for name, data in snapshot["tables"].items()}
+            self.offset = snapshot["offset"]
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            print(f"Ignoring unreadable analytics snapshot: {e}")
+
+    def _save_snapshot(self):
+        snapshot = {"offset": self.offset, "tables": {name: table.to_dict() for name, table in self.tables.items()}}
+        temp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, self.snapshot_path)
+        except OSError as e:
+            print(f"Could not write analytics snapshot: {e}")
+
+    # Dashboard queries
+
+    def summary(self, days=30, role=None, persona=None, now=None):
+        """Score distribution for the cohort, split by role and by persona, plus weakest areas"""
+        self.refresh()
+        table = self.tables["day"]
+        since = (now or time.time()) - days * 86400
+        since -= since % table.bucket_seconds
+        with self._lock:
+            rows = table.rows(since, role, persona)
+            totals = table.totals(rows)
+            by_role = {}
+            for name in sorted({table.roles[row] for row in rows}):
+                by_role[name] = describe(table.totals([row for row in rows if table.roles[row] == name]))
+            by_persona = {}
+            for name in sorted({table.personas[row] for row in rows}):
+                by_persona[name] = describe(table.totals([row for row in rows if table.personas[row] == name]))
+        return {
+            "days": days,
+            "filters": {"role": role, "persona": persona},
+            "cohort": describe(totals),
+            "weakest_areas": weakest_areas(totals),
+            "by_role": by_role,
+            "by_persona": by_persona,
+        }
+
+    def trend(self, granularity="day", days=30, role=None, persona=None, now=None):
+        """Interviews and mean score per hour / day"""
+        self.refresh()
+        table = self.tables[granularity]
+        since = (now or time.time()) - days * 86400
+        since -= since % table.bucket_seconds
+        with self._lock:
+            points = []
+            for bucket in table.buckets_since(since):
+                rows = table.rows(since, role, persona, buckets=[bucket])
+                if not rows:
+                    continue
+                totals = table.totals(rows, TREND_COLUMNS)
+                points.append({
+                    "start": bucket,
+                    "interviews": totals["interviews"],
+                    "mean_score": round(totals["score_sum"] / totals["scored"], 1) if totals["scored"] else None,
+                    "mean_answer_score": round(totals["answer_sum"] / totals["answers"], 2) if totals["answers"] else None,
+                })
+        return {"granularity": granularity, "days": days, "filters": {"role": role, "persona": persona}, "points": points}
@@ -0,0 +1,131 @@
+import difflib
+import re
+import threading
+
+# -------------------------------------
+# ANSWER PRECHECK
+# -------------------------------------
+# A local pass over every answer before it reaches the scoring LLM. It only catches
+# true non-answers ("idk", "pass", or a hedge with nothing else in it), answers in
+# another language and near-duplicates of the candidate's earlier answers. Answers it
+# flags are scored locally, skip evaluate_answer_performance and get the short
+# "encourage" follow-up instead of the full interviewer prompt. Anything with a single
+# content word ("Use Redis", "TCP", "I guess Kafka") returns None and is scored by the
+# LLM as before - short is not the same as wrong.
+
+DUPLICATE_MIN_WORDS = 3       # shorter answers are never treated as repeats
+DUPLICATE_RATIO = 0.9         # similarity to an earlier answer that counts as a repeat
+LANGUAGE_MIN_WORDS = 6        # too few words to tell the language apart from jargon
+NON_LATIN_SHARE = 0.3         # share of letters outside Latin scripts
+
+TRIVIAL_ANSWERS = {
+    "idk", "i dunno", "dunno", "no idea", "i have no idea", "pass", "skip", "next",
+    "i don't know", "i do not know", "don't know", "not sure", "i'm not sure",
+    "i am not sure", "no clue", "nothing", "none", "no comment", "n a", "na",
+    "i can't answer that", "i cannot answer that", "i forgot", "i don't remember",
+}
+
+HEDGE_PHRASES = (
+    "not sure", "i think", "maybe", "i don't know", "unsure", "no idea", "i guess",
+    "dunno", "idk", "don't remember", "can't remember", "not really",
+)
+
+ENGLISH_STOPWORDS = {
+    "the", "a", "an", "and", "or", "but", "is", "are", "was", "were", "be", "to", "of",
+    "in", "on", "for", "with", "it", "that", "this", "i", "we", "you", "they", "my",
+    "have", "has", "do", "would", "will", "can", "if", "so", "not", "at", "by", "as",
+}
+
+# Words that carry nothing on their own in a hedged reply
+FILLER_WORDS = ENGLISH_STOPWORDS | {
+    word for phrase in HEDGE_PHRASES for word in phrase.split()
+} | {"i'm", "it's", "that's", "about", "one", "really", "just", "well", "um", "uh", "hmm", "yeah", "sorry"}
+
+# Common function words of the languages candidates most often switch to
+OTHER_STOPWORDS = {
+    "el", "los", "las", "que", "y", "es", "por", "para", "con", "pero", "muy", "yo",
+    "una", "del", "porque", "cuando", "como",
+    "le", "les", "des", "est", "et", "je", "ne", "pas", "avec", "pour", "mais", "une",
+    "der", "das", "und", "ist", "nicht", "ich", "mit", "wir", "auch", "eine", "zu",
+    "não", "um", "uma", "mas", "eu", "muito", "il", "che", "non", "sono", "della",
+}
+
+WORD_PATTERN = re.compile(r"[^\W_]+(?:'[^\W_]+)?")
+
+
+def answer_words(text):
+    return WORD_PATTERN.findall(text.lower().replace("’", "'"))
+
+
+def detect_language(text):
+    """'en', 'other', or None when the answer is too short to tell"""
+    letters = [c for c in text if c.isalpha()]
+    if len(letters) < 12:
+        return None
+    if sum(1 for c in letters if ord(c) > 0x24F) / len(letters) > NON_LATIN_SHARE:
+        return "other"
+    words = answer_words(text)
+    if len(words) < LANGUAGE_MIN_WORDS:
+        return None
+    english = sum(1 for word in words if word in ENGLISH_STOPWORDS)
+    other = sum(1 for word in words if word in OTHER_STOPWORDS)
+    return "other" if other >= 2 and other > english else "en"
+
+
+def is_near_duplicate(normalized, previous_answers):
+    for previous in previous_answers:
+        other = " ".join(answer_words(previous))
+        if len(other.split()) < DUPLICATE_MIN_WORDS:
+            continue
+        matcher = difflib.SequenceMatcher(None, normalized, other, autojunk=False)
+        # The quick upper bounds rule out most pairs without the full comparison
+        if (matcher.real_quick_ratio() >= DUPLICATE_RATIO and matcher.quick_ratio() >= DUPLICATE_RATIO
+                and matcher.ratio() >= DUPLICATE_RATIO):
+            return True
+    return False
+
+
+def precheck_answer(answer, previous_answers=()):
+    """Reason ('trivial', 'language', 'duplicate') to skip LLM scoring, or None"""
+    if detect_language(answer) == "other":
+        return "language"
+
+    words = answer_words(answer)
+    normalized = " ".join(words)
+    if not words or normalized in TRIVIAL_ANSWERS:
+        return "trivial"
+
+    # A hedge counts only when every word is filler: "I think consistent hashing" is an answer
+    if any(phrase in normalized for phrase in HEDGE_PHRASES) and all(word in FILLER_WORDS for word in words):
+        return "trivial"
+
+    if len(words) >= DUPLICATE_MIN_WORDS and is_near_duplicate(normalized, previous_answers):
+        return "duplicate"
+    return None
+
+
+class PrecheckStats:
+    """Per-process counters of answers checked and LLM calls saved"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.short_circuited = {"trivial": 0, "language": 0, "duplicate": 0}
+        self.llm_calls_saved = 0
+
+    def record(self, reason):
+        """Count one checked answer; each short-circuit saves its scoring call"""
+        with self._lock:
+            self.checked += 1
+            if reason:
+                self.short_circuited[reason] = self.short_circuited.get(reason, 0) + 1
+                self.llm_calls_saved += 1
+            return self.llm_calls_saved
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "short_circuited": dict(self.short_circuited),
+                "llm_calls_saved": self.llm_calls_saved,
+            }
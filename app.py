@@ -1,14 +1,41 @@
 import os
+import sys
 import json
 import re
-import random
-from flask import Flask, render_template, request, jsonify, session
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from flask import Flask, Request, Response, render_template, request, jsonify, send_file, session, has_request_context, stream_with_context
 import secrets
-from groq import Groq
+import tempfile
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
-import PyPDF2
-from io import BytesIO
+
+try:
+    from flask_sock import Sock
+except ImportError:  # optional: without it the client sends turns over plain HTTP
+    Sock = None
+from analytics import GRANULARITIES, Analytics, interview_event
+from answer_precheck import PrecheckStats, precheck_answer
+from admission import client_key, load_admission, retry_after_seconds
+from assets import init_assets
+from document_pool import DocumentPool, ParseError
+from llm_router import load_router
+from profiler import PROFILE_FORMATS, PROFILE_SAMPLE_RATE, RequestProfiler
+from difficulty import MAX_GOAL, decide_goal_count, difficulty_prompts, stats_from_history, update_stats
+from server_session import StoreSessionInterface, state_conflict_response
+from state_store import MemoryStateStore, VersionConflict, load_state_store
+from speech import POLL_INTERVAL, SpeechError, TranscriptionStream, speech_available
+from report_export import REPORT_FORMATS, ReportCache, ReportError
+from resume_ingest import CandidateStore, IngestError, ResumeBatch, ingest_resumes, ingest_slots, opening_key
+from resume_processing import (
+    RESUME_EXTENSIONS,
+    select_resume_context,
+    SUMMARY_TOKEN_BUDGET,
+    PREVIEW_TOKEN_BUDGET,
+)
 
 # Load .env file
 load_dotenv()
@@ -20,22 +47,162 @@ os.environ.pop("HTTPS_PROXY", None)
 os.environ.pop("http_proxy", None)
 os.environ.pop("https_proxy", None)
 
+# Bulk ingestion accepts much larger bodies than the interactive routes
+BULK_MAX_UPLOAD_BYTES = int(os.environ.get("BULK_MAX_UPLOAD_MB", "100")) * 1024 * 1024
+
+
+# Resume uploads are spooled to disk (never held in the worker's memory) and parsed
+# from there by the document pool; UPLOAD_SPOOL_DIR defaults to the system temp dir
+UPLOAD_SPOOL_DIR = os.environ.get("UPLOAD_SPOOL_DIR") or None
+
+
+class InterviewRequest(Request):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.spooled_paths = []
+
+    @property
+    def max_content_length(self):
+        if self.endpoint == "bulk_ingest":
+            return BULK_MAX_UPLOAD_BYTES
+        return super().max_content_length
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self.endpoint == "upload_resume":
+            # delete=False: Windows won't let the parser process open a delete-on-close
+            # temp file, so it is removed in close() instead
+            spool = tempfile.NamedTemporaryFile("wb+", dir=UPLOAD_SPOOL_DIR, prefix="resume-upload-", delete=False)
+            self.spooled_paths.append(spool.name)
+            return spool
+        return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+    def close(self):
+        """Close the request's files, then remove the spooled uploads"""
+        try:
+            super().close()
+        finally:
+            for path in self.spooled_paths:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.spooled_paths = []
+
+
 app = Flask(__name__)
+app.request_class = InterviewRequest
 app.secret_key = os.environ.get("SESSION_SECRET", secrets.token_hex(32))
 app.config['MAX_CONTENT_LENGTH'] = 5 * 1024 * 1024  # 5MB max file size
 app.config['UPLOAD_FOLDER'] = 'uploads'
 
+# Shared interview state (STATE_STORE, see state_store.py). With STATELESS_WORKERS=1 the
+# whole session lives there too and the cookie only carries a signed session id, so
+# requests can go to any worker on any node (see server_session.py)
+state_store = load_state_store()
+STATELESS_WORKERS = os.environ.get("STATELESS_WORKERS") == "1"
+if STATELESS_WORKERS:
+    app.session_interface = StoreSessionInterface(state_store)
+    if isinstance(state_store, MemoryStateStore):
+        print("Warning: STATELESS_WORKERS=1 with the in-memory STATE_STORE - state is not shared between workers.")
+    if not os.environ.get("SESSION_SECRET"):
+        print("Warning: STATELESS_WORKERS=1 needs the same SESSION_SECRET on every worker.")
+
+    @app.after_request
+    def commit_server_session(response):
+        """Persist this request's session changes; a lost race becomes a 409"""
+        try:
+            app.session_interface.commit(session)
+        except VersionConflict as e:
+            print(f"State conflict: {e}")
+            session.modified = False
+            return state_conflict_response()
+        return response
+
+# Fingerprinted, precompressed static bundles (see build_assets.py)
+init_assets(app)
+
+
+def single_worker():
+    """True when this is the only worker process (WEB_CONCURRENCY, or the dev server)"""
+    if os.environ.get("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"]) <= 1
+    return "gunicorn" not in sys.modules
+
+
+# Live interview channel (WebSocket), enabled when flask-sock is installed. Its turns only
+# reach the session through STATE_STORE checkpoints, so with several workers it needs a
+# shared store; otherwise another worker would see a truncated transcript and the client
+# sends turns over plain HTTP instead
+LIVE_CHANNEL = Sock is not None and (not isinstance(state_store, MemoryStateStore) or single_worker())
+if Sock is not None and not LIVE_CHANNEL:
+    print("Live interview channel disabled: several workers need a shared STATE_STORE (sqlite or redis).")
+sock = Sock(app) if LIVE_CHANNEL else None
+
+# Server-side speech recognition over the live channel (optional, see speech.py)
+SPEECH_ENABLED = sock is not None and speech_available()
+
 # Groq API key (FREE)
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY")
 
-if not GROQ_API_KEY:
-    raise RuntimeError("GROQ_API_KEY environment variable is required. Add it in your .env file")
+# -------------------------------------
+# LAZY DEPENDENCIES (fast worker boot)
+# -------------------------------------
+# groq is only imported by the first route that needs it, and the Groq client is
+# created on demand once per worker process (llm_router.GroqProvider); PyPDF2 is only
+# ever imported by the document parser processes. Set WARM_START=1 to import groq up
+# front instead (useful with gunicorn preload_app, where the master pays the import
+# once and forked workers share it).
+
+# Every LLM call names its purpose; the router picks provider + model for it
+# (small fast model for scoring / retries, big model for the interviewer)
+llm_router = load_router()
+# Recordings (LLM_RECORD) are tagged with the interview they belong to
+llm_router.session_id_getter = lambda: session.get("interview_id") if has_request_context() else None
 
-# Initialize Groq client (NOW WORKS ON WINDOWS)
-groq_client = Groq(api_key=GROQ_API_KEY)
 
-# FREE Model
-MODEL_NAME = "llama-3.3-70b-versatile"
+def llm_complete(purpose, messages, **options):
+    """Return the completion text for messages, routed by purpose (see llm_router.py)"""
+    return llm_router.complete(purpose, messages, **options)
+
+
+def warm_start():
+    """Import heavy dependencies eagerly (called at import when WARM_START=1)"""
+    import groq
+
+
+# Bulk-ingested candidates (see resume_ingest.py); /bulk_ingest needs RECRUITER_TOKEN
+candidate_store = CandidateStore()
+RECRUITER_TOKEN = os.environ.get("RECRUITER_TOKEN")
+
+# Coaching analytics rollups (see analytics.py); the dashboard API needs ANALYTICS_TOKEN
+analytics = Analytics() if os.environ.get("ANALYTICS", "1") != "0" else None
+ANALYTICS_TOKEN = os.environ.get("ANALYTICS_TOKEN")
+
+# Sampling profiler for the slow routes (see profiler.py); /admin/profile needs PROFILER_TOKEN
+request_profiler = RequestProfiler(app)
+request_profiler.configure(PROFILE_SAMPLE_RATE)
+PROFILER_TOKEN = os.environ.get("PROFILER_TOKEN")
+
+
+def token_matches(provided, expected):
+    """Constant-time check of a staff token header; always False while the token is unset"""
+    # Compared as bytes: compare_digest rejects non-ASCII str (headers arrive latin-1 decoded)
+    return bool(expected) and secrets.compare_digest((provided or "").encode("utf-8"), expected.encode("utf-8"))
+
+# Resume text extraction in supervised, memory / CPU limited subprocesses (see document_pool.py)
+document_pool = DocumentPool()
+
+# Rendered feedback reports (PDF / HTML / Markdown), content-addressed (see report_export.py)
+report_cache = ReportCache()
+
+# Per-session / per-IP token buckets and per-class concurrency caps (see admission.py)
+admission = load_admission()
+
+if not GROQ_API_KEY and os.environ.get("LLM_OFFLINE") != "1" and not os.environ.get("LLM_REPLAY"):
+    print("Warning: GROQ_API_KEY is not set. Add it in your .env file - LLM routes will fail until it is.")
+
+if os.environ.get("WARM_START") == "1":
+    warm_start()
 
 # -------------------------------------
 # JOB ROLES DEFINITION
@@ -69,16 +236,260 @@ JOB_ROLES = {
     }
 }
 
+# -------------------------------------
+# INTERVIEW CHECKPOINTS
+# -------------------------------------
+# The WebSocket channel keeps interview state pinned in memory for the life of the
+# connection and can't write the session cookie, so after every turn it checkpoints
+# to the state store. HTTP routes merge a newer checkpoint back into the session; with
+# a shared STATE_STORE that works from any worker.
+
+INTERVIEW_STATE_KEYS = [
+    "interview_id",
+    "role",
+    "persona",
+    "conversation_history",
+    "question_count",
+    "interview_started",
+    "interview_start_time",
+    "performance_history",
+    "difficulty_stats",
+    "dynamic_goal_count",
+    "locked_goal_count",
+    "poor_questions",
+    "question_details",
+    "resume_uploaded",
+    "llm_calls_saved",
+]
+
+interview_checkpoints = state_store
+
+
+def save_interview_checkpoint(state):
+    interview_id = state.get("interview_id")
+    if interview_id:
+        interview_checkpoints.put(interview_id, {key: state.get(key) for key in INTERVIEW_STATE_KEYS})
+
+
+def delete_interview_checkpoint(interview_id):
+    # No interview id means no checkpoint (and redis rejects a None key)
+    if interview_id:
+        interview_checkpoints.delete(interview_id)
+
+
+def load_interview_checkpoint(state):
+    """Merge the checkpoint into state if it is further along than state itself"""
+    interview_id = state.get("interview_id")
+    if not interview_id:
+        return
+    checkpoint, _ = interview_checkpoints.get(interview_id)
+    if checkpoint and checkpoint.get("question_count", 0) > (state.get("question_count") or 0):
+        state.update(checkpoint)
+
+
+# -------------------------------------
+# INTERVIEW OUTCOMES
+# -------------------------------------
+# With INTERVIEW_OUTCOMES_PATH set, every finished interview appends its per-answer
+# scores to a JSONL log; calibrate_difficulty.py fits the difficulty tables to it.
+
+INTERVIEW_OUTCOMES_PATH = os.environ.get("INTERVIEW_OUTCOMES_PATH")
+_outcomes_lock = threading.Lock()
+
+
+def record_interview_outcome(state, overall_score=None):
+    if not INTERVIEW_OUTCOMES_PATH or not state.get("performance_history"):
+        return
+    outcome = {
+        "ts": round(time.time()),
+        "role": state.get("role"),
+        "persona": state.get("persona"),
+        "scores": state.get("performance_history"),
+        "question_count": state.get("question_count"),
+        "overall_score": overall_score,
+    }
+    try:
+        directory = os.path.dirname(INTERVIEW_OUTCOMES_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _outcomes_lock, open(INTERVIEW_OUTCOMES_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(outcome) + "\n")
+    except OSError as e:
+        print(f"Could not record interview outcome: {e}")
+
+
+# -------------------------------------
+# RESUME AND OPENING QUESTION HELPERS
+# -------------------------------------
+# Shared by the interactive routes and bulk ingestion (resume_ingest.py)
+
+def summarize_resume(resume_text):
+    """Structured JSON summary of a resume (name, skills, experience, ...) via the LLM"""
+    # Role isn't known yet, so rank by section usefulness only
+    resume_excerpt = select_resume_context(resume_text, token_budget=SUMMARY_TOKEN_BUDGET)
+    summary_prompt = f"""
+Extract and summarize the following resume in a structured JSON format:
+
+Resume Text:
+{resume_excerpt}
+
+Return a JSON object with the following structure:
+{{
+    "name": "<candidate name if available>",
+    "email": "<email if available>",
+    "phone": "<phone if available>",
+    "education": ["<degree1>", "<degree2>", ...],
+    "experience": ["<job1>", "<job2>", ...],
+    "skills": ["<skill1>", "<skill2>", ...],
+    "projects": ["<project1>", "<project2>", ...],
+    "summary": "<brief professional summary>"
+}}
+
+Return ONLY valid JSON, no markdown, no code blocks.
+"""
+    
+    summary_response = llm_complete(
+        "resume_summary",
+        [
+            {"role": "system", "content": "You are a resume parser. Return only valid JSON, no markdown, no code blocks."},
+            {"role": "user", "content": summary_prompt}
+        ]
+    )
+    
+    summary_content = summary_response.strip()
+    
+    # Remove markdown if present
+    if summary_content.startswith("```"):
+        lines = summary_content.split("\n")
+        if lines[0].strip().startswith("```"):
+            lines = lines[1:]
+        if lines and lines[-1].strip() == "```":
+            lines = lines[:-1]
+        summary_content = "\n".join(lines).strip()
+    
+    # Parse JSON summary
+    try:
+        return json.loads(summary_content)
+    except json.JSONDecodeError:
+        # Try to extract JSON from text
+        json_match = re.search(r'\{.*\}', summary_content, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        return {"summary": "Resume uploaded successfully"}
+
+
+def build_opening_prompt(role, persona, resume_text="", resume_summary=None, has_resume=False):
+    """System prompt for the opening question (the only turn that sees the resume)"""
+    role_info = JOB_ROLES[role]
+
+    # Persona-based interview styles
+    persona_styles = {
+        "strict": {
+            "tone": "You are a strict, high-bar interviewer. Set high expectations, ask challenging questions, and be direct. Push candidates to demonstrate excellence. Be professional but firm.",
+            "opening": "Start with a direct, professional question about their background. Be concise and expect detailed, technical answers."
+        },
+        "friendly": {
+            "tone": "You are a friendly, supportive interviewer. Be warm, encouraging, and make the candidate feel comfortable. Help them showcase their best work. Be conversational and positive.",
+            "opening": "Start with a warm, welcoming question about their background. Be encouraging and make them feel at ease."
+        },
+        "neutral": {
+            "tone": "You are a professional, neutral interviewer. Maintain a balanced, objective approach. Be professional and fair. Focus on assessing skills without being overly strict or overly friendly.",
+            "opening": "Start with a professional, neutral question about their background. Be balanced and objective."
+        }
+    }
+    
+    persona_info = persona_styles.get(persona, persona_styles["neutral"])
+    
+    # Role-specific opening question templates
+    opening_questions = {
+        "software_engineer": f"Start the interview by asking the candidate to tell you about their background, experience, and any interesting projects they've worked on. {persona_info['opening']}",
+        "data_analyst": f"Start the interview by asking the candidate to share their background in data analysis, any relevant projects they've worked on, and what interests them about working with data. {persona_info['opening']}",
+        "sales": f"Start the interview by asking the candidate to tell you about their sales experience, any notable achievements or deals they've closed, and what draws them to sales. {persona_info['opening']}",
+        "product_manager": f"Start the interview by asking the candidate to share their background in product management, any products they've worked on, and what excites them about building products. {persona_info['opening']}",
+        "marketing": f"Start the interview by asking the candidate to tell you about their marketing experience, any campaigns they've worked on, and what aspects of marketing they're most passionate about. {persona_info['opening']}"
+    }
+    
+    opening_instruction = opening_questions.get(role, f"Start the interview by asking the candidate to tell you about their background and experience. {persona_info['opening']}")
+    
+    # Build resume context if available - ONLY for the opening question
+    # After the first question, resume context will not be included in subsequent questions
+    resume_context = ""
+    if has_resume and resume_text:
+        # Most role-relevant resume chunks within the preview budget
+        resume_preview = select_resume_context(resume_text, role_info["areas"], PREVIEW_TOKEN_BUDGET)
+        if resume_summary:
+            resume_context = f"""
+IMPORTANT - Resume Context Available (for opening question only):
+The candidate has uploaded their resume. Use this information to ask a personalized opening question about their background, experience, or projects.
+
+Resume Summary: {json.dumps(resume_summary, indent=2)}
+Resume Preview: {resume_preview}
+
+For the opening question:
+- Reference specific projects, skills, or experiences from their resume
+- Ask about their background, experience, or notable projects
+- Make it personalized based on their resume
+
+After this opening question, continue with normal role-specific questions without referencing the resume.
+"""
+        else:
+            resume_context = f"""
+IMPORTANT - Resume Context Available (for opening question only):
+The candidate has uploaded their resume. Use this information to ask a personalized opening question.
+
+Resume Content: {resume_preview}
+
+For the opening question, reference their resume to ask about their background or experience. After this, continue with normal role-specific questions.
+"""
+
+    system_prompt = f"""
+You are an expert interviewer for a {role_info['name']} role.
+
+{persona_info['tone']}
+
+{resume_context}
+
+Your approach:
+1. Start with an opening question about the candidate's background, experience, or projects
+2. Make it feel like a natural human conversation
+3. After learning about their background, gradually transition to more technical/role-specific questions
+4. Ask ONE relevant question at a time
+5. Adapt naturally to the candidate's responses
+6. If they answer well, gradually increase difficulty
+7. If they struggle, simplify and be supportive (but maintain your persona style)
+8. Behave like a human interviewer - adjust difficulty naturally
+9. Never mention question counts or adaptive rules
+10. Stay consistent with your interview persona
+
+Key areas to cover later in the interview: {', '.join(role_info['areas'])}
+
+{opening_instruction}
+"""
+    return system_prompt
+
+
+def generate_opening_question(role, persona, resume_text="", resume_summary=None, has_resume=False):
+    system_prompt = build_opening_prompt(role, persona, resume_text, resume_summary, has_resume)
+    return llm_complete(
+        "opening_question",
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": "Start the interview now."}
+        ]
+    )
+
+
 # -------------------------------------
 # ROUTES
 # -------------------------------------
 
 @app.route("/")
 def index():
-    return render_template("index.html", job_roles=JOB_ROLES)
+    return render_template("index.html", job_roles=JOB_ROLES, ws_enabled=sock is not None, stt_enabled=SPEECH_ENABLED)
 
 
 @app.route("/upload_resume", methods=["POST"])
+@admission.limit("upload")
 def upload_resume():
     """Handle resume file upload and extract text"""
     if 'resume' not in request.files:
@@ -90,25 +501,20 @@ def upload_resume():
         return jsonify({"error": "No file selected"}), 400
     
     # Validate file extension
-    allowed_extensions = {'.pdf', '.txt'}
     file_ext = os.path.splitext(file.filename)[1].lower()
     
-    if file_ext not in allowed_extensions:
+    if file_ext not in RESUME_EXTENSIONS:
         return jsonify({"error": "Invalid file type. Please upload a PDF or TXT file."}), 400
     
     try:
-        resume_text = ""
-        
-        if file_ext == '.pdf':
-            # Extract text from PDF
-            file_content = file.read()
-            pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
-            resume_text = ""
-            for page in pdf_reader.pages:
-                resume_text += page.extract_text() + "\n"
-        else:  # .txt
-            # Read text file
-            resume_text = file.read().decode('utf-8', errors='ignore')
+        # Extract text (PDF or plain text) and clean up extraction noise, in a parser
+        # process that reads the spooled upload from disk
+        file.stream.flush()
+        try:
+            resume_text = document_pool.extract(file.filename, path=file.stream.name)
+        except ParseError as e:
+            print(f"Resume parsing failed: {e}")
+            return jsonify({"error": "Could not read this file. Please upload a standard PDF or TXT resume."}), 400
         
         if not resume_text.strip():
             return jsonify({"error": "Could not extract text from file. Please ensure the file contains readable text."}), 400
@@ -116,61 +522,11 @@ def upload_resume():
         # Store resume text in session
         session["resume_text"] = resume_text
         session["resume_uploaded"] = True
+        session.pop("candidate_id", None)
         
         # Generate a summary of the resume using LLM
         try:
-            summary_prompt = f"""
-Extract and summarize the following resume in a structured JSON format:
-
-Resume Text:
-{resume_text[:3000]}  # Limit to first 3000 chars for context
-
-Return a JSON object with the following structure:
-{{
-    "name": "<candidate name if available>",
-    "email": "<email if available>",
-    "phone": "<phone if available>",
-    "education": ["<degree1>", "<degree2>", ...],
-    "experience": ["<job1>", "<job2>", ...],
-    "skills": ["<skill1>", "<skill2>", ...],
-    "projects": ["<project1>", "<project2>", ...],
-    "summary": "<brief professional summary>"
-}}
-
-Return ONLY valid JSON, no markdown, no code blocks.
-"""
-            
-            summary_response = groq_client.chat.completions.create(
-                model=MODEL_NAME,
-                messages=[
-                    {"role": "system", "content": "You are a resume parser. Return only valid JSON, no markdown, no code blocks."},
-                    {"role": "user", "content": summary_prompt}
-                ]
-            )
-            
-            summary_content = summary_response.choices[0].message.content.strip()
-            
-            # Remove markdown if present
-            if summary_content.startswith("```"):
-                lines = summary_content.split("\n")
-                if lines[0].strip().startswith("```"):
-                    lines = lines[1:]
-                if lines and lines[-1].strip() == "```":
-                    lines = lines[:-1]
-                summary_content = "\n".join(lines).strip()
-            
-            # Parse JSON summary
-            try:
-                resume_summary = json.loads(summary_content)
-            except json.JSONDecodeError:
-                # Try to extract JSON from text
-                json_match = re.search(r'\{.*\}', summary_content, re.DOTALL)
-                if json_match:
-                    resume_summary = json.loads(json_match.group())
-                else:
-                    resume_summary = {"summary": "Resume uploaded successfully"}
-            
-            session["resume_summary"] = resume_summary
+            session["resume_summary"] = summarize_resume(resume_text)
         except Exception as e:
             print(f"Error generating resume summary: {e}")
             # Continue without summary if LLM fails
@@ -212,15 +568,15 @@ No explanations, no markdown, just JSON.
 """
 
     try:
-        response = groq_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
+        response = llm_complete(
+            "scoring",
+            [
                 {"role": "system", "content": "You are an answer evaluator. Return only valid JSON."},
                 {"role": "user", "content": evaluation_prompt}
             ]
         )
         
-        content = response.choices[0].message.content.strip()
+        content = response.strip()
         
         # Remove markdown if present
         if content.startswith("```"):
@@ -284,170 +640,269 @@ def calculate_heuristic_score(user_response):
     }
 
 
-def calculate_dynamic_goal_count(performance_history):
-    """Calculate target question count based on performance history
-    
-    Dynamic Question Count: Automatically adjusts interview length (4-9 questions) based on candidate performance
-    - Strong candidates (avg score ≥ 7.0): 4-5 questions (they've proven themselves quickly)
-    - Average candidates (avg score 4.0-7.0): 6-7 questions with balanced difficulty
-    - Struggling candidates (avg score < 4.0): 7-9 questions (more opportunities to demonstrate knowledge)
-    
-    MAXIMUM: 9 questions (hard limit, never exceeds this)
-    """
-    if not performance_history or len(performance_history) == 0:
-        return 6  # Default
-    
-    avg_performance = sum(performance_history) / len(performance_history)
-    
-    if avg_performance >= 7.0:
-        # Strong candidate: 4-5 questions (they've proven themselves quickly)
-        # Use 4 for very strong (>=8.0), 5 for strong (7.0-7.9)
-        goal = 4 if avg_performance >= 8.0 else 5
-    elif avg_performance >= 4.0:
-        # Average candidate: 6-7 questions with balanced difficulty
-        # Use 6 for lower average (4.0-5.4), 7 for higher average (5.5-6.9)
-        goal = 6 if avg_performance < 5.5 else 7
-    else:
-        # Struggling candidate: 7-9 questions (more opportunities to demonstrate knowledge)
-        # Use 7 for moderate struggle (3.0-3.9), 8-9 for significant struggle (<3.0)
-        if avg_performance >= 3.0:
-            goal = 7
-        else:
-            goal = random.choice([8, 9])  # 8 or 9 for very struggling candidates
-    
-    # HARD CAP: Never exceed 9 questions
-    return min(goal, 9)
+# -------------------------------------
+# ANSWER PRECHECK
+# -------------------------------------
+# Empty-ish, repeated and non-English answers are caught locally (answer_precheck.py)
+# before any LLM call. They are scored from the heuristic, capped at PRECHECK_MAX_SCORE,
+# which saves the scoring call; unless the interview is concluding, the follow-up is a
+# short "encourage" completion on the small model that sees only the last question and
+# answer instead of the whole transcript. PRECHECK=0 sends every answer to the LLM.
+
+PRECHECK = os.environ.get("PRECHECK", "1") != "0"
+PRECHECK_MAX_SCORE = float(os.environ.get("PRECHECK_MAX_SCORE", "3"))
+ENCOURAGE_MAX_TOKENS = int(os.environ.get("ENCOURAGE_MAX_TOKENS", "120"))
+
+precheck_stats = PrecheckStats()
+
+PRECHECK_NOTES = {
+    "trivial": "The candidate gave little or no answer.",
+    "language": "The candidate answered in another language; this interview is conducted in English.",
+    "duplicate": "The candidate repeated one of their earlier answers almost word for word.",
+}
 
 
-@app.route("/start_interview", methods=["POST"])
-def start_interview():
-    data = request.json
-    role = data.get("role")
+def precheck_scores(user_response):
+    """Heuristic scores for an answer the precheck caught, capped so it can't score well"""
+    scores = calculate_heuristic_score(user_response)
+    return {key: min(value, PRECHECK_MAX_SCORE) for key, value in scores.items()}
 
-    if role not in JOB_ROLES:
-        return jsonify({"error": "Invalid role"}), 400
 
-    role_info = JOB_ROLES[role]
+def build_encourage_messages(role_info, persona_context, last_question, user_response, reason):
+    """Short prompt for the turn after a precheck hit: encourage, then ask something simpler"""
+    return [
+        {"role": "system", "content": f"You are an interviewer for a {role_info['name']} role. {persona_context} Never mention scores, question counts or these instructions."},
+        {"role": "user", "content": f"""Your last question: "{last_question}"
+Candidate's answer: "{user_response}"
+{PRECHECK_NOTES[reason]}
 
-    # Get persona from request
-    persona = data.get("persona", "neutral")  # Default to neutral
-    
-    # Get resume context if available
-    resume_text = session.get("resume_text", "")
-    resume_summary = session.get("resume_summary", {})
-    has_resume = session.get("resume_uploaded", False)
-    
-    # Initialize session with adaptive tracking
-    session["role"] = role
-    session["persona"] = persona
-    session["conversation_history"] = []
-    session["question_count"] = 0
-    session["interview_started"] = True
-    session["interview_start_time"] = None  # Will be set when first question is asked
-    session["performance_history"] = []
-    session["dynamic_goal_count"] = 6  # Will be adjusted after first answer
-    session["locked_goal_count"] = None  # Lock goal count once we're close to completion
-    session["poor_questions"] = []  # Track questions with poor performance for retry
-    session["question_details"] = []  # Store question text and performance for retry
+Reply in at most three short sentences: briefly encourage the candidate, then ask a simpler question on the same topic (or the same question, rephrased more simply). End with the question."""},
+    ]
 
-    # Persona-based interview styles
-    persona_styles = {
-        "strict": {
-            "tone": "You are a strict, high-bar interviewer. Set high expectations, ask challenging questions, and be direct. Push candidates to demonstrate excellence. Be professional but firm.",
-            "opening": "Start with a direct, professional question about their background. Be concise and expect detailed, technical answers."
-        },
-        "friendly": {
-            "tone": "You are a friendly, supportive interviewer. Be warm, encouraging, and make the candidate feel comfortable. Help them showcase their best work. Be conversational and positive.",
-            "opening": "Start with a warm, welcoming question about their background. Be encouraging and make them feel at ease."
-        },
-        "neutral": {
-            "tone": "You are a professional, neutral interviewer. Maintain a balanced, objective approach. Be professional and fair. Focus on assessing skills without being overly strict or overly friendly.",
-            "opening": "Start with a professional, neutral question about their background. Be balanced and objective."
-        }
-    }
-    
-    persona_info = persona_styles.get(persona, persona_styles["neutral"])
-    
-    # Role-specific opening question templates
-    opening_questions = {
-        "software_engineer": f"Start the interview by asking the candidate to tell you about their background, experience, and any interesting projects they've worked on. {persona_info['opening']}",
-        "data_analyst": f"Start the interview by asking the candidate to share their background in data analysis, any relevant projects they've worked on, and what interests them about working with data. {persona_info['opening']}",
-        "sales": f"Start the interview by asking the candidate to tell you about their sales experience, any notable achievements or deals they've closed, and what draws them to sales. {persona_info['opening']}",
-        "product_manager": f"Start the interview by asking the candidate to share their background in product management, any products they've worked on, and what excites them about building products. {persona_info['opening']}",
-        "marketing": f"Start the interview by asking the candidate to tell you about their marketing experience, any campaigns they've worked on, and what aspects of marketing they're most passionate about. {persona_info['opening']}"
-    }
-    
-    opening_instruction = opening_questions.get(role, f"Start the interview by asking the candidate to tell you about their background and experience. {persona_info['opening']}")
-    
-    # Get resume context if available
-    resume_text = session.get("resume_text", "")
-    resume_summary = session.get("resume_summary", {})
-    has_resume = session.get("resume_uploaded", False)
-    
-    # Build resume context if available - ONLY for the opening question
-    # After the first question, resume context will not be included in subsequent questions
-    resume_context = ""
-    if has_resume and resume_text:
-        resume_preview = resume_text[:1000]  # First 1000 chars for context
-        if resume_summary:
-            resume_context = f"""
-IMPORTANT - Resume Context Available (for opening question only):
-The candidate has uploaded their resume. Use this information to ask a personalized opening question about their background, experience, or projects.
 
-Resume Summary: {json.dumps(resume_summary, indent=2)}
-Resume Preview: {resume_preview}
+# -------------------------------------
+# FOLLOW-UP PROMPT ASSEMBLY
+# -------------------------------------
+# Follow-up turns are sent as [stable prefix] + transcript + [turn context]. Everything
+# that changes per turn (question number, difficulty, conclusion instruction) lives in
+# the final message, so consecutive turns share the whole prefix + transcript and
+# upstream prompt/KV caching can reuse it. See benchmarks/prompt_prefix_bench.py.
+
+def build_interviewer_prefix(role_info, persona_context):
+    """System prompt that stays byte-identical for every turn of an interview"""
+    return f"""
+You are an expert interviewer for a {role_info['name']} role.
+Key areas: {', '.join(role_info['areas'])}
 
-For the opening question:
-- Reference specific projects, skills, or experiences from their resume
-- Ask about their background, experience, or notable projects
-- Make it personalized based on their resume
+{persona_context}
 
-After this opening question, continue with normal role-specific questions without referencing the resume.
+Your behavior:
+- Adapt naturally to the candidate's performance level while maintaining your interview persona
+- Never mention question counts, difficulty levels, or adaptive rules to the candidate
+- Behave like a human interviewer adjusting naturally
+- If they answer well, ask follow-up questions that go deeper
+- If they struggle, simplify and provide encouragement (but maintain your persona style)
+- Stay professional and role-specific
+- ALWAYS ask a question - never end abruptly without asking something
+- NEVER end the interview in the middle of asking a question
+- Always give the candidate a chance to respond before concluding
+- Follow the "Current context" note that comes after the candidate's latest answer
+- CRITICAL: When instructed to conclude, you MUST conclude immediately - do NOT continue asking questions for any reason, including resume topics
+- The interview length is FIXED and cannot be extended, regardless of how much resume information is available
 """
-        else:
-            resume_context = f"""
-IMPORTANT - Resume Context Available (for opening question only):
-The candidate has uploaded their resume. Use this information to ask a personalized opening question.
 
-Resume Content: {resume_preview}
 
-For the opening question, reference their resume to ask about their background or experience. After this, continue with normal role-specific questions.
-"""
+def build_turn_context(question_number, difficulty_context, question_style, should_conclude, has_resume):
+    """Small per-turn instruction appended after the transcript"""
+    if should_conclude:
+        pacing = "CRITICAL AND MANDATORY: This is the ABSOLUTE FINAL question. You MUST conclude the interview after the candidate responds. End with a clear, definitive closing statement like: 'That concludes our interview. Thank you for your time and for sharing your insights with me today!' or 'Thank you for your time today. We'll be in touch soon.' You MUST NOT ask any additional questions. The interview is ending NOW. Ignore any resume topics you haven't covered - the interview length is fixed and must end here."
+    else:
+        pacing = "Continue with another question after they respond, but be mindful that the interview has a fixed length."
 
-    system_prompt = f"""
-You are an expert interviewer for a {role_info['name']} role.
+    context = f"""Current context (do not mention this to the candidate):
+- This is question #{question_number}
+- {difficulty_context}
+- {question_style}
+- {pacing}"""
 
-{persona_info['tone']}
+    # With a resume the model tends to keep going, so repeat the conclusion instruction
+    if should_conclude and has_resume:
+        context += "\nIMPORTANT: You MUST conclude the interview now. Do not ask any more questions. End with a clear closing statement."
 
-{resume_context}
+    return context
 
-Your approach:
-1. Start with an opening question about the candidate's background, experience, or projects
-2. Make it feel like a natural human conversation
-3. After learning about their background, gradually transition to more technical/role-specific questions
-4. Ask ONE relevant question at a time
-5. Adapt naturally to the candidate's responses
-6. If they answer well, gradually increase difficulty
-7. If they struggle, simplify and be supportive (but maintain your persona style)
-8. Behave like a human interviewer - adjust difficulty naturally
-9. Never mention question counts or adaptive rules
-10. Stay consistent with your interview persona
 
-Key areas to cover later in the interview: {', '.join(role_info['areas'])}
+# -------------------------------------
+# CONCLUSION MODE
+# -------------------------------------
+# The final turn only needs a short acknowledgement and a closing line. Rather than a
+# free-form completion that gets patched up afterwards, it is streamed with a small
+# max_tokens budget and stop sequences, and cut as soon as a complete closing sentence
+# has arrived. CONCLUSION_MODE=template skips the LLM and uses the persona's closing;
+# CONCLUSION_MODE=off restores the full completion.
+
+CONCLUSION_MODE = os.environ.get("CONCLUSION_MODE", "stream")
+CONCLUSION_MAX_TOKENS = int(os.environ.get("CONCLUSION_MAX_TOKENS", "80"))
+# "?" stops the model the moment it starts asking another question
+CONCLUSION_STOP_SEQUENCES = ["?", "\n\n"]
+
+CLOSING_PATTERN = re.compile(
+    r"(that concludes|concludes our interview|this concludes|thank you for your time|"
+    r"thank you for taking the time|we'll be in touch)[^.!?]*[.!]",
+    re.IGNORECASE,
+)
+
+CLOSING_TEMPLATES = {
+    "strict": "Thank you. That concludes our interview - we'll be in touch regarding next steps.",
+    "friendly": "Thank you so much for sharing your experience with me today, I really enjoyed our conversation! That concludes our interview.",
+    "neutral": "Thank you for your time and for sharing your insights with me today. That concludes our interview.",
+}
+
+
+def build_conclusion_context():
+    """Per-turn instruction for the final turn (replaces build_turn_context)"""
+    return """Current context (do not mention this to the candidate):
+- The interview is over. Reply in at most two short sentences: briefly acknowledge the candidate's last answer, then close with "That concludes our interview."
+- Do NOT ask any question."""
+
+
+def _complete_sentences(text):
+    """Drop a trailing unfinished sentence (e.g. a question cut off by a stop sequence)"""
+    end = max(text.rfind("."), text.rfind("!"))
+    return text[:end + 1].strip() if end >= 0 else ""
+
+
+def generate_closing(messages, persona, emit=None):
+    """Closing statement for the final turn, templated or streamed until the first complete closing"""
+    template = CLOSING_TEMPLATES.get(persona, CLOSING_TEMPLATES["neutral"])
+    if CONCLUSION_MODE == "template":
+        if emit:
+            emit("token", {"text": template})
+        return template
+
+    text = ""
+    stream = llm_router.stream(
+        "closing", messages, max_tokens=CONCLUSION_MAX_TOKENS, stop=CONCLUSION_STOP_SEQUENCES
+    )
+    try:
+        for delta in stream:
+            text += delta
+            if emit:
+                emit("token", {"text": delta})
+            match = CLOSING_PATTERN.search(text)
+            if match:
+                # Stop reading: closing the stream drops the connection and ends generation
+                text = text[:match.end()]
+                break
+    except Exception as e:
+        # The interview is ending either way; a failed closing falls back to the template
+        print(f"Closing generation failed, using template: {e}")
+    finally:
+        stream.close()
+
+    text = text.strip()
+    if not CLOSING_PATTERN.search(text):
+        text = f"{_complete_sentences(text)} {template}".strip()
+    return text
+
+
+@app.route("/bulk_ingest", methods=["POST"])
+@admission.limit("bulk")
+def bulk_ingest():
+    """Ingest a batch of resumes (files and/or zip archives); streams NDJSON progress"""
+    if not token_matches(request.headers.get("X-Recruiter-Token"), RECRUITER_TOKEN):
+        return jsonify({"error": "Recruiter token required"}), 403
+
+    roles = request.form.getlist("role") or ["software_engineer"]
+    invalid = [role for role in roles if role not in JOB_ROLES]
+    if invalid:
+        return jsonify({"error": f"Invalid role: {', '.join(invalid)}"}), 400
+    persona = request.form.get("persona", "neutral")
+
+    # Spooled to disk file by file, with the batch limits checked as it fills
+    batch = ResumeBatch(spool_dir=UPLOAD_SPOOL_DIR)
+    try:
+        for upload in request.files.getlist("resumes"):
+            batch.add(upload.filename, upload.stream)
+    except IngestError as e:
+        batch.cleanup()
+        return jsonify({"error": str(e)}), 400
+    if not batch.files:
+        batch.cleanup()
+        return jsonify({"error": "No resumes found (send .pdf / .txt / .zip files as 'resumes')"}), 400
+
+    if not ingest_slots.acquire(blocking=False):
+        batch.cleanup()
+        return jsonify({"error": "Another batch is being ingested - try again shortly"}), 429
+
+    def progress():
+        events = ingest_resumes(batch.files, roles, persona, summarize_resume, generate_opening_question, candidate_store)
+        try:
+            for event in events:
+                yield json.dumps(event) + "\n"
+        except IngestError as e:
+            yield json.dumps({"event": "error", "error": str(e)}) + "\n"
+        finally:
+            # On a client disconnect this cancels the batch's queued LLM calls right away
+            events.close()
+
+    response = Response(stream_with_context(progress()), mimetype="application/x-ndjson")
+    # Released when the server closes the response, even if the client never reads it
+    response.call_on_close(ingest_slots.release)
+    response.call_on_close(batch.cleanup)
+    return response
+
+
+@app.route("/start_interview", methods=["POST"])
+@admission.limit("interview")
+def start_interview():
+    data = request.json
+    role = data.get("role")
+
+    if role not in JOB_ROLES:
+        return jsonify({"error": "Invalid role"}), 400
 
-{opening_instruction}
-"""
+    role_info = JOB_ROLES[role]
 
-    try:
-        response = groq_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": "Start the interview now."}
-            ]
-        )
+    # Get persona from request
+    persona = data.get("persona", "neutral")  # Default to neutral
+    
+    # Bulk-ingested candidate: resume and (usually) the opening question are ready
+    opening_question = None
+    candidate_id = data.get("candidate_id")
+    if candidate_id:
+        candidate = candidate_store.get(candidate_id)
+        if candidate is None:
+            return jsonify({"error": "Unknown candidate"}), 404
+        session["candidate_id"] = candidate_id
+        session["resume_text"] = candidate["resume_text"]
+        session["resume_summary"] = candidate.get("resume_summary") or {}
+        session["resume_uploaded"] = True
+        opening_question = candidate.get("opening_questions", {}).get(opening_key(role, persona))
+
+    # Get resume context if available
+    resume_text = session.get("resume_text", "")
+    resume_summary = session.get("resume_summary", {})
+    has_resume = session.get("resume_uploaded", False)
+    
+    # Initialize session with adaptive tracking
+    session["interview_id"] = secrets.token_urlsafe(16)
+    session["role"] = role
+    session["persona"] = persona
+    session["conversation_history"] = []
+    session["question_count"] = 0
+    session["interview_started"] = True
+    session["interview_start_time"] = None  # Will be set when first question is asked
+    session["performance_history"] = []
+    session["difficulty_stats"] = None
+    session["dynamic_goal_count"] = 6  # Will be adjusted after first answer
+    session["locked_goal_count"] = None  # Lock goal count once we're close to completion
+    session["poor_questions"] = []  # Track questions with poor performance for retry
+    session["question_details"] = []  # Store question text and performance for retry
+    session["llm_calls_saved"] = 0  # Scoring calls skipped by the answer precheck
 
-        question = response.choices[0].message.content
+    try:
+        question = opening_question or generate_opening_question(role, persona, resume_text, resume_summary, has_resume)
 
         # Set interview start time on first question
         from datetime import datetime
@@ -469,29 +924,29 @@ Key areas to cover later in the interview: {', '.join(role_info['areas'])}
         return jsonify({"error": f"Error starting interview: {e}"}), 500
 
 
-@app.route("/send_response", methods=["POST"])
-def send_response():
-    if not session.get("interview_started"):
-        return jsonify({"error": "No active interview"}), 400
-
-    data = request.json
-    user_response = data.get("response", "").strip()
-
-    if not user_response:
-        return jsonify({"error": "Empty response"}), 400
+def run_interview_turn(state, user_response, emit=None):
+    """Score one candidate answer and generate the next interviewer message
 
-    role = session["role"]
+    state is any dict-like holder of the interview keys (the Flask session for
+    /send_response, a pinned dict for the WebSocket channel). Returns the payload
+    sent back to the client; raises if the interviewer LLM call fails. When emit is
+    given, score updates and interviewer tokens are pushed through it as they happen.
+    """
+    role = state["role"]
     role_info = JOB_ROLES[role]
-    history = session.get("conversation_history", [])
-    question_count = session.get("question_count", 0)
-    performance_history = session.get("performance_history", [])
-    dynamic_goal_count = session.get("dynamic_goal_count", 6)
+    # Work on copies so a failed LLM call leaves the stored state untouched: nothing is
+    # written back to state until the interviewer reply has been generated
+    history = list(state.get("conversation_history", []))
+    question_count = state.get("question_count", 0)
+    performance_history = list(state.get("performance_history", []))
+    dynamic_goal_count = state.get("dynamic_goal_count", 6)
+    question_details = list(state.get("question_details", []))
     
     # Ensure question_count is valid (defensive check - count from history if needed)
     # Count actual questions from history to verify
     actual_question_count = sum(1 for msg in history if msg.get("role") == "assistant")
     
-    # Use the higher of session count or actual count (defensive)
+    # Use the higher of state count or actual count (defensive)
     if question_count < actual_question_count:
         question_count = actual_question_count
     
@@ -499,10 +954,21 @@ def send_response():
     if question_count == 0 and len(history) > 0:
         question_count = 1
 
-    # Evaluate the candidate's answer
-    performance_data = evaluate_answer_performance(user_response, role_info)
+    # Evaluate the candidate's answer (locally when the precheck catches it)
+    reason = None
+    if PRECHECK:
+        previous_answers = [msg.get("content", "") for msg in history if msg.get("role") == "user"]
+        reason = precheck_answer(user_response, previous_answers)
+    if reason:
+        performance_data = precheck_scores(user_response)
+        print(f"Precheck: {reason} answer scored locally, scoring call skipped")
+    else:
+        performance_data = evaluate_answer_performance(user_response, role_info)
     performance_score = performance_data["performance_score"]
     performance_history.append(performance_score)
+    # Running level / variance / trend (O(1) per answer); rebuilt once for older sessions
+    difficulty_stats = state.get("difficulty_stats") or stats_from_history(performance_history[:-1])
+    difficulty_stats = update_stats(difficulty_stats, performance_score)
     
     # Track poor questions for retry (score < 7.0 or any individual category < 7.0)
     # Track if overall score is low OR if any critical category is low
@@ -528,7 +994,6 @@ def send_response():
                 break
         
         if last_question:
-            question_details = session.get("question_details", [])
             # Check if this question is already tracked (avoid duplicates)
             question_already_tracked = any(
                 q.get("question") == last_question and q.get("question_number") == question_count 
@@ -542,37 +1007,35 @@ def send_response():
                     "original_score": performance_score,
                     "can_retry": True
                 })
-                session["question_details"] = question_details
                 print(f"Tracked question for retry: Q{question_count}, score={performance_score}")
     
     # Calculate average performance for context
-    avg_performance = sum(performance_history) / len(performance_history) if performance_history else 5.0
+    avg_performance = difficulty_stats["mean"]
+
+    if emit:
+        emit("score", {
+            "performance_score": performance_score,
+            "average_score": round(avg_performance, 1)
+        })
     
-    # Recalculate dynamic goal count based on updated performance
-    # BUT: Lock the goal count after the FIRST answer to prevent constant changes
-    locked_goal = session.get("locked_goal_count")
+    # Recalculate dynamic goal count from the difficulty engine's lookup tables. The goal
+    # may move while the interview is young, then locks once we're close to completion
+    # so the conclusion isn't pushed back indefinitely
+    locked_goal = state.get("locked_goal_count")
     
     if locked_goal is not None:
         # Goal is already locked, use it - DO NOT CHANGE
-        # Ensure locked goal doesn't exceed 9 (hard limit)
-        dynamic_goal_count = min(locked_goal, 9)
+        dynamic_goal_count = min(locked_goal, MAX_GOAL)
     else:
-        # Calculate new goal count
-        new_goal = calculate_dynamic_goal_count(performance_history)
-        # Ensure new goal doesn't exceed 9 (shouldn't happen, but safety check)
-        new_goal = min(new_goal, 9)
-        # Lock it after we've answered at least 1 question (prevents goal from changing mid-interview)
-        # This allows the goal to adjust based on first answer, then stays fixed
-        if question_count >= 1:
-            session["locked_goal_count"] = new_goal
-            dynamic_goal_count = new_goal
-        else:
-            dynamic_goal_count = new_goal
+        # Never drop the goal below the question we're about to ask
+        dynamic_goal_count = min(max(decide_goal_count(difficulty_stats), question_count + 1), MAX_GOAL)
+        if question_count + 1 >= dynamic_goal_count - 1:
+            locked_goal = dynamic_goal_count
     
     history.append({"role": "user", "content": user_response})
 
     # Get persona for consistent interview style
-    persona = session.get("persona", "neutral")
+    persona = state.get("persona", "neutral")
     persona_styles = {
         "strict": "Maintain your strict, high-bar approach. Push for excellence and detailed answers.",
         "friendly": "Maintain your friendly, supportive approach. Be encouraging and help them succeed.",
@@ -583,15 +1046,7 @@ def send_response():
     # Build adaptive system prompt
     # Note: Strong candidates get fewer questions (they've proven themselves), 
     # struggling candidates get more questions (more opportunity to show knowledge)
-    if avg_performance >= 7.0:
-        difficulty_context = "The candidate is performing very well and has demonstrated strong knowledge. Ask a few deeper, challenging questions to confirm their expertise, then conclude efficiently."
-        question_style = "Ask deeper, more challenging questions. Since they're doing well, you can wrap up sooner after confirming their strong performance."
-    elif avg_performance >= 4.0:
-        difficulty_context = "The candidate is performing at an average level. Maintain moderate difficulty. Balance fundamentals with some depth."
-        question_style = "Ask balanced questions covering core concepts."
-    else:
-        difficulty_context = "The candidate is struggling. Simplify questions and be supportive. Give them more opportunities to demonstrate their knowledge. Focus on fundamentals and basic concepts."
-        question_style = "Ask simpler, more encouraging questions. Provide more questions to give them chances to show what they know."
+    difficulty_context, question_style = difficulty_prompts(difficulty_stats)
 
     # Determine if we should start wrapping up
     # We should conclude if:
@@ -599,11 +1054,11 @@ def send_response():
     # 2. We've asked at least 4 questions (minimum)
     next_question_number = question_count + 1
     # Use locked goal if available, otherwise use current dynamic goal
-    target_goal = session.get("locked_goal_count") or dynamic_goal_count
+    target_goal = locked_goal or dynamic_goal_count
     # Ensure target_goal never exceeds 9 (hard limit)
     target_goal = min(target_goal, 9)
     # Be more aggressive about concluding when resume is present
-    has_resume = session.get("resume_uploaded", False)
+    has_resume = state.get("resume_uploaded", False)
     # If we're at or past goal, we should conclude (especially strict with resume)
     should_conclude = ((next_question_number >= target_goal) and (question_count >= 3)) or (next_question_number >= 9)
     # If resume is present, be EXTRA strict - conclude as soon as we reach goal
@@ -615,186 +1070,203 @@ def send_response():
         if next_question_number >= target_goal:
             should_conclude = True
     
-    # Get resume context if available - ONLY use for first question (question_count == 0)
-    # After first question, use normal role-based questions without resume context
-    resume_text = session.get("resume_text", "")
-    resume_summary = session.get("resume_summary", {})
-    
     # Resume context is ONLY used in the opening question (start_interview)
     # After the opening question, we use normal role-based questions without resume context
     # This prevents the AI from continuing to reference resume and extending the interview
-    resume_context = ""
-    # Do NOT include resume context in send_response - only in start_interview
-    # This ensures only the first question is resume-based, then normal role questions
-    
-    system_prompt = f"""
-You are an expert interviewer for a {role_info['name']} role.
-Key areas: {', '.join(role_info['areas'])}
-
-{persona_context}
-
-{resume_context}
-
-Current context:
-- This is question #{question_count + 1}
-- {difficulty_context}
-- {question_style}
 
-Your behavior:
-- Adapt naturally to the candidate's performance level while maintaining your interview persona
-- Never mention question counts, difficulty levels, or adaptive rules to the candidate
-- Behave like a human interviewer adjusting naturally
-- If they answer well, ask follow-up questions that go deeper
-- If they struggle, simplify and provide encouragement (but maintain your persona style)
-- Stay professional and role-specific
-- ALWAYS ask a question - never end abruptly without asking something
-- {"CRITICAL AND MANDATORY: This is the ABSOLUTE FINAL question. You MUST conclude the interview after the candidate responds. End with a clear, definitive closing statement like: 'That concludes our interview. Thank you for your time and for sharing your insights with me today!' or 'Thank you for your time today. We'll be in touch soon.' You MUST NOT ask any additional questions. The interview is ending NOW. Ignore any resume topics you haven't covered - the interview length is fixed and must end here." if should_conclude else "Continue with another question after they respond, but be mindful that the interview has a fixed length."}
-- NEVER end the interview in the middle of asking a question
-- Always give the candidate a chance to respond before concluding
-- CRITICAL: When instructed to conclude, you MUST conclude immediately - do NOT continue asking questions for any reason, including resume topics
-- The interview length is FIXED and cannot be extended, regardless of how much resume information is available
-"""
+    # Stable prefix first (identical every turn, so it can be prompt-cached), then the
+    # growing transcript, then the small per-turn context as the very last message
+    conclusion_mode = should_conclude and CONCLUSION_MODE != "off"
+    if conclusion_mode:
+        turn_context = build_conclusion_context()
+    else:
+        turn_context = build_turn_context(
+            next_question_number, difficulty_context, question_style, should_conclude, has_resume
+        )
+    messages = (
+        [{"role": "system", "content": build_interviewer_prefix(role_info, persona_context)}]
+        + history
+        + [{"role": "system", "content": turn_context}]
+    )
 
-    try:
-        messages = [{"role": "system", "content": system_prompt}] + history
-
-        # If we should conclude and have resume, add extra emphasis to conclusion
-        if should_conclude and has_resume:
-            # Add a final instruction to the messages to ensure conclusion
-            messages.append({
-                "role": "user", 
-                "content": "IMPORTANT: You MUST conclude the interview now. Do not ask any more questions. End with a clear closing statement."
-            })
-
-        response = groq_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=messages
+    # A precheck hit gets the short encourage prompt unless the interview is concluding
+    encourage = reason is not None and not should_conclude
+    if encourage:
+        last_question = next((msg.get("content") for msg in reversed(history[:-1]) if msg.get("role") == "assistant"), "")
+        messages = build_encourage_messages(role_info, persona_context, last_question, user_response, reason)
+    purpose = "encourage" if encourage else "next_question"
+    options = {"max_tokens": ENCOURAGE_MAX_TOKENS} if encourage else {}
+
+    if conclusion_mode:
+        next_question = generate_closing(messages, persona, emit)
+    elif emit:
+        # Stream interviewer tokens to the live channel as they arrive
+        parts = []
+        for delta in llm_router.stream(purpose, messages, **options):
+            parts.append(delta)
+            emit("token", {"text": delta})
+        next_question = "".join(parts)
+    else:
+        next_question = llm_complete(
+            purpose,
+            messages,
+            **options
         )
 
-        next_question = response.choices[0].message.content
-        
-        # If we should conclude, ALWAYS force add a conclusion (especially important with resume)
+    # If we should conclude, ALWAYS force add a conclusion (especially important with resume).
+    # generate_closing already guarantees a complete closing, so only the full completion needs it
+    if should_conclude and not conclusion_mode:
+        conclusion_indicators = ["concludes", "thank you", "wrap up", "that's all", "we'll be in touch", "interview is complete"]
+        has_conclusion = any(indicator in next_question.lower() for indicator in conclusion_indicators)
+        if not has_conclusion:
+            # Force add conclusion - be aggressive, especially with resume
+            next_question = next_question.rstrip('.!?') + ". That concludes our interview. Thank you for your time and for sharing your insights with me today!"
+        # Even if it has conclusion, if resume is present, make sure it's clear
+        elif has_resume and not any(phrase in next_question.lower() for phrase in ["that concludes", "concludes our interview"]):
+            # Make conclusion more explicit
+            next_question = next_question.rstrip('.!?') + ". That concludes our interview. Thank you for your time!"
+
+    history.append({"role": "assistant", "content": next_question})
+
+    # Update question count BEFORE checking completion to ensure consistency
+    new_question_count = question_count + 1
+
+    # Check if interview should end
+    # Check for clear conclusion phrases that indicate the interview is ending
+    explicit_conclusion_phrases = [
+        "that concludes our interview",
+        "concludes our interview", 
+        "thank you for your time",
+        "thank you for taking the time",
+        "this concludes the interview",
+        "we'll wrap up here",
+        "that's all the questions",
+        "we're done here"
+    ]
+    
+    explicit_conclusion = any(phrase in next_question.lower() for phrase in explicit_conclusion_phrases)
+    
+    # Mark as completed if:
+    # 1. We intended to conclude (should_conclude was True), OR
+    # 2. Interviewer explicitly concluded, OR
+    # 3. We've reached or exceeded the goal count (and asked at least 4 questions)
+    min_questions = 4
+    # Use locked goal if available, otherwise use current dynamic goal
+    target_goal = locked_goal or dynamic_goal_count
+    # Ensure target_goal never exceeds 9 (hard limit)
+    target_goal = min(target_goal, 9)
+    has_reached_goal = new_question_count >= target_goal
+    has_min_questions = new_question_count >= min_questions
+    
+    # Force completion if we've exceeded the goal (safety check)
+    # This prevents interviews from continuing indefinitely
+    force_complete = new_question_count > target_goal
+    
+    # If we intended to conclude, force completion regardless
+    # This ensures interviews end when they should
+    # When should_conclude is True, we MUST mark as completed (especially important with resume context)
+    is_completed = (
+        should_conclude or  # We told the AI to conclude, so mark it complete (HIGHEST PRIORITY)
+        explicit_conclusion or 
+        (has_reached_goal and has_min_questions) or
+        force_complete  # Safety: if we've exceeded goal, force completion
+    )
+    
+    # HARD LIMIT: Never exceed 9 questions - force completion at 9
+    if new_question_count >= 9:
+        is_completed = True
+    
+    # CRITICAL: If resume is present, be EXTREMELY strict about completion
+    # Force completion immediately when we reach goal (lower threshold with resume)
+    if has_resume:
+        # PRIMARY: With resume, complete as soon as we reach goal (no exceptions)
+        if new_question_count >= target_goal:
+            is_completed = True
+        # Also force if we're past goal (safety)
+        if new_question_count > target_goal:
+            is_completed = True
+        # Final safety: if should_conclude was True, ALWAYS complete (no exceptions)
         if should_conclude:
-            conclusion_indicators = ["concludes", "thank you", "wrap up", "that's all", "we'll be in touch", "interview is complete"]
-            has_conclusion = any(indicator in next_question.lower() for indicator in conclusion_indicators)
-            if not has_conclusion:
-                # Force add conclusion - be aggressive, especially with resume
-                next_question = next_question.rstrip('.!?') + ". That concludes our interview. Thank you for your time and for sharing your insights with me today!"
-            # Even if it has conclusion, if resume is present, make sure it's clear
-            elif has_resume and not any(phrase in next_question.lower() for phrase in ["that concludes", "concludes our interview"]):
-                # Make conclusion more explicit
-                next_question = next_question.rstrip('.!?') + ". That concludes our interview. Thank you for your time!"
-
-        history.append({"role": "assistant", "content": next_question})
-
-        # Update question count BEFORE checking completion to ensure consistency
-        new_question_count = question_count + 1
-
-        # Check if interview should end
-        # Check for clear conclusion phrases that indicate the interview is ending
-        explicit_conclusion_phrases = [
-            "that concludes our interview",
-            "concludes our interview", 
-            "thank you for your time",
-            "thank you for taking the time",
-            "this concludes the interview",
-            "we'll wrap up here",
-            "that's all the questions",
-            "we're done here"
-        ]
-        
-        explicit_conclusion = any(phrase in next_question.lower() for phrase in explicit_conclusion_phrases)
-        
-        # Mark as completed if:
-        # 1. We intended to conclude (should_conclude was True), OR
-        # 2. Interviewer explicitly concluded, OR
-        # 3. We've reached or exceeded the goal count (and asked at least 4 questions)
-        min_questions = 4
-        # Use locked goal if available, otherwise use current dynamic goal
-        target_goal = session.get("locked_goal_count") or dynamic_goal_count
-        # Ensure target_goal never exceeds 9 (hard limit)
-        target_goal = min(target_goal, 9)
-        has_reached_goal = new_question_count >= target_goal
-        has_min_questions = new_question_count >= min_questions
-        
-        # Force completion if we've exceeded the goal (safety check)
-        # This prevents interviews from continuing indefinitely
-        force_complete = new_question_count > target_goal
-        
-        # If we intended to conclude, force completion regardless
-        # This ensures interviews end when they should
-        # When should_conclude is True, we MUST mark as completed (especially important with resume context)
-        is_completed = (
-            should_conclude or  # We told the AI to conclude, so mark it complete (HIGHEST PRIORITY)
-            explicit_conclusion or 
-            (has_reached_goal and has_min_questions) or
-            force_complete  # Safety: if we've exceeded goal, force completion
-        )
-        
-        # HARD LIMIT: Never exceed 9 questions - force completion at 9
-        if new_question_count >= 9:
             is_completed = True
-        
-        # CRITICAL: If resume is present, be EXTREMELY strict about completion
-        # Force completion immediately when we reach goal (lower threshold with resume)
-        if has_resume:
-            # PRIMARY: With resume, complete as soon as we reach goal (no exceptions)
-            if new_question_count >= target_goal:
-                is_completed = True
-            # Also force if we're past goal (safety)
-            if new_question_count > target_goal:
-                is_completed = True
-            # Final safety: if should_conclude was True, ALWAYS complete (no exceptions)
-            if should_conclude:
-                is_completed = True
-        
-        # Update session - ensure all values are set correctly
-        session["conversation_history"] = history
-        session["question_count"] = new_question_count
-        session["performance_history"] = performance_history
-        session["dynamic_goal_count"] = dynamic_goal_count
-        # Force session to be marked as modified
-        session.modified = True
-        # Ensure session is saved
-        try:
-            session.permanent = True
-        except:
-            pass
+    
+    # Update state - ensure all values are set correctly
+    state["conversation_history"] = history
+    state["question_count"] = new_question_count
+    state["performance_history"] = performance_history
+    state["difficulty_stats"] = difficulty_stats
+    state["dynamic_goal_count"] = dynamic_goal_count
+    state["question_details"] = question_details
+    if locked_goal is not None:
+        state["locked_goal_count"] = locked_goal
+    if PRECHECK:
+        saved = precheck_stats.record(reason)
+        if reason:
+            state["llm_calls_saved"] = (state.get("llm_calls_saved") or 0) + 1
+            print(f"Precheck: {saved} LLM calls saved by this worker")
+
+    # Use locked goal for total_questions display, otherwise use current dynamic goal
+    # Ensure display_total never exceeds 9 (hard limit)
+    display_total = locked_goal or dynamic_goal_count
+    display_total = min(display_total, 9)
+    
+    # Debug: Verify question count is correct (count from history as fallback)
+    actual_count_from_history = sum(1 for msg in history if msg.get("role") == "assistant")
+    if actual_count_from_history != new_question_count:
+        # If mismatch, use the actual count from history
+        new_question_count = actual_count_from_history
+        state["question_count"] = new_question_count
+    
+    # Final check: If we're at goal with resume, FORCE completion (no matter what)
+    if has_resume and new_question_count >= target_goal:
+        is_completed = True
+    
+    return {
+        "question": next_question,
+        "question_count": new_question_count,
+        "total_questions": display_total,
+        "is_completed": is_completed,
+        "performance_score": round(avg_performance, 1)
+    }
 
-        # Use locked goal for total_questions display, otherwise use current dynamic goal
-        # Ensure display_total never exceeds 9 (hard limit)
-        display_total = session.get("locked_goal_count") or dynamic_goal_count
-        display_total = min(display_total, 9)
-        
-        # Debug: Verify question count is correct (count from history as fallback)
-        actual_count_from_history = sum(1 for msg in history if msg.get("role") == "assistant")
-        if actual_count_from_history != new_question_count:
-            # If mismatch, use the actual count from history
-            new_question_count = actual_count_from_history
-            session["question_count"] = new_question_count
-            session.modified = True
-        
-        # Final check: If we're at goal with resume, FORCE completion (no matter what)
-        if has_resume and new_question_count >= target_goal:
-            is_completed = True
-        
-        return jsonify({
-            "question": next_question,
-            "question_count": new_question_count,
-            "total_questions": display_total,
-            "is_completed": is_completed,
-            "performance_score": round(avg_performance, 1)
-        })
 
+@app.route("/send_response", methods=["POST"])
+@admission.limit("interview")
+def send_response():
+    if not session.get("interview_started"):
+        return jsonify({"error": "No active interview"}), 400
+
+    data = request.json
+    user_response = data.get("response", "").strip()
+
+    if not user_response:
+        return jsonify({"error": "Empty response"}), 400
+
+    load_interview_checkpoint(session)
+
+    try:
+        payload = run_interview_turn(session, user_response)
     except Exception as e:
         return jsonify({"error": f"Error generating response: {e}"}), 500
 
+    # Force session to be marked as modified
+    session.modified = True
+    # Ensure session is saved
+    try:
+        session.permanent = True
+    except:
+        pass
+
+    return jsonify(payload)
+
 
 @app.route("/get_feedback", methods=["POST"])
+@admission.limit("feedback")
 def get_feedback():
     if not session.get("interview_started"):
         return jsonify({"error": "No active interview"}), 400
 
+    load_interview_checkpoint(session)
+
     role = session["role"]
     role_info = JOB_ROLES[role]
     history = session.get("conversation_history", [])
@@ -858,15 +1330,15 @@ CRITICAL REQUIREMENTS:
 """
 
     try:
-        response = groq_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
+        response = llm_complete(
+            "final_feedback",
+            [
                 {"role": "system", "content": "You are an interview evaluator. Always respond with valid JSON only, no markdown, no code blocks, no explanations."},
                 {"role": "user", "content": feedback_prompt}
             ]
         )
 
-        content = response.choices[0].message.content.strip()
+        content = response.strip()
         
         # Remove markdown code blocks if present (```json ... ``` or ``` ... ```)
         if content.startswith("```"):
@@ -929,11 +1401,27 @@ CRITICAL REQUIREMENTS:
             "resume_text": session.get("resume_text", ""),
             "resume_summary": session.get("resume_summary", {}),
             "resume_uploaded": session.get("resume_uploaded", False),
-            "question_details": question_details
+            "question_details": question_details,
+            "retry_id": secrets.token_hex(8)
         }
         # Store in session with a different key so it persists after clear
         session["retry_data"] = retry_data
+        queued = prefetch_retry_prompts(retry_data)
+        if queued:
+            print(f"Retry prep: {queued} retry prompts queued")
 
+        try:
+            feedback["report_id"] = report_cache.publish(feedback)
+        except OSError as e:
+            print(f"Report export unavailable: {e}")
+
+        record_interview_outcome(session, feedback.get("overall_score"))
+        if analytics is not None:
+            analytics.record(interview_event(
+                role, persona, feedback, performance_history,
+                llm_calls_saved=session.get("llm_calls_saved") or 0,
+            ))
+        delete_interview_checkpoint(session.get("interview_id"))
         session.clear()
         # Restore retry data after clear
         session["retry_data"] = retry_data
@@ -946,52 +1434,87 @@ CRITICAL REQUIREMENTS:
         return jsonify({"error": f"Error generating feedback: {str(e)}"}), 500
 
 
-@app.route("/retry_question", methods=["POST"])
-def retry_question():
-    """Handle retry of a specific question"""
-    data = request.json
-    question_index = data.get("question_index")
-    question_text = data.get("question_text")
-    
-    if not question_text:
-        return jsonify({"error": "Question text required"}), 400
-    
-    # Get data from session or request
-    retry_data = session.get("retry_data")
-    if retry_data:
-        role = retry_data.get("role")
-        persona = retry_data.get("persona", "neutral")
-        resume_text = retry_data.get("resume_text", "")
-        resume_summary = retry_data.get("resume_summary", {})
-        has_resume = retry_data.get("resume_uploaded", False)
-    else:
-        # Fallback: try to get from request or use defaults
-        role = data.get("role") or session.get("role")
-        persona = data.get("persona") or session.get("persona", "neutral")
-        resume_text = session.get("resume_text", "")
-        resume_summary = session.get("resume_summary", {})
-        has_resume = session.get("resume_uploaded", False)
-    
-    if not role or role not in JOB_ROLES:
-        return jsonify({"error": "Invalid role"}), 400
-    
-    role_info = JOB_ROLES[role]
-    
+@app.route("/reports/<report_id>.<fmt>")
+@admission.limit("report")
+def download_report(report_id, fmt):
+    """Serve a rendered feedback report; the link doubles as a share link"""
+    try:
+        path = report_cache.get(report_id, fmt)
+    except ReportError as e:
+        return jsonify({"error": str(e)}), 404
+    except TimeoutError:
+        return jsonify({"error": "Report is still rendering - please try again shortly."}), 503
+    except BrokenProcessPool:
+        print(f"Report render pool failed twice ({report_id}.{fmt})")
+        return jsonify({"error": "Report rendering is unavailable - please try again shortly."}), 503
+    except Exception as e:
+        # A renderer bug or a failed artifact write: report it like the other routes do
+        print(f"Report render failed ({report_id}.{fmt}): {e}")
+        return jsonify({"error": f"Error rendering report: {str(e)}"}), 500
+
+    response = send_file(
+        path,
+        mimetype=REPORT_FORMATS[fmt],
+        as_attachment=request.args.get("download") == "1",
+        download_name=f"interview_feedback_{report_id[:8]}.{fmt}",
+        conditional=True,
+        etag=f"{report_id}-{fmt}",
+    )
+    # Content-addressed: the bytes behind a URL never change
+    response.headers["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
+
+
+# -------------------------------------
+# RETRY PREPARATION
+# -------------------------------------
+# Rephrasing a weak question doesn't depend on anything the candidate does after the
+# interview, so get_feedback queues a retry prompt for every retryable question on a
+# background pool and "Retry" becomes a lookup. Prompts are kept in the state store
+# under the feedback's retry_id; a click that arrives while its prompt is still being
+# generated on this worker waits for that call, and one that finds nothing stored
+# (prompt still in flight elsewhere, or expired) generates inline.
+
+RETRY_PREFETCH = os.environ.get("RETRY_PREFETCH", "1") != "0"
+RETRY_PREFETCH_WORKERS = int(os.environ.get("RETRY_PREFETCH_WORKERS", "4"))
+RETRY_PROMPT_TTL = 60 * 60
+
+retry_prompts = load_state_store(ttl=RETRY_PROMPT_TTL)
+retry_prefetch_pool = ThreadPoolExecutor(max_workers=RETRY_PREFETCH_WORKERS, thread_name_prefix="retry-prefetch")
+_retry_inflight = {}  # prompt key -> Future
+_retry_inflight_lock = threading.Lock()
+
+# Fan-out for independent LLM calls inside one request (kept apart from the prefetch
+# queue so a burst of prefetches never delays a waiting candidate)
+request_llm_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="request-llm")
+
+RETRY_PERSONA_STYLES = {
+    "strict": "Maintain your strict, high-bar approach.",
+    "friendly": "Maintain your friendly, supportive approach.",
+    "neutral": "Maintain your professional, neutral approach."
+}
+
+
+def retry_prompt_key(retry_id, question_text):
+    return f"retry:{retry_id}:{hashlib.sha1(question_text.encode('utf-8')).hexdigest()[:16]}"
+
+
+def build_retry_messages(question_text, retry_context):
+    """Messages for rephrasing question_text, given the interview's role / persona / resume"""
+    role_info = JOB_ROLES[retry_context["role"]]
+    resume_text = retry_context.get("resume_text", "")
+    resume_summary = retry_context.get("resume_summary", {})
+
     resume_context = ""
-    if has_resume and resume_text:
-        resume_preview = resume_text[:1000]
+    if retry_context.get("resume_uploaded") and resume_text:
         if resume_summary:
             resume_context = f"Resume Context: {json.dumps(resume_summary, indent=2)}"
         else:
+            resume_preview = select_resume_context(resume_text, role_info["areas"], PREVIEW_TOKEN_BUDGET)
             resume_context = f"Resume Content: {resume_preview}"
-    
-    persona_styles = {
-        "strict": "Maintain your strict, high-bar approach.",
-        "friendly": "Maintain your friendly, supportive approach.",
-        "neutral": "Maintain your professional, neutral approach."
-    }
-    persona_context = persona_styles.get(persona, persona_styles["neutral"])
-    
+
+    persona_context = RETRY_PERSONA_STYLES.get(retry_context.get("persona"), RETRY_PERSONA_STYLES["neutral"])
+
     system_prompt = f"""
 You are an expert interviewer for a {role_info['name']} role.
 
@@ -1003,17 +1526,90 @@ The candidate wants to retry answering this question: "{question_text}"
 
 Ask this question again in a clear, supportive way. After they answer, provide brief feedback on their response.
 """
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Ask this question again: {question_text}"}
+    ]
+
+
+def _generate_retry_prompt(key, messages):
+    question = llm_complete("retry_question", messages)
+    retry_prompts.put(key, {"question": question})
+    return question
+
+
+def _forget_retry_prompt(key):
+    with _retry_inflight_lock:
+        _retry_inflight.pop(key, None)
+
+
+def prefetch_retry_prompts(retry_data):
+    """Queue background generation of a retry prompt for each retryable question"""
+    if not RETRY_PREFETCH or not retry_data.get("retry_id"):
+        return 0
+    queued = 0
+    for detail in retry_data.get("question_details", []):
+        question_text = detail.get("question")
+        if not detail.get("can_retry") or not question_text:
+            continue
+        key = retry_prompt_key(retry_data["retry_id"], question_text)
+        with _retry_inflight_lock:
+            if key in _retry_inflight:
+                continue
+            future = retry_prefetch_pool.submit(_generate_retry_prompt, key, build_retry_messages(question_text, retry_data))
+            _retry_inflight[key] = future
+        future.add_done_callback(lambda _, key=key: _forget_retry_prompt(key))
+        queued += 1
+    return queued
+
+
+def get_retry_prompt(question_text, retry_context):
+    """Prefetched prompt if there is one (waiting for it if it's in flight), else generate now"""
+    retry_id = retry_context.get("retry_id")
+    if not retry_id:
+        return llm_complete("retry_question", build_retry_messages(question_text, retry_context))
+
+    key = retry_prompt_key(retry_id, question_text)
+    cached, _ = retry_prompts.get(key)
+    if cached:
+        return cached["question"]
+    with _retry_inflight_lock:
+        future = _retry_inflight.get(key)
+    if future is not None:
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"Retry prefetch failed, generating inline: {e}")
+    return _generate_retry_prompt(key, build_retry_messages(question_text, retry_context))
+
+
+@app.route("/retry_question", methods=["POST"])
+@admission.limit("retry")
+def retry_question():
+    """Handle retry of a specific question"""
+    data = request.json
+    question_text = data.get("question_text")
+    
+    if not question_text:
+        return jsonify({"error": "Question text required"}), 400
+    
+    # Get data from session or request
+    retry_context = session.get("retry_data")
+    if not retry_context:
+        # Fallback: try to get from request or use defaults
+        retry_context = {
+            "role": data.get("role") or session.get("role"),
+            "persona": data.get("persona") or session.get("persona", "neutral"),
+            "resume_text": session.get("resume_text", ""),
+            "resume_summary": session.get("resume_summary", {}),
+            "resume_uploaded": session.get("resume_uploaded", False),
+        }
+    
+    if not retry_context.get("role") or retry_context["role"] not in JOB_ROLES:
+        return jsonify({"error": "Invalid role"}), 400
     
     try:
-        response = groq_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Ask this question again: {question_text}"}
-            ]
-        )
-        
-        retry_question = response.choices[0].message.content
+        retry_question = get_retry_prompt(question_text, retry_context)
         
         return jsonify({
             "question": retry_question,
@@ -1025,6 +1621,7 @@ Ask this question again in a clear, supportive way. After they answer, provide b
 
 
 @app.route("/submit_retry_answer", methods=["POST"])
+@admission.limit("retry")
 def submit_retry_answer():
     """Evaluate retry answer and update feedback"""
     data = request.json
@@ -1050,6 +1647,23 @@ def submit_retry_answer():
     
     role_info = JOB_ROLES[role]
     
+    # The prose feedback doesn't depend on the score, so both calls run at once
+    retry_feedback_prompt = f"""
+The candidate retried answering this question: "{original_question}"
+
+Their retry answer: "{answer}"
+
+Provide brief feedback (2-3 sentences) on their retry answer. Be constructive and specific.
+"""
+    feedback_future = request_llm_pool.submit(
+        llm_complete,
+        "retry_feedback",
+        [
+            {"role": "system", "content": "You are an interview evaluator providing constructive feedback."},
+            {"role": "user", "content": retry_feedback_prompt}
+        ]
+    )
+
     # Evaluate the retry answer
     performance_data = evaluate_answer_performance(answer, role_info)
     retry_score = performance_data["performance_score"]
@@ -1069,25 +1683,8 @@ def submit_retry_answer():
         else:
             session["question_details"] = question_details
     
-    # Generate feedback for the retry
-    retry_feedback_prompt = f"""
-The candidate retried answering this question: "{original_question}"
-
-Their retry answer: "{answer}"
-
-Provide brief feedback (2-3 sentences) on their retry answer. Be constructive and specific.
-"""
-    
     try:
-        response = groq_client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are an interview evaluator providing constructive feedback."},
-                {"role": "user", "content": retry_feedback_prompt}
-            ]
-        )
-        
-        retry_feedback = response.choices[0].message.content
+        retry_feedback = feedback_future.result()
         
         return jsonify({
             "retry_score": retry_score,
@@ -1099,11 +1696,252 @@ Provide brief feedback (2-3 sentences) on their retry answer. Be constructive an
         return jsonify({"error": f"Error generating retry feedback: {e}"}), 500
 
 
+# -------------------------------------
+# COACHING ANALYTICS
+# -------------------------------------
+
+def analytics_filters():
+    """(days, role, persona) from the query string, or an error response"""
+    try:
+        days = min(max(int(request.args.get("days", 30)), 1), 366)
+    except ValueError:
+        return None, (jsonify({"error": "days must be a number"}), 400)
+    role = request.args.get("role") or None
+    persona = request.args.get("persona") or None
+    if role is not None and role not in JOB_ROLES:
+        return None, (jsonify({"error": "Invalid role"}), 400)
+    return (days, role, persona), None
+
+
+def analytics_guard():
+    if analytics is None:
+        return jsonify({"error": "Analytics is disabled"}), 404
+    if not token_matches(request.headers.get("X-Analytics-Token"), ANALYTICS_TOKEN):
+        return jsonify({"error": "Analytics token required"}), 403
+    return None
+
+
+@app.route("/analytics")
+def analytics_dashboard():
+    return render_template("analytics.html", job_roles=JOB_ROLES)
+
+
+@app.route("/analytics/summary")
+def analytics_summary():
+    """Score distributions by role / persona and the cohort's weakest areas"""
+    denied = analytics_guard()
+    if denied:
+        return denied
+    filters, error = analytics_filters()
+    if error:
+        return error
+    days, role, persona = filters
+    return jsonify(analytics.summary(days, role, persona))
+
+
+@app.route("/analytics/trend")
+def analytics_trend():
+    """Interviews and mean score per hour or day"""
+    denied = analytics_guard()
+    if denied:
+        return denied
+    filters, error = analytics_filters()
+    if error:
+        return error
+    days, role, persona = filters
+    granularity = request.args.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": f"granularity must be one of {', '.join(GRANULARITIES)}"}), 400
+    return jsonify(analytics.trend(granularity, days, role, persona))
+
+
+# -------------------------------------
+# REQUEST PROFILING
+# -------------------------------------
+# Profiles live in each worker process; these routes report and export the profile
+# of whichever worker serves them (the pid is in the status and the file name).
+
+@app.route("/admin/profile", methods=["GET", "POST", "DELETE"])
+def admin_profile():
+    """Profiler status; POST {"sample_rate": 0.1} changes the rate, DELETE clears samples"""
+    if not token_matches(request.headers.get("X-Profiler-Token"), PROFILER_TOKEN):
+        return jsonify({"error": "Profiler token required"}), 403
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        try:
+            request_profiler.configure(float(data["sample_rate"]))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"error": "sample_rate must be a number between 0 and 1"}), 400
+    elif request.method == "DELETE":
+        request_profiler.reset()
+    return jsonify(request_profiler.status())
+
+
+@app.route("/admin/profile/<route>.<fmt>")
+def admin_profile_export(route, fmt):
+    """Sampled stacks of one profiled route (or 'all') as collapsed stacks or speedscope JSON"""
+    if not token_matches(request.headers.get("X-Profiler-Token"), PROFILER_TOKEN):
+        return jsonify({"error": "Profiler token required"}), 403
+    if fmt not in PROFILE_FORMATS:
+        return jsonify({"error": f"Unsupported format '{fmt}'"}), 404
+    if route != "all" and route not in request_profiler.endpoints:
+        return jsonify({"error": f"'{route}' is not profiled"}), 404
+
+    selected = None if route == "all" else route
+    if fmt == "collapsed":
+        body, extension = request_profiler.collapsed(selected), "txt"
+    else:
+        body, extension = json.dumps(request_profiler.speedscope(selected)), "speedscope.json"
+    response = Response(body, mimetype=PROFILE_FORMATS[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="profile-{route}-{os.getpid()}.{extension}"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
 @app.route("/reset_interview", methods=["POST"])
 def reset_interview():
+    delete_interview_checkpoint(session.get("interview_id"))
     session.clear()
     return jsonify({"success": True})
 
 
+if sock is not None:
+    @sock.route("/ws/interview")
+    def interview_channel(ws):
+        """Full-duplex interview channel: one connection carries every turn
+
+        Client -> server: {"type": "answer", "response": "..."} | {"type": "ping"}
+                          {"type": "audio_start", "sample_rate": 16000}, binary PCM frames,
+                          {"type": "audio_stop", "submit": true}
+        Server -> client: ready, score, token (streamed interviewer text), question
+        (same payload as /send_response), completed, error, pong, and for audio:
+        partial / transcript plus pause / resume flow control
+        """
+        def send(event_type, data):
+            ws.send(json.dumps(dict(data, type=event_type)))
+
+        if not session.get("interview_started") or not session.get("interview_id"):
+            send("error", {"error": "No active interview"})
+            return
+
+        # Pin the interview state to this connection for its lifetime
+        state = {key: session.get(key) for key in INTERVIEW_STATE_KEYS}
+        load_interview_checkpoint(state)
+        send("ready", {
+            "question_count": state.get("question_count", 0),
+            "total_questions": min(state.get("locked_goal_count") or state.get("dynamic_goal_count") or 6, 9)
+        })
+
+        caller_key = client_key(session)
+        caller_ip = admission.client_ip(request)
+
+        def answer(user_response):
+            # Turns over the channel share the HTTP turns' admission budget
+            wait = admission.try_acquire("interview", caller_key, caller_ip)
+            if wait:
+                seconds = retry_after_seconds(wait)
+                send("error", {"error": f"Too many requests - please wait {seconds}s and try again.", "retry_after": seconds})
+                return
+            try:
+                payload = run_interview_turn(state, user_response, emit=send)
+            except Exception as e:
+                send("error", {"error": f"Error generating response: {e}"})
+                return
+            finally:
+                admission.release("interview")
+
+            save_interview_checkpoint(state)
+            send("question", payload)
+            if payload["is_completed"]:
+                send("completed", {})
+
+        transcription = None
+        try:
+            while True:
+                # Poll while audio is being transcribed, otherwise wait for the next message
+                busy = transcription is not None and transcription.busy
+                message = ws.receive(timeout=POLL_INTERVAL if busy else None)
+
+                if transcription is not None:
+                    try:
+                        for event_type, data in transcription.poll():
+                            send(event_type, data)
+                    except SpeechError as e:
+                        transcription.close()
+                        transcription = None
+                        send("error", {"error": str(e)})
+
+                if message is None:
+                    continue
+
+                if isinstance(message, bytes):
+                    if transcription is None:
+                        send("error", {"error": "Send audio_start before audio"})
+                        continue
+                    try:
+                        for event_type, data in transcription.feed(message):
+                            send(event_type, data)
+                    except SpeechError as e:
+                        transcription.close()
+                        transcription = None
+                        send("error", {"error": str(e)})
+                    continue
+
+                try:
+                    data = json.loads(message)
+                except ValueError:
+                    send("error", {"error": "Invalid message"})
+                    continue
+
+                message_type = data.get("type")
+                if message_type == "ping":
+                    send("pong", {})
+                elif message_type == "answer":
+                    user_response = (data.get("response") or "").strip()
+                    if not user_response:
+                        send("error", {"error": "Empty response"})
+                        continue
+                    answer(user_response)
+                elif message_type == "audio_start":
+                    if not SPEECH_ENABLED:
+                        send("error", {"error": "Server speech recognition is not available"})
+                        continue
+                    if transcription is not None:
+                        transcription.close()
+                        transcription = None
+                    try:
+                        sample_rate = int(data.get("sample_rate") or 16000)
+                    except (TypeError, ValueError):
+                        sample_rate = 0
+                    if not 8000 <= sample_rate <= 48000:
+                        send("error", {"error": "sample_rate must be a number between 8000 and 48000"})
+                        continue
+                    try:
+                        transcription = TranscriptionStream(sample_rate)
+                    except SpeechError as e:
+                        transcription = None
+                        send("error", {"error": str(e)})
+                elif message_type == "audio_stop":
+                    if transcription is None:
+                        continue
+                    try:
+                        transcript = transcription.finish()
+                    except SpeechError as e:
+                        send("error", {"error": str(e)})
+                        continue
+                    finally:
+                        transcription.close()
+                        transcription = None
+                    send("transcript", {"text": transcript, "final": True})
+                    # The final transcript (after any typed prefix) goes straight into the normal turn path
+                    if data.get("submit") and transcript:
+                        answer(f"{data.get('prefix') or ''} {transcript}".strip())
+                else:
+                    send("error", {"error": "Unknown message type"})
+        finally:
+            if transcription is not None:
+                transcription.close()
+
+
 if __name__ == "__main__":
     app.run(port=5000, debug=True)
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+
+from flask import abort, request, send_from_directory, url_for
+
+# -------------------------------------
+# FINGERPRINTED STATIC ASSETS
+# -------------------------------------
+# Serves the bundles produced by build_assets.py. Templates call asset_url("script.js");
+# when a build exists it resolves to the content-hashed bundle under /assets/, otherwise
+# it falls back to the raw file under /static/ so development works without a build.
+# Bundles whose source changed since the build, and every bundle in debug mode, also
+# fall back to the raw file, so an edit is never hidden behind an old build.
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_PATH = os.path.join(DIST_DIR, "manifest.json")
+
+# Hashed filenames never change content, so browsers can cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Preferred order when the client accepts several encodings
+ENCODING_PREFERENCE = [("br", ".br"), ("gzip", ".gz")]
+
+MIMETYPES = {".js": "application/javascript", ".css": "text/css"}
+
+
+def load_manifest():
+    """Load static/dist/manifest.json, or {} when no build exists"""
+    try:
+        with open(MANIFEST_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def source_hash(name):
+    """sha256 of static/<name>, or None when it can't be read"""
+    try:
+        with open(os.path.join(STATIC_DIR, name), "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def drop_stale(manifest):
+    """Manifest without the bundles built from an older version of their source"""
+    fresh = {}
+    for name, entry in manifest.items():
+        if entry.get("source") and entry["source"] == source_hash(name):
+            fresh[name] = entry
+        else:
+            print(f"Static assets: dist bundle for {name} is stale, serving the raw file (run: python build_assets.py)")
+    return fresh
+
+
+def _accepted_encodings():
+    """Encodings from Accept-Encoding, minus any explicitly refused with q=0"""
+    accepted = set()
+    for part in request.headers.get("Accept-Encoding", "").split(","):
+        name, _, params = part.partition(";")
+        name = name.strip().lower()
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name)
+    return accepted
+
+
+def init_assets(app):
+    """Register asset_url() for templates and the /assets/<file> route"""
+    built = load_manifest()
+    manifest = drop_stale(built)
+    # Reverse index: hashed filename -> precompressed encodings available on disk
+    encodings_by_file = {entry["file"]: set(entry.get("encodings", [])) for entry in manifest.values()}
+
+    if not built:
+        print("Static assets: no build found, serving raw files (run: python build_assets.py)")
+
+    def asset_url(name):
+        entry = manifest.get(name)
+        # Debug mode serves the sources, so edits show up without a rebuild
+        if entry is None or app.debug:
+            return url_for("static", filename=name)
+        return url_for("dist_asset", filename=entry["file"])
+
+    app.jinja_env.globals["asset_url"] = asset_url
+
+    @app.route("/assets/<path:filename>")
+    def dist_asset(filename):
+        if filename not in encodings_by_file:
+            abort(404)
+
+        available = encodings_by_file[filename]
+        accepted = _accepted_encodings()
+        ext = os.path.splitext(filename)[1]
+
+        served_name = filename
+        content_encoding = None
+        for encoding, suffix in ENCODING_PREFERENCE:
+            if encoding in available and encoding in accepted:
+                served_name = filename + suffix
+                content_encoding = encoding
+                break
+
+        response = send_from_directory(DIST_DIR, served_name, mimetype=MIMETYPES.get(ext), max_age=31536000)
+        if content_encoding:
+            response.headers["Content-Encoding"] = content_encoding
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    return asset_url
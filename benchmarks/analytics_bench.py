@@ -0,0 +1,120 @@
+"""Coaching analytics: rollup queries vs scanning raw interview events.
+
+Writes a synthetic event log (roles x personas over the last --days days), then reports
+- initial build of the hourly / daily rollups from the log
+- incremental refresh after one more interview is recorded
+- dashboard query latency (summary + trend) from the rollups
+- the same summary computed by scanning every raw event, and that both agree
+
+Usage:
+    python benchmarks/analytics_bench.py [--interviews 100000] [--days 90] [--queries 50]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import analytics
+
+ROLES = ["software_engineer", "data_analyst", "product_manager", "marketing_specialist", "sales_representative"]
+PERSONAS = ["strict", "friendly", "neutral"]
+
+
+def synthetic_event(rng, now, days):
+    overall = min(max(rng.gauss(62, 15), 0), 100)
+    feedback = {"overall_score": round(overall)}
+    for category in analytics.CATEGORIES:
+        feedback[category] = {"score": min(max(round(rng.gauss(overall / 10, 1.5)), 0), 10), "feedback": ""}
+    answers = [round(min(max(rng.gauss(overall / 10, 2), 0), 10), 2) for _ in range(rng.randint(4, 9))]
+    ts = now - rng.random() * days * 86400
+    return analytics.interview_event(rng.choice(ROLES), rng.choice(PERSONAS), feedback, answers, ts=ts)
+
+
+def scan_summary(log_path, since, role=None):
+    """What a dashboard would do without rollups: read every event"""
+    count = scored = 0
+    total = 0.0
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            if event["ts"] < since or (role and event["role"] != role):
+                continue
+            count += 1
+            if event["overall_score"] is not None:
+                scored += 1
+                total += event["overall_score"]
+    return count, round(total / scored, 1) if scored else None
+
+
+def timed(call, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--interviews", type=int, default=100000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = time.time()
+    directory = tempfile.mkdtemp(prefix="analytics-bench-")
+    try:
+        store = analytics.Analytics(directory)
+        os.makedirs(directory, exist_ok=True)
+        with open(store.log_path, "w", encoding="utf-8") as f:
+            for _ in range(args.interviews):
+                f.write(json.dumps(synthetic_event(rng, now, args.days)) + "\n")
+        size_mb = os.path.getsize(store.log_path) / 1e6
+
+        start = time.perf_counter()
+        store.refresh()
+        build = time.perf_counter() - start
+        rows = {name: len(table.buckets) for name, table in store.tables.items()}
+        print(f"{args.interviews} interviews ({size_mb:.1f} MB log) -> rollup rows {rows}")
+        print(f"  initial build: {build:.2f}s ({args.interviews / build:,.0f} events/s)")
+
+        store.record(synthetic_event(rng, now, 1))
+        _, refresh_ms = timed(store.refresh, 1)
+        print(f"  incremental refresh after one new interview: {refresh_ms:.2f} ms")
+
+        since = now - 30 * 86400
+        since -= since % 86400
+        summary, summary_ms = timed(lambda: store.summary(30, now=now), args.queries)
+        _, role_ms = timed(lambda: store.summary(30, role="data_analyst", now=now), args.queries)
+        _, trend_ms = timed(lambda: store.trend("day", 30, now=now), args.queries)
+        _, hourly_ms = timed(lambda: store.trend("hour", 7, now=now), args.queries)
+        (scan_count, scan_mean), scan_ms = timed(lambda: scan_summary(store.log_path, since), 3)
+
+        print(f"\n{'query':<34} {'median ms':>10}")
+        print(f"{'rollup summary (30d, all)':<34} {summary_ms:>10.2f}")
+        print(f"{'rollup summary (30d, one role)':<34} {role_ms:>10.2f}")
+        print(f"{'rollup trend (30d, daily)':<34} {trend_ms:>10.2f}")
+        print(f"{'rollup trend (7d, hourly)':<34} {hourly_ms:>10.2f}")
+        print(f"{'raw scan summary (30d, all)':<34} {scan_ms:>10.2f}")
+
+        cohort = summary["cohort"]
+        agree = cohort["interviews"] == scan_count and cohort["mean_score"] == scan_mean
+        print(f"\nrollup: {cohort['interviews']} interviews, mean {cohort['mean_score']}; "
+              f"scan: {scan_count} interviews, mean {scan_mean} -> {'agree' if agree else 'MISMATCH'}")
+        print("weakest areas: " + ", ".join(f"{a['category']} {a['mean']}" for a in summary["weakest_areas"]))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Final-turn cost: full completion vs early-terminated closing vs templated closing.
+
+Sends the same final interview turn through the configured LLM routes in each
+conclusion mode and reports latency and generated characters (~tokens = chars / 4).
+
+    off       full free-form streamed completion on the "next_question" route (the old behaviour)
+    stream    "closing" route with max_tokens + stop sequences, cut at the first closing
+    template  persona closing, no LLM call
+
+Usage:
+    python benchmarks/conclusion_bench.py [--runs 5] [--persona neutral]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+ROLE_INFO = app.JOB_ROLES["software_engineer"]
+PERSONA_CONTEXT = "Maintain your professional, neutral approach. Be balanced and objective."
+
+HISTORY = [
+    {"role": "assistant", "content": "Tell me about your background and a project you're proud of."},
+    {"role": "user", "content": "I have three years of backend experience, mostly Python services and PostgreSQL."},
+    {"role": "assistant", "content": "How would you design a cache for a read-heavy API?"},
+    {"role": "user", "content": "Caching with a TTL and explicit invalidation on writes, plus request coalescing."},
+]
+
+
+def final_turn_messages(turn_context):
+    return (
+        [{"role": "system", "content": app.build_interviewer_prefix(ROLE_INFO, PERSONA_CONTEXT)}]
+        + HISTORY
+        + [{"role": "system", "content": turn_context}]
+    )
+
+
+def run_off():
+    context = app.build_turn_context(
+        3, "The candidate is performing at an average level.", "Ask balanced questions covering core concepts.", True, False
+    )
+    return "".join(app.llm_router.stream("next_question", final_turn_messages(context)))
+
+
+def run_mode(mode, persona):
+    app.CONCLUSION_MODE = mode
+    return app.generate_closing(final_turn_messages(app.build_conclusion_context()), persona)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--persona", default="neutral", choices=sorted(app.CLOSING_TEMPLATES))
+    args = parser.parse_args()
+
+    modes = {
+        "off": run_off,
+        "stream": lambda: run_mode("stream", args.persona),
+        "template": lambda: run_mode("template", args.persona),
+    }
+
+    print(f"{'mode':<9} {'median ms':>10} {'max ms':>8} {'chars':>7}")
+    for name, run in modes.items():
+        latencies, lengths = [], []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            text = run()
+            latencies.append((time.perf_counter() - start) * 1000)
+            lengths.append(len(text))
+        print(f"{name:<9} {statistics.median(latencies):>10.0f} {max(latencies):>8.0f} {statistics.mean(lengths):>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
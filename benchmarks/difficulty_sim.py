@@ -0,0 +1,173 @@
+"""Synthetic-candidate simulation for the adaptive difficulty engine.
+
+Runs thousands of simulated interviews (each candidate has a true skill level, answer
+noise and a drift over the interview) through the legacy goal logic (mean of all
+scores, fixed thresholds, goal locked after the first answer) and through
+difficulty.py (O(1) running stats + lookup tables), and reports:
+
+- interview length distribution overall and per true-skill band
+- how often the final difficulty tier matches the candidate's true band at that point
+  (skill plus drift, so an engine that follows improving / slipping candidates scores higher)
+- per-answer decision cost
+
+Usage:
+    python benchmarks/difficulty_sim.py [--candidates 5000] [--seed 7] [--tables difficulty_tables.json]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import difficulty
+
+BANDS = [("struggling", 0.0, 4.0), ("average", 4.0, 7.0), ("strong", 7.0, 10.1)]
+
+
+def band_of(skill):
+    for index, (_, low, high) in enumerate(BANDS):
+        if low <= skill < high:
+            return index
+    return len(BANDS) - 1
+
+
+def make_candidates(count, seed):
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(count):
+        skill = min(max(rng.gauss(5.5, 2.0), 0.5), 9.8)
+        candidates.append({
+            "skill": skill,
+            "noise": rng.uniform(0.5, 2.5),
+            "drift": rng.gauss(0.0, 0.3),
+            "seed": rng.random(),
+        })
+    return candidates
+
+
+def answer_scores(candidate):
+    """Deterministic score stream for a candidate (same answers for both engines)"""
+    rng = random.Random(candidate["seed"])
+    turn = 0
+    while True:
+        mean = candidate["skill"] + candidate["drift"] * turn
+        yield round(min(max(rng.gauss(mean, candidate["noise"]), 0.0), 10.0), 2)
+        turn += 1
+
+
+# -------------------------------------
+# LEGACY LOGIC (before the engine)
+# -------------------------------------
+
+def legacy_goal(performance_history, rng):
+    avg = sum(performance_history) / len(performance_history)
+    if avg >= 7.0:
+        goal = 4 if avg >= 8.0 else 5
+    elif avg >= 4.0:
+        goal = 6 if avg < 5.5 else 7
+    elif avg >= 3.0:
+        goal = 7
+    else:
+        goal = rng.choice([8, 9])
+    return min(goal, 9)
+
+
+def legacy_tier(performance_history):
+    avg = sum(performance_history) / len(performance_history)
+    return 2 if avg >= 7.0 else 1 if avg >= 4.0 else 0
+
+
+def run_legacy(candidate, rng):
+    scores = answer_scores(candidate)
+    history = []
+    question_count = 1
+    locked = None
+    decision_time = 0.0
+    while True:
+        history.append(next(scores))
+        start = time.perf_counter()
+        goal = locked if locked is not None else legacy_goal(history, rng)
+        locked = goal  # locked after the first answer
+        tier = legacy_tier(history)
+        decision_time += time.perf_counter() - start
+        next_question = question_count + 1
+        if (next_question >= goal and question_count >= 3) or next_question >= 9:
+            return next_question, tier, decision_time, len(history)
+        question_count = next_question
+
+
+def run_engine(candidate, tables):
+    scores = answer_scores(candidate)
+    stats = None
+    question_count = 1
+    locked = None
+    decision_time = 0.0
+    while True:
+        score = next(scores)
+        start = time.perf_counter()
+        stats = difficulty.update_stats(stats, score)
+        if locked is not None:
+            goal = locked
+        else:
+            goal = min(max(difficulty.decide_goal_count(stats, tables), question_count + 1), difficulty.MAX_GOAL)
+            if question_count + 1 >= goal - 1:
+                locked = goal
+        tier = difficulty.decide_tier(stats, tables)
+        decision_time += time.perf_counter() - start
+        next_question = question_count + 1
+        if (next_question >= goal and question_count >= 3) or next_question >= 9:
+            return next_question, tier, decision_time, stats["n"]
+        question_count = next_question
+
+
+def current_skill(candidate, answers):
+    return candidate["skill"] + candidate["drift"] * (answers - 1)
+
+
+def summarize(name, candidates, results):
+    lengths = [length for length, _, _, _ in results]
+    decisions = sum(answers for _, _, _, answers in results)
+    cost_ns = sum(t for _, _, t, _ in results) / decisions * 1e9
+    matches = sum(
+        1 for c, (_, tier, _, answers) in zip(candidates, results)
+        if tier == band_of(current_skill(c, answers))
+    )
+
+    print(f"\n{name}")
+    print(f"  questions: mean {statistics.mean(lengths):.2f}  stdev {statistics.pstdev(lengths):.2f}  "
+          f"min {min(lengths)}  max {max(lengths)}")
+    histogram = Counter(lengths)
+    print("  length distribution: " + "  ".join(
+        f"{length}:{100 * histogram[length] / len(lengths):.1f}%" for length in sorted(histogram)
+    ))
+    for index, (band, _, _) in enumerate(BANDS):
+        band_lengths = [r[0] for c, r in zip(candidates, results) if band_of(c["skill"]) == index]
+        if band_lengths:
+            print(f"  {band:<11} n={len(band_lengths):<5} mean questions {statistics.mean(band_lengths):.2f}")
+    print(f"  final tier matches true band: {100 * matches / len(results):.1f}%")
+    print(f"  decision cost: {cost_ns:.0f} ns per answer")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--tables", help="calibrated tables file (default: difficulty.py's tables)")
+    args = parser.parse_args()
+
+    tables = difficulty.load_tables(args.tables) if args.tables else difficulty.TABLES
+    candidates = make_candidates(args.candidates, args.seed)
+
+    legacy_rng = random.Random(args.seed)
+    summarize("legacy (mean + fixed thresholds, random 8/9)", candidates,
+              [run_legacy(candidate, legacy_rng) for candidate in candidates])
+    summarize("engine (running stats + lookup tables)", candidates,
+              [run_engine(candidate, tables) for candidate in candidates])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Resume parser isolation: hostile PDFs vs the supervised document pool.
+
+Builds a few synthetic documents and parses each through document_pool.DocumentPool:
+- a normal one-page resume PDF and a TXT resume
+- a decompression bomb (a small file whose page content inflates to --bomb-mb MB)
+- a CPU bomb (a page with millions of tiny text operators)
+- a file that isn't a PDF at all
+
+Each hostile document must fail with ParseError by hitting a limit in its parser
+process, the serving process's peak RSS must stay flat, and normal documents must
+still parse afterwards on replacement parsers.
+
+Usage:
+    python benchmarks/document_pool_check.py [--memory-mb 256] [--cpu-seconds 3] [--bomb-mb 1024]
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_pool import DocumentPool, ParseError
+
+RESUME_TEXT = [
+    "Jordan Lee - Backend Engineer",
+    "Skills: Python, PostgreSQL, Redis, Kubernetes",
+    "Experience: 4 years building payment APIs",
+]
+
+
+def build_pdf(content_stream):
+    """Minimal one-page PDF whose page content is the given (Flate-compressed) stream"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content_stream) + content_stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def resume_pdf():
+    lines = b"".join(b"BT /F1 12 Tf 72 %d Td (%s) Tj ET\n" % (720 - 20 * i, line.encode()) for i, line in enumerate(RESUME_TEXT))
+    return build_pdf(zlib.compress(lines))
+
+
+def decompression_bomb(megabytes):
+    compressor = zlib.compressobj(9)
+    chunk = b" " * (1024 * 1024)
+    data = compressor.compress(b"BT /F1 12 Tf 72 720 Td (") + b"".join(compressor.compress(chunk) for _ in range(megabytes))
+    return build_pdf(data + compressor.compress(b") Tj ET\n") + compressor.flush())
+
+
+def cpu_bomb(operators):
+    compressor = zlib.compressobj(9)
+    data = compressor.compress(b"BT /F1 1 Tf\n")
+    op = b"(x) Tj 0.1 0 Td\n" * 1000
+    data += b"".join(compressor.compress(op) for _ in range(operators // 1000))
+    return build_pdf(data + compressor.compress(b"ET\n") + compressor.flush())
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--memory-mb", type=int, default=256)
+    parser.add_argument("--cpu-seconds", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=20)
+    parser.add_argument("--bomb-mb", type=int, default=1024, help="inflated size of the decompression bomb")
+    parser.add_argument("--cpu-bomb-ops", type=int, default=3_000_000)
+    args = parser.parse_args()
+
+    documents = [
+        ("resume.pdf", resume_pdf(), True),
+        ("resume.txt", "\n".join(RESUME_TEXT).encode(), True),
+        ("bomb.pdf", decompression_bomb(args.bomb_mb), False),
+        ("resume.pdf", resume_pdf(), True),
+        ("spin.pdf", cpu_bomb(args.cpu_bomb_ops), False),
+        ("garbage.pdf", os.urandom(64 * 1024), False),
+        ("resume.pdf", resume_pdf(), True),
+    ]
+
+    workdir = tempfile.mkdtemp(prefix="document-pool-check-")
+    failures = 0
+    rss_before = peak_rss_mb()
+    with DocumentPool(workers=1, memory_mb=args.memory_mb, cpu_seconds=args.cpu_seconds,
+                      timeout=args.timeout, max_tasks=3) as pool:
+        print(f"{'document':<14} {'size':>9} {'ms':>8}  result")
+        for index, (filename, content, should_parse) in enumerate(documents):
+            # Spool to disk like /upload_resume does; the parser reads it by path
+            path = os.path.join(workdir, f"{index}-{filename}")
+            with open(path, "wb") as f:
+                f.write(content)
+            start = time.perf_counter()
+            try:
+                text = pool.extract(filename, path=path)
+                result, parsed = f"parsed, {len(text)} chars", True
+            except ParseError as e:
+                result, parsed = f"ParseError: {e}", False
+            elapsed = (time.perf_counter() - start) * 1000
+            ok = parsed == should_parse
+            failures += not ok
+            print(f"{filename:<14} {len(content) / 1024:>7.0f}KB {elapsed:>8.0f}  {result}{'' if ok else '  <-- UNEXPECTED'}")
+            os.remove(path)
+        stats = dict(pool.stats)
+    os.rmdir(workdir)
+
+    rss_after = peak_rss_mb()
+    print(f"\npool stats: {stats}")
+    print(f"serving process peak RSS: {rss_before:.0f} MB before, {rss_after:.0f} MB after")
+    if rss_after - rss_before > 50:
+        failures += 1
+        print("  <-- serving process grew")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Request profiler overhead: per-request latency with profiling off, sampled and always on.
+
+Serves a small Flask app whose /send_response route does a few ms of JSON and string
+work (prompt building, payload round trips) through the test client, and reports the
+median latency at sample rate 0 (the profiler's wrapper is removed, so this is the
+unprofiled app), 0.1 and 1.0 (every request sampled every --interval-ms). Modes are
+interleaved over several rounds so drift doesn't show up as overhead. Then it prints
+the heaviest collapsed stacks so the export can be eyeballed.
+
+Usage:
+    python benchmarks/profiler_overhead_bench.py [--requests 1000] [--rounds 5] [--interval-ms 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify, request
+
+from profiler import RequestProfiler
+
+
+def build_app():
+    app = Flask(__name__)
+
+    @app.route("/send_response", methods=["POST"])
+    def send_response():
+        history = request.json["history"]
+        prompt = "\n".join(f"{turn['role']}: {turn['content']}" for turn in history * 200)
+        payload = json.loads(json.dumps({"prompt": prompt, "history": history * 200}))
+        return jsonify({"chars": len(payload["prompt"])})
+
+    return app
+
+
+def measure(client, body, requests):
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.post("/send_response", json=body)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000, help="per mode")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--interval-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    app = build_app()
+    client = app.test_client()
+    body = {"history": [{"role": "assistant", "content": "Tell me about a system you designed. " * 5},
+                        {"role": "user", "content": "I designed a payments API with idempotency keys. " * 5}]}
+    measure(client, body, 100)  # warm up
+
+    profiler = RequestProfiler(app, endpoints=["send_response"], interval_ms=args.interval_ms)
+    rates = (0, 0.1, 1.0)
+    samples = {rate: [] for rate in rates}
+    for _ in range(args.rounds):
+        for rate in rates:
+            profiler.configure(rate)
+            samples[rate].extend(measure(client, body, args.requests // args.rounds))
+    profiler.configure(0)
+
+    baseline = statistics.median(samples[0])
+    print(f"{'mode':<28} {'median ms':>10} {'overhead':>9}")
+    for rate in rates:
+        median = statistics.median(samples[rate])
+        label = "sample rate 0 (off)" if rate == 0 else f"sample rate {rate}"
+        print(f"{label:<28} {median:>10.3f} {(median / baseline - 1) * 100:>8.1f}%")
+
+    status = profiler.status()["routes"]["send_response"]
+    print(f"\nsampled {status['requests']} requests, {status['samples']} stack samples, {status['stacks']} distinct stacks")
+    print("heaviest stacks (leaf frames):")
+    lines = profiler.collapsed("send_response").splitlines()[:5]
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        print(f"  {count:>5}  ...;{';'.join(stack.split(';')[-3:])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Prompt-prefix reuse harness for follow-up turns.
+
+Replays a scripted interview through the old prompt layout (volatile values at the top
+of the system prompt) and the current one (stable prefix + transcript + late turn
+context), and reports how much of each request is shared with the previous turn's
+request - the part a prompt/KV cache can reuse.
+
+With --live it also streams every turn through the configured "next_question" LLM
+route and reports time to first token for both layouts.
+
+Usage:
+    python benchmarks/prompt_prefix_bench.py [--turns 8] [--live]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+
+ROLE_INFO = app.JOB_ROLES["software_engineer"]
+PERSONA_CONTEXT = "Maintain your professional, neutral approach. Be balanced and objective."
+
+ANSWERS = [
+    "I have three years of backend experience, mostly Python services and PostgreSQL.",
+    "I would use a hash map to count occurrences, which gives linear time overall.",
+    "Not sure, maybe a queue?",
+    "A load balancer spreads requests across instances and health checks remove bad ones.",
+    "I'd shard by user id and keep a lookup service for rebalancing.",
+    "I write tests first for tricky logic and rely on code review for the rest.",
+    "Binary search halves the range every step, so it's O(log n).",
+    "Caching with a TTL and explicit invalidation on writes.",
+]
+SCORES = [6.5, 7.5, 3.0, 7.0, 8.0, 6.0, 7.5, 6.5]
+
+
+def difficulty_for(avg_performance):
+    if avg_performance >= 7.0:
+        return ("The candidate is performing very well and has demonstrated strong knowledge. Ask a few deeper, challenging questions to confirm their expertise, then conclude efficiently.",
+                "Ask deeper, more challenging questions. Since they're doing well, you can wrap up sooner after confirming their strong performance.")
+    if avg_performance >= 4.0:
+        return ("The candidate is performing at an average level. Maintain moderate difficulty. Balance fundamentals with some depth.",
+                "Ask balanced questions covering core concepts.")
+    return ("The candidate is struggling. Simplify questions and be supportive. Give them more opportunities to demonstrate their knowledge. Focus on fundamentals and basic concepts.",
+            "Ask simpler, more encouraging questions. Provide more questions to give them chances to show what they know.")
+
+
+def legacy_messages(history, question_number, difficulty_context, question_style, should_conclude):
+    """The pre-restructuring layout: per-turn values interpolated near the top"""
+    system_prompt = f"""
+You are an expert interviewer for a {ROLE_INFO['name']} role.
+Key areas: {', '.join(ROLE_INFO['areas'])}
+
+{PERSONA_CONTEXT}
+
+
+
+Current context:
+- This is question #{question_number}
+- {difficulty_context}
+- {question_style}
+
+Your behavior:
+- Adapt naturally to the candidate's performance level while maintaining your interview persona
+- Never mention question counts, difficulty levels, or adaptive rules to the candidate
+- Behave like a human interviewer adjusting naturally
+- If they answer well, ask follow-up questions that go deeper
+- If they struggle, simplify and provide encouragement (but maintain your persona style)
+- Stay professional and role-specific
+- ALWAYS ask a question - never end abruptly without asking something
+- {"CRITICAL AND MANDATORY: This is the ABSOLUTE FINAL question." if should_conclude else "Continue with another question after they respond, but be mindful that the interview has a fixed length."}
+- NEVER end the interview in the middle of asking a question
+- Always give the candidate a chance to respond before concluding
+- CRITICAL: When instructed to conclude, you MUST conclude immediately - do NOT continue asking questions for any reason, including resume topics
+- The interview length is FIXED and cannot be extended, regardless of how much resume information is available
+"""
+    return [{"role": "system", "content": system_prompt}] + history
+
+
+def current_messages(history, question_number, difficulty_context, question_style, should_conclude):
+    return (
+        [{"role": "system", "content": app.build_interviewer_prefix(ROLE_INFO, PERSONA_CONTEXT)}]
+        + history
+        + [{"role": "system", "content": app.build_turn_context(
+            question_number, difficulty_context, question_style, should_conclude, False
+        )}]
+    )
+
+
+LAYOUTS = {"before": legacy_messages, "after": current_messages}
+
+
+def scripted_requests(build_messages, turns):
+    """Yield the messages list sent on each follow-up turn of the scripted interview"""
+    history = [{"role": "assistant", "content": "Tell me about your background and a project you're proud of."}]
+    scores = []
+    for turn in range(turns):
+        history.append({"role": "user", "content": ANSWERS[turn % len(ANSWERS)]})
+        scores.append(SCORES[turn % len(SCORES)])
+        difficulty_context, question_style = difficulty_for(sum(scores) / len(scores))
+        messages = build_messages(history, turn + 2, difficulty_context, question_style, turn == turns - 1)
+        reply = yield messages
+        history.append({"role": "assistant", "content": reply or f"Scripted follow-up question #{turn + 2}?"})
+
+
+def shared_prefix_chars(a, b):
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def serialize(messages):
+    # Approximates what the provider tokenizes: role markers + contents, in order
+    return "".join(f"<|{m['role']}|>{m['content']}" for m in messages)
+
+
+def measure_prefix_sharing(turns):
+    results = {}
+    for name, build in LAYOUTS.items():
+        previous = None
+        shared, totals = [], []
+        generator = scripted_requests(build, turns)
+        messages = next(generator)
+        while True:
+            text = serialize(messages)
+            if previous is not None:
+                shared.append(shared_prefix_chars(previous, text))
+                totals.append(len(text))
+            previous = text
+            try:
+                messages = generator.send(None)
+            except StopIteration:
+                break
+        results[name] = (shared, totals)
+    return results
+
+
+def measure_ttft(turns):
+    results = {}
+    for name, build in LAYOUTS.items():
+        ttfts = []
+        generator = scripted_requests(build, turns)
+        messages = next(generator)
+        while True:
+            start = time.perf_counter()
+            first = None
+            parts = []
+            for delta in app.llm_router.stream("next_question", messages):
+                if first is None:
+                    first = time.perf_counter() - start
+                parts.append(delta)
+            ttfts.append((first or 0.0) * 1000)
+            try:
+                messages = generator.send("".join(parts))
+            except StopIteration:
+                break
+        results[name] = ttfts
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=8)
+    parser.add_argument("--live", action="store_true", help="also measure time to first token against the live LLM route")
+    args = parser.parse_args()
+
+    print("Shared prefix with the previous turn's request (chars, ~tokens = chars / 4)")
+    print(f"{'layout':<8} {'mean shared':>12} {'mean request':>13} {'reuse %':>8}")
+    for name, (shared, totals) in measure_prefix_sharing(args.turns).items():
+        mean_shared = statistics.mean(shared)
+        mean_total = statistics.mean(totals)
+        print(f"{name:<8} {mean_shared:>12.0f} {mean_total:>13.0f} {100 * mean_shared / mean_total:>7.1f}%")
+
+    if args.live:
+        print("\nTime to first token (ms)")
+        for name, ttfts in measure_ttft(args.turns).items():
+            print(f"{name:<8} median {statistics.median(ttfts):.0f}  p90 {sorted(ttfts)[int(0.9 * (len(ttfts) - 1))]:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Worker boot benchmark: cold `import app` time and time to first `/` response.
+
+Each sample runs in a fresh interpreter so nothing is cached between runs.
+
+Usage:
+    python benchmarks/startup_bench.py [--runs 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs inside the child interpreter; prints "<import_ms> <first_response_ms>"
+CHILD_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+response = app.app.test_client().get("/")
+t2 = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(f"{(t1 - t0) * 1000:.2f} {(t2 - t0) * 1000:.2f}")
+"""
+
+MODES = {
+    "lazy (default)": {},
+    "warm start": {"WARM_START": "1"},
+}
+
+
+def run_sample(extra_env):
+    env = dict(os.environ)
+    env.pop("WARM_START", None)
+    env.setdefault("GROQ_API_KEY", "bench-key")
+    env.update(extra_env)
+    output = subprocess.check_output([sys.executable, "-c", CHILD_SCRIPT], cwd=ROOT, env=env, text=True)
+    import_ms, first_ms = output.strip().splitlines()[-1].split()
+    return float(import_ms), float(first_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'mode':<16} {'import ms (median)':>20} {'first / ms (median)':>22}")
+    for name, extra_env in MODES.items():
+        samples = [run_sample(extra_env) for _ in range(args.runs)]
+        import_ms = statistics.median(s[0] for s in samples)
+        first_ms = statistics.median(s[1] for s in samples)
+        print(f"{name:<16} {import_ms:>20.1f} {first_ms:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Multi-worker check for stateless worker mode.
+
+Starts a stub OpenAI-compatible LLM and N app worker processes on separate ports, all
+sharing one SQLite STATE_STORE with STATELESS_WORKERS=1, then runs complete interviews
+(resume upload, start, every turn, feedback, retry) with each request sent to the next
+worker round-robin. Every interview must finish with a consistent state no matter which
+worker served which step.
+
+It also fires pairs of concurrent answers for the same interview at two different
+workers: optimistic versioning must let exactly one through (the other gets a 409)
+and the interview must advance by exactly one question.
+
+Usage:
+    python benchmarks/stateless_workers_check.py [--workers 3] [--interviews 12] [--llm-latency 0.05]
+"""
+import argparse
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RESUME = b"""Jordan Lee
+Backend engineer
+Skills: Python, PostgreSQL, Redis, Kubernetes
+Experience: 4 years building payment APIs; led a migration to event-driven services
+"""
+
+ANSWERS = [
+    "I have four years of backend experience, mostly Python services with PostgreSQL and Redis.",
+    "I would put a cache in front of the read path, with a TTL and invalidation on writes.",
+    "Not sure, maybe a queue?",
+    "Health checks take failing instances out of the load balancer until they recover.",
+    "Shard by account id and keep a small lookup service so shards can be rebalanced.",
+    "I write tests first for tricky logic and rely on review and canaries for the rest.",
+    "Binary search halves the range each step, so lookups are O(log n).",
+    "Idempotency keys on the API, stored with the result, make retries safe.",
+    "I profile first, then fix the hottest path and measure again.",
+]
+
+
+# -------------------------------------
+# STUB LLM
+# -------------------------------------
+
+def stub_reply(messages):
+    system = messages[0]["content"]
+    if "answer evaluator" in system:
+        return '{"clarity": 6, "technical_depth": 5, "confidence": 6}'
+    if "interview evaluator. Always" in system:
+        return json.dumps({
+            "overall_score": 64,
+            "communication": {"score": 7, "feedback": "Clear and structured."},
+            "technical_depth": {"score": 6, "feedback": "Solid fundamentals."},
+            "clarity": {"score": 6, "feedback": "Mostly concise."},
+            "confidence": {"score": 6, "feedback": "Steady."},
+            "strengths": ["Practical experience"],
+            "areas_for_improvement": ["Go deeper on trade-offs"],
+            "recommendations": ["Practice system design"],
+        })
+    if "resume parser" in system:
+        return '{"name": "Jordan Lee", "skills": ["Python", "PostgreSQL"]}'
+    if "constructive feedback" in system:
+        return "A clearer answer with a concrete example."
+    if "retry answering" in system:
+        return "Let's try that one again - take your time."
+    return f"Question {len(messages)}: how would you approach this problem?"
+
+
+def start_stub_llm(latency):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            text = stub_reply(body["messages"])
+            time.sleep(latency)
+            if body.get("stream"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+                for word in text.split(" "):
+                    chunk = {"choices": [{"delta": {"content": word + " "}}]}
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+            else:
+                out = json.dumps({"choices": [{"message": {"role": "assistant", "content": text}}]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# -------------------------------------
+# WORKERS
+# -------------------------------------
+
+def start_workers(count, base_port, env):
+    processes = []
+    for index in range(count):
+        port = base_port + index
+        code = f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"
+        processes.append(subprocess.Popen(
+            [sys.executable, "-c", code], cwd=REPO_ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ))
+    urls = [f"http://127.0.0.1:{base_port + index}" for index in range(count)]
+    deadline = time.time() + 60
+    for url in urls:
+        while True:
+            try:
+                requests.get(url + "/", timeout=1)
+                break
+            except requests.ConnectionError:
+                if time.time() > deadline:
+                    raise RuntimeError(f"worker {url} did not start")
+                time.sleep(0.2)
+    return processes, urls
+
+
+class RoundRobin:
+    def __init__(self, urls):
+        self.urls = urls
+        self._next = 0
+        self._lock = threading.Lock()
+        self.served = Counter()
+
+    def pick(self):
+        with self._lock:
+            url = self.urls[self._next % len(self.urls)]
+            self._next += 1
+            self.served[url] += 1
+        return url
+
+
+# -------------------------------------
+# SCENARIOS
+# -------------------------------------
+
+def timed(latencies, route, call):
+    start = time.perf_counter()
+    response = call()
+    latencies[route].append((time.perf_counter() - start) * 1000)
+    return response
+
+
+def run_interview(index, balancer, latencies):
+    """One full interview, every request on the next worker; returns a list of problems"""
+    client = requests.Session()
+    problems = []
+
+    def post(route, **kwargs):
+        return timed(latencies, route, lambda: client.post(balancer.pick() + "/" + route, timeout=30, **kwargs))
+
+    r = post("upload_resume", files={"resume": (f"cv{index}.txt", RESUME)})
+    if r.status_code != 200:
+        return [f"upload_resume {r.status_code}"]
+
+    r = post("start_interview", json={"role": "software_engineer", "persona": "neutral"})
+    if r.status_code != 200:
+        return [f"start_interview {r.status_code}"]
+    question_count = r.json()["question_count"]
+
+    for answer in ANSWERS:
+        r = post("send_response", json={"response": answer})
+        if r.status_code != 200:
+            problems.append(f"send_response {r.status_code} {r.text[:80]}")
+            break
+        payload = r.json()
+        if payload["question_count"] != question_count + 1:
+            problems.append(f"question_count went {question_count} -> {payload['question_count']}")
+        question_count = payload["question_count"]
+        if payload.get("is_completed"):
+            break
+
+    r = post("get_feedback")
+    if r.status_code != 200:
+        return problems + [f"get_feedback {r.status_code} {r.text[:80]}"]
+    feedback = r.json()
+    if len(feedback.get("question_details", [])) != question_count - 1:
+        problems.append(f"feedback has {len(feedback.get('question_details', []))} answers, expected {question_count - 1}")
+
+    retryable = [q for q in feedback.get("question_details", []) if q.get("can_retry")]
+    if retryable:
+        r = post("retry_question", json={"question_index": 0, "question_text": retryable[0]["question"]})
+        if r.status_code != 200:
+            problems.append(f"retry_question {r.status_code}")
+        r = post("submit_retry_answer", json={
+            "question_index": 0, "answer": ANSWERS[0], "original_question": retryable[0]["question"],
+        })
+        if r.status_code != 200:
+            problems.append(f"submit_retry_answer {r.status_code}")
+    return problems
+
+
+def run_race(balancer):
+    """Two answers for the same interview at once, on two workers; returns (statuses, advanced_by)"""
+    client = requests.Session()
+    r = client.post(balancer.pick() + "/start_interview", json={"role": "software_engineer", "persona": "neutral"}, timeout=30)
+    start_count = r.json()["question_count"]
+
+    barrier = threading.Barrier(2)
+
+    def answer(url):
+        barrier.wait()
+        return client.post(url + "/send_response", json={"response": ANSWERS[1]}, timeout=30)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(pool.map(answer, [balancer.pick(), balancer.pick()]))
+    statuses = sorted(r.status_code for r in responses)
+
+    r = client.post(balancer.pick() + "/send_response", json={"response": ANSWERS[3]}, timeout=30)
+    advanced_by = r.json()["question_count"] - 1 - start_count if r.status_code == 200 else None
+    return statuses, advanced_by
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3)
+    parser.add_argument("--interviews", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4, help="interviews in flight at once")
+    parser.add_argument("--races", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per stub LLM call")
+    parser.add_argument("--base-port", type=int, default=5610)
+    args = parser.parse_args()
+
+    stub = start_stub_llm(args.llm_latency)
+    workdir = tempfile.mkdtemp(prefix="stateless-check-")
+    env = dict(
+        os.environ,
+        STATELESS_WORKERS="1",
+        STATE_STORE=f"sqlite:///{os.path.join(workdir, 'state.db')}",
+        SESSION_SECRET=secrets.token_hex(32),
+        LLM_OFFLINE="1",
+        LOCAL_LLM_BASE_URL=f"http://127.0.0.1:{stub.server_address[1]}/v1",
+        ADMISSION_CONTROL="0",
+        REPORT_DIR=os.path.join(workdir, "reports"),
+        CANDIDATE_STORE_DIR=os.path.join(workdir, "candidates"),
+    )
+    env.pop("LLM_REPLAY", None)
+    env.pop("LLM_RECORD", None)
+
+    processes, urls = start_workers(args.workers, args.base_port, env)
+    failures = 0
+    try:
+        balancer = RoundRobin(urls)
+        latencies = defaultdict(list)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(lambda i: run_interview(i, balancer, latencies), range(args.interviews)))
+        elapsed = time.perf_counter() - started
+
+        print(f"{args.interviews} interviews across {args.workers} workers in {elapsed:.1f}s")
+        for index, problems in enumerate(results):
+            if problems:
+                failures += 1
+                print(f"  interview {index}: " + "; ".join(problems))
+        print(f"  complete and consistent: {args.interviews - failures}/{args.interviews}")
+        print("  requests per worker: " + ", ".join(f"{url.rsplit(':', 1)[1]}={n}" for url, n in sorted(balancer.served.items())))
+        print(f"  {'route':<22} {'n':>4} {'p50 ms':>8} {'p95 ms':>8}")
+        for route, samples in latencies.items():
+            samples = sorted(samples)
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            print(f"  {route:<22} {len(samples):>4} {statistics.median(samples):>8.1f} {p95:>8.1f}")
+
+        print(f"\nconcurrent answers for one interview ({args.races} races)")
+        for _ in range(args.races):
+            statuses, advanced_by = run_race(balancer)
+            ok = statuses in ([200, 409], [200, 200]) and advanced_by == statuses.count(200)
+            if not ok:
+                failures += 1
+            # 200 + 200 means the two requests didn't overlap (nothing to resolve)
+            print(f"  statuses {statuses}  interview advanced by {advanced_by}  {'ok' if ok else 'LOST UPDATE'}")
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        stub.shutdown()
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
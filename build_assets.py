@@ -0,0 +1,290 @@
+"""Static asset build step: minify, fingerprint and precompress front-end bundles.
+
+Writes content-hashed bundles (plus .gz / .br variants) to static/dist/ together with
+a manifest.json that assets.py uses to rewrite the references in index.html.
+
+Usage:
+    python build_assets.py
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always produced
+    brotli = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(ROOT, "static")
+DIST_DIR = os.path.join(STATIC_DIR, "dist")
+MANIFEST_NAME = "manifest.json"
+
+# Source files (relative to static/) that get bundled
+ASSETS = ["script.js", "style.css"]
+
+# Already-compressed formats are fingerprinted but not minified or precompressed
+BINARY_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".woff", ".woff2"}
+
+# Skip precompressed variants that don't save much
+MIN_COMPRESSION_SAVING = 0.1
+
+# -------------------------------------
+# MINIFIERS
+# -------------------------------------
+# Deliberately conservative: strings, template literals and regex literals are copied
+# verbatim, and JS newlines are kept so automatic semicolon insertion is unaffected.
+
+_JS_TIGHT_CHARS = set("{}()[];,:=<>!&|?*%")
+_JS_REGEX_PREFIX_CHARS = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_PREFIX_WORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw"}
+
+
+def _scan_string(source, i):
+    """Return the index just past the string / template literal starting at i"""
+    quote = source[i]
+    i += 1
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == quote:
+            return i + 1
+        i += 1
+    return i
+
+
+def _scan_regex(source, i):
+    """Return the index just past the regex literal (and flags) starting at i"""
+    i += 1
+    in_class = False
+    while i < len(source):
+        char = source[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        elif char == "/" and not in_class:
+            i += 1
+            while i < len(source) and source[i].isalpha():
+                i += 1
+            return i
+        elif char == "\n":
+            return i
+        i += 1
+    return i
+
+
+def _regex_allowed(out):
+    """A '/' starts a regex literal if the previous token can't end an expression"""
+    text = "".join(out[-12:]).rstrip()
+    if not text:
+        return True
+    if text[-1] in _JS_REGEX_PREFIX_CHARS:
+        return True
+    match = re.search(r"([A-Za-z_$]+)$", text)
+    return bool(match and match.group(1) in _JS_REGEX_PREFIX_WORDS)
+
+
+def _js_tokens(source):
+    """Yield (kind, text): "literal" (string / template / regex, verbatim), "space" or "code"
+
+    Comments are dropped; a block comment becomes a space.
+    """
+    out = []  # what has been emitted so far, for the regex-vs-division decision
+    i = 0
+    length = len(source)
+
+    while i < length:
+        char = source[i]
+
+        if char in "'\"`":
+            end = _scan_string(source, i)
+            token = ("literal", source[i:end])
+        elif source.startswith("//", i):
+            end = source.find("\n", i)
+            i = length if end == -1 else end
+            continue
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = length if end == -1 else end + 2
+            token = ("space", " ")
+        elif char == "/" and _regex_allowed(out):
+            end = _scan_regex(source, i)
+            token = ("literal", source[i:end])
+        elif char.isspace():
+            end = i
+            while end < length and source[end].isspace():
+                end += 1
+            token = ("space", "\n" if "\n" in source[i:end] else " ")
+        else:
+            end = i + 1
+            token = ("code", char)
+        out.append(token[1])
+        i = end
+        yield token
+
+
+def js_literals(source):
+    """String, template and regex literals of a script, in order"""
+    return [text for kind, text in _js_tokens(source) if kind == "literal"]
+
+
+_PLACEHOLDER = re.compile("\x00(\\d+)\x00")
+
+
+def minify_js(source):
+    # Literals are swapped for placeholders while whitespace is squeezed, so text
+    # inside them (including multi-line template literals) is never touched
+    literals = []
+    out = []
+    for kind, text in _js_tokens(source):
+        if kind == "literal":
+            out.append(f"\x00{len(literals)}\x00")
+            literals.append(text)
+        else:
+            out.append(text)
+
+    # Second pass: drop whitespace that can't matter
+    text = "".join(out)
+    result = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        result.append(_tighten_js_line(line))
+    minified = "\n".join(result) + "\n"
+    return _PLACEHOLDER.sub(lambda match: literals[int(match.group(1))], minified)
+
+
+def _tighten_js_line(line):
+    """Remove single spaces next to punctuation (literals are placeholders by now)"""
+    out = []
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if char == " ":
+            prev_char = out[-1][-1] if out else ""
+            next_char = line[i + 1] if i + 1 < len(line) else ""
+            if prev_char in _JS_TIGHT_CHARS or next_char in _JS_TIGHT_CHARS:
+                i += 1
+                continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def minify_css(source):
+    out = []
+    i = 0
+    length = len(source)
+
+    while i < length:
+        char = source[i]
+        if char in "'\"":
+            end = _scan_string(source, i)
+            out.append(source[i:end])
+            i = end
+        elif source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = length if end == -1 else end + 2
+        elif char.isspace():
+            while i < length and source[i].isspace():
+                i += 1
+            prev_char = out[-1][-1] if out and out[-1] else ""
+            next_char = source[i] if i < length else ""
+            # Keep spaces before ':' (descendant pseudo-class selectors) and inside calc()
+            if prev_char and prev_char not in "{};,>:" and next_char not in "{};,>":
+                out.append(" ")
+        else:
+            if char == "}" and out and out[-1] == ";":
+                out.pop()
+            out.append(char)
+            i += 1
+
+    return "".join(out).strip() + "\n"
+
+
+MINIFIERS = {".js": minify_js, ".css": minify_css}
+
+# -------------------------------------
+# BUILD
+# -------------------------------------
+
+
+def fingerprint(content):
+    return hashlib.sha256(content).hexdigest()[:12]
+
+
+def _write_compressed_variants(path, content):
+    """Write .gz (and .br when available) next to path if they are worth it"""
+    variants = [("gzip", ".gz", gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(("br", ".br", brotli.compress(content, quality=11)))
+
+    written = []
+    for encoding, suffix, compressed in variants:
+        if len(compressed) <= len(content) * (1 - MIN_COMPRESSION_SAVING):
+            with open(path + suffix, "wb") as f:
+                f.write(compressed)
+            written.append(encoding)
+    return written
+
+
+def build_asset(name):
+    """Minify, fingerprint and precompress one asset; return its manifest entry"""
+    source_path = os.path.join(STATIC_DIR, name)
+    base, ext = os.path.splitext(name)
+
+    with open(source_path, "rb") as f:
+        content = f.read()
+    # Lets assets.py notice a source edited after the build
+    source_hash = hashlib.sha256(content).hexdigest()
+
+    if ext in MINIFIERS:
+        source = content.decode("utf-8")
+        minified = MINIFIERS[ext](source)
+        # Whitespace inside strings and templates is text users see: refuse to ship a change to it
+        if ext == ".js" and js_literals(minified) != js_literals(source):
+            raise RuntimeError(f"Minifying {name} changed its string or template literals")
+        content = minified.encode("utf-8")
+
+    hashed_name = f"{base}.{fingerprint(content)}{ext}"
+    hashed_path = os.path.join(DIST_DIR, hashed_name)
+    os.makedirs(os.path.dirname(hashed_path), exist_ok=True)
+    with open(hashed_path, "wb") as f:
+        f.write(content)
+
+    encodings = [] if ext in BINARY_EXTENSIONS else _write_compressed_variants(hashed_path, content)
+
+    return {"file": hashed_name, "size": len(content), "encodings": encodings, "source": source_hash}
+
+
+def build(assets=ASSETS):
+    """Rebuild static/dist from scratch and write the manifest"""
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    os.makedirs(DIST_DIR)
+
+    manifest = {name: build_asset(name) for name in assets}
+
+    with open(os.path.join(DIST_DIR, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    return manifest
+
+
+if __name__ == "__main__":
+    built = build()
+    for name, entry in built.items():
+        original = os.path.getsize(os.path.join(STATIC_DIR, name))
+        encodings = ", ".join(entry["encodings"]) or "none"
+        print(f"{name} -> dist/{entry['file']} ({original} -> {entry['size']} bytes, precompressed: {encodings})")
+    if brotli is None:
+        print("Note: install 'brotli' to also emit .br variants")
@@ -0,0 +1,128 @@
+"""Fit the adaptive difficulty tables to recorded interview outcomes.
+
+Reads the outcomes log written by the app (INTERVIEW_OUTCOMES_PATH, one JSON object per
+finished interview with its per-answer scores) and places the level / tier cut points at
+the same population quantiles the default thresholds were designed around. With little
+data the cut points stay close to the defaults (shrinkage towards the prior).
+
+Writes difficulty_tables.json, which difficulty.py loads at startup.
+
+Usage:
+    python calibrate_difficulty.py [outcomes.jsonl] [--out difficulty_tables.json]
+"""
+import argparse
+import json
+import os
+import statistics
+
+import difficulty
+
+# Population quantiles the default level cuts stand for: the weakest ~5% get 9
+# questions, the bottom 30% count as struggling, the top 25% as strong, ...
+LEVEL_CUT_QUANTILES = [0.05, 0.15, 0.30, 0.50, 0.75, 0.90]
+TIER_CUT_QUANTILES = [0.30, 0.75]
+
+# Interviews' worth of weight given to the default thresholds
+PRIOR_INTERVIEWS = 100
+
+DEFAULT_OUTCOMES_PATH = os.environ.get("INTERVIEW_OUTCOMES_PATH", "data/interview_outcomes.jsonl")
+
+
+def load_outcomes(path):
+    outcomes = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            scores = [float(score) for score in record.get("scores") or []]
+            if scores:
+                outcomes.append(scores)
+    return outcomes
+
+
+def quantile(sorted_values, q):
+    if not sorted_values:
+        return None
+    position = q * (len(sorted_values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def _shrink(observed, prior, weight):
+    return round(weight * observed + (1 - weight) * prior, 2)
+
+
+def calibrate(outcomes):
+    """Return calibration parameters for difficulty.build_tables()"""
+    defaults = difficulty.DEFAULT_CALIBRATION
+    if not outcomes:
+        return dict(defaults)
+
+    weight = len(outcomes) / (len(outcomes) + PRIOR_INTERVIEWS)
+
+    levels = sorted(statistics.mean(scores) for scores in outcomes)
+    level_cuts = [
+        _shrink(quantile(levels, q), prior, weight)
+        for q, prior in zip(LEVEL_CUT_QUANTILES, defaults["level_cuts"])
+    ]
+    tier_cuts = [
+        _shrink(quantile(levels, q), prior, weight)
+        for q, prior in zip(TIER_CUT_QUANTILES, defaults["tier_cuts"])
+    ]
+    # Cut points must stay ordered after shrinkage
+    for cuts in (level_cuts, tier_cuts):
+        for i in range(1, len(cuts)):
+            cuts[i] = max(cuts[i], cuts[i - 1] + 0.1)
+
+    # "Trending" means a change of about half a typical answer-to-answer swing
+    deltas = [abs(b - a) for scores in outcomes for a, b in zip(scores, scores[1:])]
+    trend_threshold = defaults["trend_threshold"]
+    if deltas:
+        trend_threshold = _shrink(0.5 * statistics.mean(deltas), trend_threshold, weight)
+
+    # "Inconsistent" means more spread than 90% of interviews
+    spreads = sorted(statistics.stdev(scores) for scores in outcomes if len(scores) > 1)
+    uncertain_std = defaults["uncertain_std"]
+    if spreads:
+        uncertain_std = _shrink(quantile(spreads, 0.9), uncertain_std, weight)
+
+    return {
+        "level_cuts": level_cuts,
+        "band_goals": list(defaults["band_goals"]),
+        "tier_cuts": tier_cuts,
+        "trend_threshold": trend_threshold,
+        "uncertain_std": uncertain_std,
+        "interviews": len(outcomes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("outcomes", nargs="?", default=DEFAULT_OUTCOMES_PATH)
+    parser.add_argument("--out", default=difficulty.DIFFICULTY_TABLES_PATH)
+    args = parser.parse_args()
+
+    outcomes = load_outcomes(args.outcomes) if os.path.exists(args.outcomes) else []
+    if not outcomes:
+        print(f"No outcomes found in {args.outcomes}; writing the default tables")
+
+    calibration = calibrate(outcomes)
+    tables = difficulty.build_tables(calibration)
+    with open(args.out, "w") as f:
+        json.dump(tables, f, indent=2)
+
+    print(f"Calibrated on {len(outcomes)} interviews -> {args.out}")
+    print(f"  level cuts:      {calibration['level_cuts']}")
+    print(f"  tier cuts:       {calibration['tier_cuts']}")
+    print(f"  trend threshold: {calibration['trend_threshold']}")
+    print(f"  uncertain std:   {calibration['uncertain_std']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+import json
+import os
+
+# -------------------------------------
+# ADAPTIVE DIFFICULTY ENGINE
+# -------------------------------------
+# Each interview keeps a handful of running statistics over its answer scores (count,
+# mean, EWMA level, Welford variance, EWMA trend of score changes). Every update is
+# O(1) and the stats are a small JSON-safe dict, so they live in the session next to
+# the rest of the interview state.
+#
+# Goal count and difficulty tier are then plain table lookups indexed by the binned
+# level and trend. The tables come from calibrate_difficulty.py (fitted to recorded
+# interview outcomes) or, when no calibration file exists, from the defaults below,
+# which reproduce the original fixed thresholds.
+
+LEVEL_ALPHA = 0.35           # EWMA weight of the newest score
+TREND_ALPHA = 0.5            # EWMA weight of the newest score change
+LEVEL_BIN_WIDTH = 0.5        # level bins: 0.0, 0.5, ... 10.0
+LEVEL_BINS = int(10 / LEVEL_BIN_WIDTH) + 1
+
+TREND_FALLING, TREND_FLAT, TREND_RISING = 0, 1, 2
+
+TIER_STRUGGLING, TIER_AVERAGE, TIER_STRONG = 0, 1, 2
+
+MIN_GOAL = 4
+MAX_GOAL = 9                 # hard limit, never exceeded
+DEFAULT_GOAL = 6
+
+# Level cut points and the goal count for each band (below the first cut gets band_goals[0])
+DEFAULT_CALIBRATION = {
+    "level_cuts": [2.0, 3.0, 4.0, 5.5, 7.0, 8.0],
+    "band_goals": [9, 8, 7, 6, 7, 5, 4],
+    "tier_cuts": [4.0, 7.0],
+    "trend_threshold": 0.75,
+    "uncertain_std": 2.5,
+}
+
+DIFFICULTY_TABLES_PATH = os.environ.get(
+    "DIFFICULTY_TABLES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "difficulty_tables.json"),
+)
+
+# (difficulty_context, question_style) per tier
+TIER_PROMPTS = {
+    TIER_STRUGGLING: (
+        "The candidate is struggling. Simplify questions and be supportive. Give them more opportunities to demonstrate their knowledge. Focus on fundamentals and basic concepts.",
+        "Ask simpler, more encouraging questions. Provide more questions to give them chances to show what they know.",
+    ),
+    TIER_AVERAGE: (
+        "The candidate is performing at an average level. Maintain moderate difficulty. Balance fundamentals with some depth.",
+        "Ask balanced questions covering core concepts.",
+    ),
+    TIER_STRONG: (
+        "The candidate is performing very well and has demonstrated strong knowledge. Ask a few deeper, challenging questions to confirm their expertise, then conclude efficiently.",
+        "Ask deeper, more challenging questions. Since they're doing well, you can wrap up sooner after confirming their strong performance.",
+    ),
+}
+
+
+# -------------------------------------
+# RUNNING STATISTICS
+# -------------------------------------
+
+def new_stats():
+    return {"n": 0, "mean": 0.0, "m2": 0.0, "level": 0.0, "trend": 0.0, "last": None}
+
+
+def update_stats(stats, score):
+    """Return stats updated with one more answer score (input is not modified)"""
+    stats = dict(stats or new_stats())
+    n = stats["n"] + 1
+    delta = score - stats["mean"]
+    mean = stats["mean"] + delta / n
+    stats["m2"] = stats["m2"] + delta * (score - mean)
+    stats["mean"] = mean
+    stats["n"] = n
+
+    # Plain running mean for the first answers (1/n > alpha), then an EWMA that follows drift
+    alpha = max(1.0 / n, LEVEL_ALPHA)
+    stats["level"] = (1 - alpha) * stats["level"] + alpha * score
+    if n > 1:
+        stats["trend"] = (1 - TREND_ALPHA) * stats["trend"] + TREND_ALPHA * (score - stats["last"])
+    stats["last"] = score
+    return stats
+
+
+def stats_from_history(performance_history):
+    """Rebuild stats from a score list (for interviews started before the engine existed)"""
+    stats = new_stats()
+    for score in performance_history or []:
+        stats = update_stats(stats, score)
+    return stats
+
+
+def stddev(stats):
+    return (stats["m2"] / (stats["n"] - 1)) ** 0.5 if stats["n"] > 1 else 0.0
+
+
+# -------------------------------------
+# LOOKUP TABLES
+# -------------------------------------
+
+def _band(value, cuts):
+    band = 0
+    for cut in cuts:
+        if value >= cut:
+            band += 1
+    return band
+
+
+def build_tables(calibration=None):
+    """Expand calibration cut points into the goal / tier lookup tables"""
+    calibration = dict(DEFAULT_CALIBRATION, **(calibration or {}))
+    goal_table = []
+    tier_table = []
+    for level_bin in range(LEVEL_BINS):
+        # Bin centre, so a bin never straddles a cut point on the wrong side
+        level = min(level_bin * LEVEL_BIN_WIDTH + LEVEL_BIN_WIDTH / 2, 10.0)
+        base_goal = calibration["band_goals"][_band(level, calibration["level_cuts"])]
+        tier = _band(level, calibration["tier_cuts"])
+        goal_row, tier_row = [], []
+        for trend_bin in (TREND_FALLING, TREND_FLAT, TREND_RISING):
+            goal = base_goal
+            if trend_bin == TREND_FALLING:
+                # Slipping candidates get one more chance to recover
+                goal += 1
+            goal_row.append(max(MIN_GOAL, min(goal, MAX_GOAL)))
+            # Tier follows the level only: the simulation showed trend adjustments
+            # to the tier mostly chase noise
+            tier_row.append(tier)
+        goal_table.append(goal_row)
+        tier_table.append(tier_row)
+    return {
+        "goal": goal_table,
+        "tier": tier_table,
+        "trend_threshold": calibration["trend_threshold"],
+        "uncertain_std": calibration["uncertain_std"],
+        "calibration": calibration,
+    }
+
+
+def load_tables(path=DIFFICULTY_TABLES_PATH):
+    """Calibrated tables if present, else the defaults"""
+    if path and os.path.exists(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load difficulty tables from {path}: {e}; using defaults")
+    return build_tables()
+
+
+TABLES = load_tables()
+
+
+def _bins(stats, tables):
+    level_bin = min(max(int(stats["level"] / LEVEL_BIN_WIDTH), 0), LEVEL_BINS - 1)
+    threshold = tables["trend_threshold"]
+    trend = stats["trend"]
+    trend_bin = TREND_FALLING if trend <= -threshold else TREND_RISING if trend >= threshold else TREND_FLAT
+    return level_bin, trend_bin
+
+
+def decide_goal_count(stats, tables=None):
+    """Target number of questions for this candidate"""
+    tables = tables or TABLES
+    if not stats or stats["n"] == 0:
+        return DEFAULT_GOAL
+    level_bin, trend_bin = _bins(stats, tables)
+    goal = tables["goal"][level_bin][trend_bin]
+    # Inconsistent answers: one more question before deciding
+    if stddev(stats) >= tables["uncertain_std"]:
+        goal += 1
+    return min(goal, MAX_GOAL)
+
+
+def decide_tier(stats, tables=None):
+    """Difficulty tier for the next question"""
+    tables = tables or TABLES
+    if not stats or stats["n"] == 0:
+        return TIER_AVERAGE
+    level_bin, trend_bin = _bins(stats, tables)
+    return tables["tier"][level_bin][trend_bin]
+
+
+def difficulty_prompts(stats, tables=None):
+    """(difficulty_context, question_style) for the next follow-up prompt"""
+    return TIER_PROMPTS[decide_tier(stats, tables)]
@@ -0,0 +1,215 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows: parsers still get the timeout and recycling, just no rlimits
+    resource = None
+
+from resume_processing import extract_resume_text
+
+# -------------------------------------
+# SUPERVISED DOCUMENT PARSING
+# -------------------------------------
+# PyPDF2 on a hostile or pathological PDF can use far more memory and CPU than the
+# file's size suggests, so resume text is never extracted in a serving process.
+# Documents go to a small pool of spawned parser processes, one document at a time
+# per process, each process with
+#   - an address-space cap (RLIMIT_AS, PARSE_MEMORY_MB): allocations beyond it fail
+#     with MemoryError inside the parser, never in the web worker
+#   - a CPU budget per document (RLIMIT_CPU, PARSE_CPU_SECONDS): the kernel kills
+#     a parser that spins past it
+#   - a wall-clock timeout (PARSE_TIMEOUT): the supervisor kills it
+#   - recycling after PARSE_MAX_TASKS documents, so leaks and fragmentation don't build up
+# A parser that dies or is killed is simply replaced on the next request; only the
+# document it was working on fails (with ParseError).
+
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", "2"))
+PARSE_MEMORY_MB = int(os.environ.get("PARSE_MEMORY_MB", "512"))
+PARSE_CPU_SECONDS = int(os.environ.get("PARSE_CPU_SECONDS", "10"))
+PARSE_TIMEOUT = float(os.environ.get("PARSE_TIMEOUT", "20"))
+PARSE_MAX_TASKS = int(os.environ.get("PARSE_MAX_TASKS", "50"))
+
+
+class ParseError(Exception):
+    """Raised when a document can't be parsed within the parser limits"""
+
+
+# -------------------------------------
+# PARSER PROCESS
+# -------------------------------------
+
+def _limit_memory(memory_bytes):
+    if resource is None or not memory_bytes:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        memory_bytes = min(memory_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, hard))
+
+
+def _limit_cpu(seconds):
+    """RLIMIT_CPU counts the whole process lifetime, so move it to now + seconds"""
+    if resource is None or not seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime) + 1 + seconds
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _parser_main(conn, memory_bytes):
+    _limit_memory(memory_bytes)
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        filename, path, content, cpu_seconds = task
+        _limit_cpu(cpu_seconds)
+        try:
+            if content is None:
+                with open(path, "rb") as f:
+                    content = f.read()
+            reply = ("ok", extract_resume_text(filename, content))
+        except MemoryError:
+            # Exit rather than carry on in a process that just hit its memory cap
+            content = None
+            conn.send(("fatal", "Document needs too much memory to parse"))
+            return
+        except Exception as e:
+            reply = ("error", f"{type(e).__name__}: {e}")
+        content = None
+        conn.send(reply)
+
+
+class _Parser:
+    def __init__(self, context, memory_bytes):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_parser_main, args=(child_conn, memory_bytes), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self, kill=False):
+        if not kill:
+            try:
+                self.conn.send(None)
+            except OSError:
+                kill = True
+        if kill:
+            self.process.kill()
+        self.conn.close()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+
+
+# -------------------------------------
+# SUPERVISOR
+# -------------------------------------
+
+class DocumentPool:
+    def __init__(self, workers=PARSE_WORKERS, memory_mb=PARSE_MEMORY_MB, cpu_seconds=PARSE_CPU_SECONDS,
+                 timeout=PARSE_TIMEOUT, max_tasks=PARSE_MAX_TASKS):
+        self.workers = max(1, workers)
+        self.memory_bytes = memory_mb * 1024 * 1024 if memory_mb else 0
+        self.cpu_seconds = cpu_seconds
+        self.timeout = timeout
+        self.max_tasks = max(1, max_tasks)
+        # Spawned (not forked) parsers: the web process has threads and open sockets
+        self._context = multiprocessing.get_context("spawn")
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._pid = os.getpid()
+        self._threads = None
+        self.stats = {"parsed": 0, "failed": 0, "killed": 0, "recycled": 0}
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _checkout(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked after parsers were started (e.g. gunicorn preload): those pipes belong to the parent
+                self._idle, self._pid = [], os.getpid()
+            while self._idle:
+                parser = self._idle.pop()
+                if parser.process.is_alive():
+                    return parser
+                parser.stop(kill=True)
+        return _Parser(self._context, self.memory_bytes)
+
+    def _checkin(self, parser):
+        parser.tasks += 1
+        if parser.tasks >= self.max_tasks:
+            self._count("recycled")
+            parser.stop()
+            return
+        with self._lock:
+            self._idle.append(parser)
+
+    def extract(self, filename, path=None, content=None):
+        """Normalized resume text of a file on disk (path) or in memory (content)"""
+        with self._slots:
+            parser = self._checkout()
+            reply, timed_out = None, False
+            try:
+                parser.conn.send((filename, path, content, self.cpu_seconds))
+                if parser.conn.poll(self.timeout):
+                    reply = parser.conn.recv()
+                else:
+                    timed_out = True
+            except (EOFError, OSError):
+                pass  # the parser died mid-document (CPU limit, crash)
+
+            if reply is None:
+                parser.stop(kill=True)
+                self._count("killed")
+                reason = "took too long to parse" if timed_out else "exceeded the parser's memory or CPU limit"
+                print(f"Document parser killed ({filename}): {reason}")
+                raise ParseError(f"Document {reason}")
+
+            status, value = reply
+            if status == "fatal":
+                parser.stop(kill=True)
+                self._count("killed")
+            else:
+                self._checkin(parser)
+            if status != "ok":
+                self._count("failed")
+                raise ParseError(value)
+            self._count("parsed")
+            return value
+
+    def submit(self, filename, path=None, content=None):
+        """extract() in the background; returns a Future"""
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="document-pool")
+        return self._threads.submit(self.extract, filename, path, content)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            threads, self._threads = self._threads, None
+        if threads is not None:
+            threads.shutdown(wait=True, cancel_futures=True)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for parser in idle:
+            parser.stop()
@@ -0,0 +1,24 @@
+import os
+
+# -------------------------------------
+# GUNICORN CONFIG
+# -------------------------------------
+# Usage: gunicorn -c gunicorn.conf.py app:app
+#
+# PRELOAD_APP=1 imports the app once in the master and forks workers from it, so
+# worker (re)spawns skip the import entirely. Combine with WARM_START=1 to also
+# load groq in the master. Each worker still creates its own Groq client
+# on first use (see GroqProvider in llm_router.py).
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:" + os.environ.get("PORT", "5000"))
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+# Tell the app how many workers share it (see single_worker in app.py)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+# Threaded workers so long-lived /ws/interview connections don't pin a whole worker
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+preload_app = os.environ.get("PRELOAD_APP") == "1"
+
+if preload_app and not os.environ.get("SESSION_SECRET"):
+    # Without an explicit secret each worker would generate its own; preloading
+    # shares the master's, but make the requirement visible anyway
+    print("Warning: SESSION_SECRET is not set - sessions will not survive restarts.")
@@ -0,0 +1,90 @@
+"""Bulk resume ingestion from the command line.
+
+Extracts every .pdf / .txt resume found in the given files, folders and zip archives,
+generates a summary and a personalized opening question per role, and stores each
+candidate so an interview can be started with its candidate_id (the same pipeline as
+POST /bulk_ingest, without going through HTTP).
+
+Usage:
+    python ingest_resumes.py resumes/ more.zip --role software_engineer --role data_analyst \\
+        [--persona neutral] [--concurrency 4] [--workers 4] [--json]
+"""
+import argparse
+import json
+import os
+import sys
+
+from resume_ingest import (
+    INGEST_LLM_CONCURRENCY,
+    INGEST_WORKERS,
+    IngestError,
+    ResumeBatch,
+    ingest_resumes,
+)
+
+
+def gather(paths, batch):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    full_path = os.path.join(root, name)
+                    if os.path.splitext(name)[1].lower() in (".pdf", ".txt", ".zip"):
+                        _add(batch, full_path)
+        else:
+            _add(batch, path)
+    return batch.files
+
+
+def _add(batch, path):
+    with open(path, "rb") as f:
+        batch.add(os.path.basename(path), f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="resume files, folders or zip archives")
+    parser.add_argument("--role", action="append", help="role to prepare an opening question for (repeatable)")
+    parser.add_argument("--persona", default="neutral", choices=["strict", "friendly", "neutral"])
+    parser.add_argument("--concurrency", type=int, default=INGEST_LLM_CONCURRENCY, help="concurrent LLM calls")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="text extraction processes")
+    parser.add_argument("--json", action="store_true", help="print raw NDJSON progress events")
+    args = parser.parse_args()
+
+    # Imported here so --help works without the app's configuration
+    import app
+
+    roles = args.role or ["software_engineer"]
+    invalid = [role for role in roles if role not in app.JOB_ROLES]
+    if invalid:
+        parser.error(f"unknown role(s): {', '.join(invalid)} (choose from {', '.join(app.JOB_ROLES)})")
+
+    batch = ResumeBatch()
+    try:
+        files = gather(args.paths, batch)
+        events = ingest_resumes(
+            files, roles, args.persona, app.summarize_resume, app.generate_opening_question, app.candidate_store,
+            workers=args.workers, llm_concurrency=args.concurrency,
+        )
+        for event in events:
+            if args.json:
+                print(json.dumps(event), flush=True)
+            elif event["event"] in ("done", "cached"):
+                print(f"{event['event']:>7}  {event['candidate_id']}  {event['file']}  {event.get('name') or ''}", flush=True)
+            elif event["event"] == "duplicate":
+                print(f"   skip  {event['candidate_id']}  {event['file']} (duplicate in this batch)", flush=True)
+            elif event["event"] == "failed":
+                print(f" failed  {event['file']}: {event['error']}", flush=True)
+            elif event["event"] == "queued":
+                print(f"Ingesting {event['total']} resumes for {', '.join(roles)} ({args.persona})", flush=True)
+            elif event["event"] == "complete":
+                print(f"Done in {event['seconds']}s: {event['done']} new, {event['cached']} cached, {event['duplicate']} duplicates, {event['failed']} failed")
+    except IngestError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        batch.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import atexit
+import glob
+import gzip
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+# -------------------------------------
+# LLM RECORD / REPLAY
+# -------------------------------------
+# Record mode (LLM_RECORD=recordings/llm.jsonl.zst) appends every LLM request/response
+# pair - with purpose, provider, model, timing and interview id - to a compact log.
+# Replay mode (LLM_REPLAY=recordings/*.jsonl.zst) serves those responses back instead
+# of calling any provider, either at full speed or paced like the original traffic
+# (LLM_REPLAY_SPEED=1 reproduces recorded latency, 0 = no delay).
+#
+# Each worker process writes its own file (pid inserted before the extension), so
+# compressed streams from several gunicorn workers never interleave.
+# .zst needs the optional `zstandard` package; .gz and plain .jsonl work out of the box.
+
+STREAM_CHUNK_CHARS = 16
+
+
+def request_key(purpose, messages, options):
+    """Stable hash identifying an LLM request"""
+    payload = json.dumps([purpose, messages, options or {}], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:24]
+
+
+def _per_process_path(path):
+    directory, name = os.path.split(path)
+    stem, dot, extensions = name.partition(".")
+    return os.path.join(directory, f"{stem}.{os.getpid()}{dot}{extensions}")
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("Recording to .zst needs the optional zstandard package (pip install zstandard)")
+    return zstandard
+
+
+def _open_writer(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if path.endswith(".zst"):
+        raw = open(path, "ab")
+        return raw, _zstandard().ZstdCompressor(level=10).stream_writer(raw, closefd=False)
+    if path.endswith(".gz"):
+        raw = open(path, "ab")
+        return raw, gzip.GzipFile(fileobj=raw, mode="ab")
+    raw = open(path, "ab")
+    return raw, raw
+
+
+def _read_lines(path):
+    if path.endswith(".zst"):
+        with open(path, "rb") as f:
+            # read_across_frames: the file may hold one frame per writer session
+            reader = _zstandard().ZstdDecompressor().stream_reader(f, read_across_frames=True)
+            data = reader.read()
+        return io.StringIO(data.decode("utf-8", errors="replace"))
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def load_records(pattern):
+    """Yield records from every log matching pattern (a path or glob); truncated tails are skipped"""
+    paths = sorted(glob.glob(pattern)) or [pattern]
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        try:
+            lines = _read_lines(path)
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # partially written last record
+        except EOFError:
+            pass  # writer was killed before closing the gzip stream; every flushed record was read
+        except Exception as e:
+            print(f"LLM replay: could not read {path}: {e}")
+
+
+class LLMRecorder:
+    """Append-only request/response log"""
+
+    def __init__(self, path):
+        self.path = path
+        self._writer = None
+        self._raw = None
+        self._pid = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _ensure_open(self):
+        if self._writer is None or self._pid != os.getpid():
+            self._raw, self._writer = _open_writer(_per_process_path(self.path))
+            self._pid = os.getpid()
+
+    def record(self, purpose, messages, options, response, provider=None, model=None,
+               latency=None, ttft=None, error=None, session_id=None):
+        entry = {
+            "ts": round(time.time(), 3),
+            "session_id": session_id,
+            "purpose": purpose,
+            "key": request_key(purpose, messages, options),
+            "provider": provider,
+            "model": model,
+            "latency_ms": None if latency is None else round(latency * 1000, 1),
+            "ttft_ms": None if ttft is None else round(ttft * 1000, 1),
+            "error": error,
+            "options": options or {},
+            "messages": messages,
+            "response": response,
+        }
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            self._ensure_open()
+            self._writer.write(line)
+            # Flush every record so a crash loses at most the one being written
+            if self._writer is not self._raw:
+                self._writer.flush()
+            self._raw.flush()
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                if self._writer is not self._raw:
+                    self._writer.close()
+                self._raw.close()
+                self._writer = None
+
+
+class ReplayMiss(Exception):
+    """Raised in strict replay mode when a request was never recorded"""
+
+
+class LLMReplayer:
+    """Serves recorded responses: exact request match first, then the next recording for the purpose"""
+
+    def __init__(self, pattern, speed=0.0, strict=False):
+        self.speed = speed
+        self.strict = strict
+        self._by_key = defaultdict(deque)
+        self._by_purpose = defaultdict(list)
+        self._purpose_cursor = defaultdict(int)
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.fallbacks = 0
+
+        count = 0
+        for record in load_records(pattern):
+            if record.get("error") or record.get("response") is None:
+                continue
+            self._by_key[record["key"]].append(record)
+            self._by_purpose[record["purpose"]].append(record)
+            count += 1
+        print(f"LLM replay: loaded {count} recorded responses from {pattern}")
+
+    def _lookup(self, purpose, messages, options):
+        key = request_key(purpose, messages, options)
+        with self._lock:
+            matches = self._by_key.get(key)
+            if matches:
+                # Rotate so repeated identical requests replay in recorded order
+                record = matches[0]
+                matches.rotate(-1)
+                self.exact_hits += 1
+                return record
+            if self.strict:
+                raise ReplayMiss(f"No recording for {purpose} request {key}")
+            recordings = self._by_purpose.get(purpose)
+            if not recordings:
+                raise ReplayMiss(f"No recordings for purpose '{purpose}'")
+            index = self._purpose_cursor[purpose] % len(recordings)
+            self._purpose_cursor[purpose] += 1
+            self.fallbacks += 1
+            return recordings[index]
+
+    def _sleep(self, milliseconds):
+        if self.speed > 0 and milliseconds:
+            time.sleep(milliseconds / 1000.0 * self.speed)
+
+    def complete(self, purpose, messages, options):
+        record = self._lookup(purpose, messages, options)
+        self._sleep(record.get("latency_ms"))
+        return record["response"]
+
+    def stream(self, purpose, messages, options):
+        record = self._lookup(purpose, messages, options)
+        response = record["response"]
+        ttft = record.get("ttft_ms") or record.get("latency_ms") or 0
+        self._sleep(ttft)
+        chunks = [response[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(response), STREAM_CHUNK_CHARS)]
+        remaining = max((record.get("latency_ms") or 0) - ttft, 0)
+        for chunk in chunks:
+            yield chunk
+            self._sleep(remaining / max(len(chunks), 1))
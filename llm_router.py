@@ -0,0 +1,432 @@
+import json
+import os
+import random
+import threading
+import time
+
+# -------------------------------------
+# LLM ROUTING
+# -------------------------------------
+# Every LLM call names its purpose (scoring, next_question, ...). Each purpose maps to an
+# ordered list of (provider, model) candidates. The order is a quality ranking: the
+# router keeps to it and only moves past a model while that model is failing (a short
+# cooldown after consecutive errors, after which it is tried again). Latency only
+# breaks ties within a tier, i.e. between providers serving the same model.
+# Observations are kept per purpose: a model's latency on long interviewer turns says
+# nothing about its latency on short scoring calls.
+#
+# Configuration (all optional):
+#   LLM_PROVIDERS     JSON: {"local": {"type": "openai_compatible", "base_url": "http://127.0.0.1:8080/v1"}}
+#   LLM_ROUTES        JSON: {"scoring": [{"provider": "local", "model": "qwen2.5-3b"}], ...}
+#   LLM_ROUTES_FILE   path to a JSON file with {"providers": {...}, "routes": {...}}
+#   LOCAL_LLM_BASE_URL / LOCAL_LLM_MODEL / LOCAL_LLM_API_KEY
+#                     register an OpenAI-compatible server as provider "local"
+#   LLM_OFFLINE=1     route every purpose to the "local" provider only
+#   LLM_RECORD        append every request/response to this log (.jsonl, .jsonl.gz, .jsonl.zst)
+#   LLM_REPLAY        serve responses from recorded logs (path or glob) instead of any provider
+#   LLM_REPLAY_SPEED  1 = reproduce recorded latency, 0.5 = twice as fast, 0 = no delay (default)
+#   LLM_REPLAY_STRICT=1  fail on requests that were not recorded exactly
+
+LARGE_MODEL = "llama-3.3-70b-versatile"
+SMALL_MODEL = "llama-3.1-8b-instant"
+
+PURPOSES = [
+    "opening_question",
+    "next_question",
+    "scoring",
+    "resume_summary",
+    "final_feedback",
+    "retry_question",
+    "retry_feedback",
+    "closing",
+    "encourage",
+]
+
+# The interviewer gets the big model; short structured calls go to the small one
+DEFAULT_ROUTES = {
+    "opening_question": [("groq", LARGE_MODEL), ("groq", SMALL_MODEL)],
+    "next_question": [("groq", LARGE_MODEL), ("groq", SMALL_MODEL)],
+    "final_feedback": [("groq", LARGE_MODEL), ("groq", SMALL_MODEL)],
+    "scoring": [("groq", SMALL_MODEL), ("groq", LARGE_MODEL)],
+    "resume_summary": [("groq", SMALL_MODEL), ("groq", LARGE_MODEL)],
+    "retry_question": [("groq", SMALL_MODEL), ("groq", LARGE_MODEL)],
+    "retry_feedback": [("groq", SMALL_MODEL), ("groq", LARGE_MODEL)],
+    "closing": [("groq", SMALL_MODEL), ("groq", LARGE_MODEL)],
+    "encourage": [("groq", SMALL_MODEL), ("groq", LARGE_MODEL)],
+}
+
+LATENCY_PRIOR = 2.0          # seconds assumed before a candidate has been observed
+EWMA_ALPHA = 0.2             # weight of the newest observation
+FAILURE_COOLDOWN = 30.0      # seconds a candidate is demoted after consecutive failures
+COOLDOWN_AFTER_FAILURES = 3
+EXPLORE_RATE = 0.05          # share of calls that try an unobserved same-tier candidate first
+
+REQUEST_TIMEOUT = float(os.environ.get("LLM_REQUEST_TIMEOUT", "60"))
+
+
+class LLMError(Exception):
+    """Raised when every candidate for a purpose has failed"""
+
+
+# -------------------------------------
+# PROVIDERS
+# -------------------------------------
+
+class GroqProvider:
+    """Groq SDK client, imported lazily and created once per worker process"""
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key or os.environ.get("GROQ_API_KEY")
+        self._client = None
+        self._client_pid = None
+
+    @property
+    def client(self):
+        # A client inherited through fork (gunicorn preload_app) must not be reused:
+        # its connection pool belongs to the parent process
+        if self._client is None or self._client_pid != os.getpid():
+            if not self.api_key:
+                raise RuntimeError("GROQ_API_KEY environment variable is required. Add it in your .env file")
+            from groq import Groq
+            self._client = Groq(api_key=self.api_key)
+            self._client_pid = os.getpid()
+        return self._client
+
+    def complete(self, model, messages, **options):
+        response = self.client.chat.completions.create(model=model, messages=messages, **options)
+        return response.choices[0].message.content or ""
+
+    def stream(self, model, messages, **options):
+        chunks = self.client.chat.completions.create(model=model, messages=messages, stream=True, **options)
+        for chunk in chunks:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
+
+
+class OpenAICompatibleProvider:
+    """Any server speaking the OpenAI /chat/completions API (llama.cpp, vLLM, Ollama, LM Studio...)"""
+
+    def __init__(self, base_url, api_key=None, default_model=None, timeout=REQUEST_TIMEOUT):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.default_model = default_model
+        self.timeout = timeout
+
+    def _post(self, payload, stream=False):
+        import requests
+
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        response = requests.post(
+            f"{self.base_url}/chat/completions",
+            data=json.dumps(payload),
+            headers=headers,
+            timeout=self.timeout,
+            stream=stream,
+        )
+        response.raise_for_status()
+        return response
+
+    def _payload(self, model, messages, options):
+        payload = {"model": model or self.default_model, "messages": messages}
+        payload.update({key: value for key, value in options.items() if value is not None})
+        return payload
+
+    def complete(self, model, messages, **options):
+        data = self._post(self._payload(model, messages, options)).json()
+        return data["choices"][0]["message"].get("content") or ""
+
+    def stream(self, model, messages, **options):
+        payload = self._payload(model, messages, options)
+        payload["stream"] = True
+        with self._post(payload, stream=True) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                choices = json.loads(data).get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    yield delta
+
+
+PROVIDER_TYPES = {
+    "groq": GroqProvider,
+    "openai_compatible": OpenAICompatibleProvider,
+}
+
+
+# -------------------------------------
+# LATENCY / ERROR TRACKING
+# -------------------------------------
+
+class CandidateStats:
+    """Running latency and error-rate estimates for one (purpose, provider, model) candidate"""
+
+    def __init__(self):
+        self.latency = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+
+    def record(self, latency, ok):
+        self.calls += 1
+        if ok:
+            self.latency = latency if self.latency is None else (1 - EWMA_ALPHA) * self.latency + EWMA_ALPHA * latency
+            self.error_rate *= (1 - EWMA_ALPHA)
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.error_rate = (1 - EWMA_ALPHA) * self.error_rate + EWMA_ALPHA
+            self.consecutive_failures += 1
+            # Once the cooldown is over the next call is a probe: one more failure
+            # (consecutive_failures is still past the threshold) demotes it again
+            if self.consecutive_failures >= COOLDOWN_AFTER_FAILURES:
+                self.cooldown_until = time.monotonic() + FAILURE_COOLDOWN
+
+    def cooling_down(self, now=None):
+        return (time.monotonic() if now is None else now) < self.cooldown_until
+
+
+# -------------------------------------
+# ROUTER
+# -------------------------------------
+
+class LLMRouter:
+    def __init__(self, providers, routes, recorder=None, replayer=None):
+        self.providers = providers
+        self.routes = routes
+        self.recorder = recorder
+        self.replayer = replayer
+        # Set by the app to tag recordings with the current interview id
+        self.session_id_getter = None
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _stats_for(self, purpose, provider_name, model):
+        key = (purpose, provider_name, model)
+        with self._lock:
+            if key not in self._stats:
+                self._stats[key] = CandidateStats()
+            return self._stats[key]
+
+    def candidates(self, purpose):
+        """Candidates for a purpose: configured (quality) order, failing ones last, latency within a tier"""
+        configured = self.routes.get(purpose) or self.routes.get("next_question") or []
+        now = time.monotonic()
+        tiers = {}  # model -> tier, in order of first appearance
+        available = []
+        for index, (provider_name, model) in enumerate(configured):
+            if provider_name not in self.providers:
+                continue
+            stats = self._stats_for(purpose, provider_name, model)
+            available.append((stats.cooling_down(now), tiers.setdefault(model, len(tiers)), index, provider_name, model, stats))
+
+        # An unobserved candidate is assumed as slow as the slowest observed one in its
+        # tier, so it never overtakes on the prior alone
+        slowest = {}
+        for _, tier, _, _, _, stats in available:
+            if stats.latency is not None:
+                slowest[tier] = max(slowest.get(tier, 0.0), stats.latency)
+        ranked = sorted(
+            (cooling, tier, slowest.get(tier, LATENCY_PRIOR) if stats.latency is None else stats.latency,
+             index, provider_name, model, stats)
+            for cooling, tier, index, provider_name, model, stats in available
+        )
+
+        # Now and then try an unmeasured provider of the leading tier first, so it gets measured
+        if ranked and not ranked[0][0]:
+            unobserved = [entry for entry in ranked[1:]
+                          if not entry[0] and entry[1] == ranked[0][1] and entry[6].latency is None]
+            if unobserved and random.random() < EXPLORE_RATE:
+                pick = random.choice(unobserved)
+                ranked.remove(pick)
+                ranked.insert(0, pick)
+        return [(provider_name, model) for _, _, _, _, provider_name, model, _ in ranked]
+
+    def _attempts(self, purpose):
+        candidates = self.candidates(purpose)
+        if not candidates:
+            raise LLMError(f"No LLM provider configured for '{purpose}'")
+        return candidates
+
+    def _record(self, purpose, messages, options, response, provider_name, model, latency, ttft=None, error=None):
+        if self.recorder is None:
+            return
+        try:
+            session_id = self.session_id_getter() if self.session_id_getter else None
+            self.recorder.record(
+                purpose, messages, options, response,
+                provider=provider_name, model=model, latency=latency, ttft=ttft,
+                error=None if error is None else str(error), session_id=session_id,
+            )
+        except Exception as e:
+            print(f"LLM recording failed: {e}")
+
+    def complete(self, purpose, messages, **options):
+        """Return the completion text for messages, falling back across candidates"""
+        if self.replayer is not None:
+            try:
+                return self.replayer.complete(purpose, messages, options)
+            except Exception as e:
+                raise LLMError(f"Replay failed for '{purpose}': {e}")
+
+        last_error = None
+        for provider_name, model in self._attempts(purpose):
+            stats = self._stats_for(purpose, provider_name, model)
+            start = time.perf_counter()
+            try:
+                content = self.providers[provider_name].complete(model, messages, **options)
+            except Exception as e:
+                latency = time.perf_counter() - start
+                stats.record(latency, ok=False)
+                self._record(purpose, messages, options, None, provider_name, model, latency, error=e)
+                print(f"LLM call failed ({purpose} via {provider_name}/{model}): {e}")
+                last_error = e
+                continue
+            latency = time.perf_counter() - start
+            stats.record(latency, ok=True)
+            self._record(purpose, messages, options, content, provider_name, model, latency)
+            return content
+        raise LLMError(f"All LLM candidates failed for '{purpose}': {last_error}")
+
+    def stream(self, purpose, messages, **options):
+        """Yield completion text deltas; falls back only if a candidate fails before its first token"""
+        if self.replayer is not None:
+            try:
+                yield from self.replayer.stream(purpose, messages, options)
+            except Exception as e:
+                raise LLMError(f"Replay failed for '{purpose}': {e}")
+            return
+
+        last_error = None
+        for provider_name, model in self._attempts(purpose):
+            stats = self._stats_for(purpose, provider_name, model)
+            start = time.perf_counter()
+            ttft = None
+            parts = []
+            try:
+                for delta in self.providers[provider_name].stream(model, messages, **options):
+                    if ttft is None:
+                        # Time to first token is what matters for streamed calls
+                        ttft = time.perf_counter() - start
+                        stats.record(ttft, ok=True)
+                    parts.append(delta)
+                    yield delta
+                self._record(purpose, messages, options, "".join(parts), provider_name, model,
+                             time.perf_counter() - start, ttft=ttft)
+                return
+            except GeneratorExit:
+                # The caller stopped reading early (e.g. a closing was detected): record what arrived
+                self._record(purpose, messages, options, "".join(parts), provider_name, model,
+                             time.perf_counter() - start, ttft=ttft)
+                raise
+            except Exception as e:
+                if ttft is not None:
+                    raise
+                latency = time.perf_counter() - start
+                stats.record(latency, ok=False)
+                self._record(purpose, messages, options, None, provider_name, model, latency, error=e)
+                print(f"LLM stream failed ({purpose} via {provider_name}/{model}): {e}")
+                last_error = e
+        raise LLMError(f"All LLM candidates failed for '{purpose}': {last_error}")
+
+    def snapshot(self):
+        """Current per-candidate stats, for logging / admin views"""
+        with self._lock:
+            items = list(self._stats.items())
+        return [
+            {
+                "purpose": purpose,
+                "provider": provider_name,
+                "model": model,
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "latency_ewma": None if stats.latency is None else round(stats.latency, 3),
+                "error_rate": round(stats.error_rate, 3),
+            }
+            for (purpose, provider_name, model), stats in items
+        ]
+
+
+def _load_json_env(name):
+    raw = os.environ.get(name)
+    if not raw:
+        return {}
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise RuntimeError(f"{name} is not valid JSON: {e}")
+
+
+def _build_provider(config):
+    config = dict(config)
+    provider_type = config.pop("type", "openai_compatible")
+    if provider_type not in PROVIDER_TYPES:
+        raise RuntimeError(f"Unknown LLM provider type '{provider_type}'")
+    return PROVIDER_TYPES[provider_type](**config)
+
+
+def _parse_routes(raw_routes):
+    return {
+        purpose: [(entry["provider"], entry.get("model")) for entry in entries]
+        for purpose, entries in raw_routes.items()
+    }
+
+
+def load_router():
+    """Build the router from defaults plus environment configuration"""
+    file_config = {}
+    routes_file = os.environ.get("LLM_ROUTES_FILE")
+    if routes_file:
+        with open(routes_file) as f:
+            file_config = json.load(f)
+
+    providers = {"groq": GroqProvider()}
+
+    local_url = os.environ.get("LOCAL_LLM_BASE_URL")
+    if local_url:
+        providers["local"] = OpenAICompatibleProvider(
+            local_url,
+            api_key=os.environ.get("LOCAL_LLM_API_KEY"),
+            default_model=os.environ.get("LOCAL_LLM_MODEL", "local-model"),
+        )
+
+    provider_configs = dict(file_config.get("providers", {}))
+    provider_configs.update(_load_json_env("LLM_PROVIDERS"))
+    for name, config in provider_configs.items():
+        providers[name] = _build_provider(config)
+
+    routes = dict(DEFAULT_ROUTES)
+    routes.update(_parse_routes(file_config.get("routes", {})))
+    routes.update(_parse_routes(_load_json_env("LLM_ROUTES")))
+
+    if os.environ.get("LLM_OFFLINE") == "1":
+        if "local" not in providers:
+            raise RuntimeError("LLM_OFFLINE=1 needs LOCAL_LLM_BASE_URL (or a 'local' entry in LLM_PROVIDERS)")
+        local_model = getattr(providers["local"], "default_model", None)
+        routes = {purpose: [("local", local_model)] for purpose in PURPOSES}
+
+    recorder = None
+    record_path = os.environ.get("LLM_RECORD")
+    if record_path:
+        from llm_replay import LLMRecorder
+        recorder = LLMRecorder(record_path)
+
+    replayer = None
+    replay_pattern = os.environ.get("LLM_REPLAY")
+    if replay_pattern:
+        from llm_replay import LLMReplayer
+        replayer = LLMReplayer(
+            replay_pattern,
+            speed=float(os.environ.get("LLM_REPLAY_SPEED", "0")),
+            strict=os.environ.get("LLM_REPLAY_STRICT") == "1",
+        )
+
+    return LLMRouter(providers, routes, recorder=recorder, replayer=replayer)
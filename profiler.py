@@ -0,0 +1,202 @@
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+# -------------------------------------
+# REQUEST PROFILING
+# -------------------------------------
+# Operator-controlled sampling profiler for the slow routes (send_response,
+# get_feedback, upload_resume by default). A sampled request registers its thread;
+# one background thread reads that thread's stack every PROFILE_INTERVAL_MS via
+# sys._current_frames() and counts it per route, so the request itself only pays for
+# two dict updates. Stacks start at the WSGI entry point, so session cookie loading
+# and saving, prompt building, JSON salvage, PyPDF2 and network waits all show up.
+#
+# With a sample rate of 0 (the default) the profiler's WSGI wrapper isn't installed
+# at all. Profiles are per worker process; export them as collapsed stacks
+# (flamegraph.pl, speedscope, inferno) or as a speedscope JSON file.
+
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+PROFILE_ENDPOINTS = [
+    endpoint.strip()
+    for endpoint in os.environ.get("PROFILE_ENDPOINTS", "send_response,get_feedback,upload_resume").split(",")
+    if endpoint.strip()
+]
+PROFILE_MAX_STACKS = 20000  # distinct stacks kept per route; further new stacks are only counted
+
+PROFILE_FORMATS = {
+    "collapsed": "text/plain; charset=utf-8",
+    "speedscope": "application/json",
+}
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def frame_name(code):
+    """function (file:first line), with the file shortened to its last two path parts"""
+    path = code.co_filename.replace("\\", "/").split("/")
+    return f"{code.co_qualname} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+
+
+class RequestProfiler:
+    def __init__(self, app, endpoints=PROFILE_ENDPOINTS, interval_ms=PROFILE_INTERVAL_MS):
+        self.app = app
+        self.endpoints = set(endpoints)
+        self.interval_ms = max(interval_ms, 0.5)
+        self.sample_rate = 0.0
+        self._wsgi_app = app.wsgi_app
+        self._paths = None
+        self._active = {}  # thread id -> (route, WSGI entry frame)
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._sampler = None
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stacks = {}  # route -> Counter({(code, ...): samples})
+            self.requests = Counter()
+            self.seconds = Counter()
+            self.dropped = Counter()
+            self.since = time.time()
+
+    def configure(self, sample_rate):
+        """Set the fraction of requests to profile; 0 removes the WSGI wrapper"""
+        with self._lock:
+            self.sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+            self.app.wsgi_app = self._profiled_wsgi_app if self.sample_rate > 0 else self._wsgi_app
+
+    def _route_for(self, path):
+        if self._paths is None:
+            # Resolved on first use: routes are registered after the profiler is created
+            self._paths = {
+                rule.rule: rule.endpoint
+                for rule in self.app.url_map.iter_rules()
+                if rule.endpoint in self.endpoints and not rule.arguments
+            }
+        return self._paths.get(path)
+
+    def _profiled_wsgi_app(self, environ, start_response):
+        route = self._route_for(environ.get("PATH_INFO", ""))
+        if route is None or random.random() >= self.sample_rate:
+            return self._wsgi_app(environ, start_response)
+
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._active[thread_id] = (route, sys._getframe())
+            self._wake.notify()
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name="request-profiler", daemon=True)
+                self._sampler.start()
+        start = time.perf_counter()
+        try:
+            return self._wsgi_app(environ, start_response)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._active.pop(thread_id, None)
+                self.requests[route] += 1
+                self.seconds[route] += elapsed
+
+    def _sample_loop(self):
+        interval = self.interval_ms / 1000
+        while True:
+            with self._lock:
+                while not self._active:
+                    self._wake.wait()
+                active = list(self._active.items())
+
+            frames = sys._current_frames()
+            samples = []
+            for thread_id, (route, root) in active:
+                frame = frames.get(thread_id)
+                stack = []
+                while frame is not None and frame is not root:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                # No root frame means the request finished between the two snapshots
+                if frame is root and stack:
+                    samples.append((route, tuple(reversed(stack))))
+            frames = frame = None  # don't keep other threads' frames alive while sleeping
+
+            with self._lock:
+                for route, stack in samples:
+                    counts = self.stacks.setdefault(route, Counter())
+                    if stack in counts or len(counts) < PROFILE_MAX_STACKS:
+                        counts[stack] += 1
+                    else:
+                        self.dropped[route] += 1
+            time.sleep(interval)
+
+    def _snapshot(self, route=None):
+        with self._lock:
+            return {
+                name: Counter(counts)
+                for name, counts in self.stacks.items()
+                if route is None or name == route
+            }
+
+    def status(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "sample_rate": self.sample_rate,
+                "interval_ms": self.interval_ms,
+                "endpoints": sorted(self.endpoints),
+                "since": round(self.since),
+                "routes": {
+                    route: {
+                        "requests": self.requests[route],
+                        "seconds": round(self.seconds[route], 3),
+                        "samples": sum(self.stacks.get(route, {}).values()),
+                        "stacks": len(self.stacks.get(route, {})),
+                        "dropped_samples": self.dropped[route],
+                    }
+                    for route in sorted(set(self.requests) | set(self.stacks))
+                },
+            }
+
+    def collapsed(self, route=None):
+        """One 'frame;frame;frame samples' line per stack; route=None prefixes each with its route"""
+        lines = []
+        for name, counts in sorted(self._snapshot(route).items()):
+            prefix = [] if route else [name]
+            for stack, samples in counts.most_common():
+                lines.append(";".join(prefix + [frame_name(code) for code in stack]) + f" {samples}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def speedscope(self, route=None):
+        """speedscope file: one sampled profile per route, weights in milliseconds"""
+        frames, frame_index, profiles = [], {}, []
+        for name, counts in sorted(self._snapshot(route).items()):
+            samples, weights = [], []
+            for stack, count in counts.most_common():
+                indices = []
+                for code in stack:
+                    if code not in frame_index:
+                        frame_index[code] = len(frames)
+                        frames.append({"name": code.co_qualname, "file": code.co_filename, "line": code.co_firstlineno})
+                    indices.append(frame_index[code])
+                samples.append(indices)
+                weights.append(count * self.interval_ms)
+            profiles.append({
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            })
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": f"InterviewPilot {route or 'all routes'} (pid {os.getpid()})",
+            "exporter": "InterviewPilot profiler.py",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
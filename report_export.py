@@ -0,0 +1,438 @@
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# -------------------------------------
+# FEEDBACK REPORT EXPORT
+# -------------------------------------
+# get_feedback publishes its JSON here once; the report id is a hash of that JSON, so
+# the same feedback always maps to the same id and the same files. PDF / HTML /
+# Markdown artifacts are rendered from the stored JSON in a process pool (in the
+# background right after publishing, or on first download) and written next to it.
+# Repeat downloads and share links are plain file reads - no re-rendering and no LLM
+# call. Bump RENDERER_VERSION when the layout changes so stale artifacts are skipped.
+
+REPORT_DIR = os.environ.get("REPORT_DIR", os.path.join("data", "reports"))
+REPORT_WORKERS = int(os.environ.get("REPORT_WORKERS", "2"))
+REPORT_PRERENDER = [fmt for fmt in os.environ.get("REPORT_PRERENDER", "pdf").split(",") if fmt]
+REPORT_TTL_DAYS = float(os.environ.get("REPORT_TTL_DAYS", "30"))
+RENDER_TIMEOUT = 30  # seconds a download waits for its render
+
+RENDERER_VERSION = "1"
+
+REPORT_FORMATS = {
+    "pdf": "application/pdf",
+    "html": "text/html; charset=utf-8",
+    "md": "text/markdown; charset=utf-8",
+}
+
+CATEGORIES = [
+    ("communication", "Communication"),
+    ("technical_depth", "Technical Depth"),
+    ("clarity", "Clarity"),
+    ("confidence", "Confidence"),
+]
+
+PRUNE_EVERY = 100  # publishes between sweeps of expired reports
+
+_REPORT_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ReportError(Exception):
+    """Raised for unknown report ids or formats"""
+
+
+def report_id_for(feedback):
+    canonical = json.dumps(feedback, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+# -------------------------------------
+# DOCUMENT MODEL
+# -------------------------------------
+# Every format renders the same block list, so the three exports never drift apart.
+
+def report_blocks(feedback):
+    """Feedback JSON -> [(kind, payload)] with kinds title / meta / heading / paragraph / list"""
+    metadata = feedback.get("interview_metadata") or {}
+    blocks = [("title", "Interview Feedback Report")]
+
+    meta = [
+        ("Role", metadata.get("role")),
+        ("Interviewer", metadata.get("persona")),
+        ("Questions", metadata.get("total_questions")),
+        ("Length", metadata.get("interview_length")),
+        ("Date", metadata.get("timestamp")),
+    ]
+    blocks.append(("meta", [(label, str(value)) for label, value in meta if value not in (None, "")]))
+
+    blocks.append(("heading", f"Overall Score: {feedback.get('overall_score', 'N/A')}/100"))
+
+    blocks.append(("heading", "Category Scores"))
+    for key, name in CATEGORIES:
+        category = feedback.get(key) or {}
+        if not isinstance(category, dict) or "score" not in category:
+            continue
+        blocks.append(("subheading", f"{name}: {category['score']}/10"))
+        if category.get("feedback"):
+            blocks.append(("paragraph", str(category["feedback"])))
+
+    for key, title, empty in [
+        ("strengths", "Strengths", "No specific strengths identified."),
+        ("areas_for_improvement", "Areas for Improvement", "No specific areas identified."),
+        ("recommendations", "Recommendations", "No specific recommendations."),
+    ]:
+        blocks.append(("heading", title))
+        items = [str(item) for item in feedback.get(key) or []]
+        blocks.append(("list", items) if items else ("paragraph", empty))
+
+    questions = feedback.get("question_details") or []
+    if questions:
+        blocks.append(("heading", "Questions to Revisit"))
+        blocks.append(("list", [
+            f"Q{q.get('question_number', '?')} ({q.get('original_score', 'N/A')}/10): {q.get('question', '')}"
+            for q in questions
+        ]))
+    return blocks
+
+
+# -------------------------------------
+# RENDERERS
+# -------------------------------------
+
+def render_markdown(feedback):
+    lines = []
+    for kind, payload in report_blocks(feedback):
+        if kind == "title":
+            lines += [f"# {payload}", ""]
+        elif kind == "meta":
+            lines += [f"- **{label}:** {value}" for label, value in payload] + [""]
+        elif kind == "heading":
+            lines += [f"## {payload}", ""]
+        elif kind == "subheading":
+            lines += [f"### {payload}", ""]
+        elif kind == "paragraph":
+            lines += [payload, ""]
+        elif kind == "list":
+            lines += [f"{index}. {item}" for index, item in enumerate(payload, 1)] + [""]
+    return "\n".join(lines).encode("utf-8")
+
+
+HTML_STYLE = """
+body { font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif; color: #1f2937;
+       max-width: 760px; margin: 40px auto; padding: 0 20px; line-height: 1.55; }
+h1 { color: #4f46e5; margin-bottom: 8px; }
+h2 { border-bottom: 2px solid #e5e7eb; padding-bottom: 4px; margin-top: 32px; }
+h3 { margin-bottom: 4px; }
+.meta { color: #6b7280; list-style: none; padding: 0; }
+.meta li { display: inline-block; margin-right: 18px; }
+"""
+
+
+def render_html(feedback):
+    escape = html.escape
+    title = "Interview Feedback Report"
+    body = []
+    for kind, payload in report_blocks(feedback):
+        if kind == "title":
+            title = payload
+            body.append(f"<h1>{escape(payload)}</h1>")
+        elif kind == "meta":
+            body.append('<ul class="meta">' + "".join(
+                f"<li><strong>{escape(label)}:</strong> {escape(value)}</li>" for label, value in payload
+            ) + "</ul>")
+        elif kind == "heading":
+            body.append(f"<h2>{escape(payload)}</h2>")
+        elif kind == "subheading":
+            body.append(f"<h3>{escape(payload)}</h3>")
+        elif kind == "paragraph":
+            body.append(f"<p>{escape(payload)}</p>")
+        elif kind == "list":
+            body.append("<ol>" + "".join(f"<li>{escape(item)}</li>" for item in payload) + "</ol>")
+    document = (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+        f"<title>{escape(title)}</title>\n<style>{HTML_STYLE}</style>\n</head>\n<body>\n"
+        + "\n".join(body)
+        + "\n</body>\n</html>\n"
+    )
+    return document.encode("utf-8")
+
+
+# Minimal PDF writer: standard Helvetica fonts (no embedding, no dependencies), A4 pages,
+# greedy word wrap on an average glyph width, Flate-compressed content streams.
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+MARGIN = 56
+AVERAGE_GLYPH_WIDTH = 0.5  # Helvetica, in em
+
+PDF_STYLES = {
+    # kind: (font, size, space before, indent)
+    "title": ("F2", 20, 0, 0),
+    "meta": ("F1", 10, 4, 0),
+    "heading": ("F2", 14, 16, 0),
+    "subheading": ("F2", 11, 8, 0),
+    "paragraph": ("F1", 10, 3, 0),
+    "list": ("F1", 10, 3, 14),
+}
+
+
+def _wrap(text, size, width):
+    max_chars = max(10, int(width / (size * AVERAGE_GLYPH_WIDTH)))
+    lines, current = [], ""
+    for word in text.split():
+        while len(word) > max_chars:
+            if current:
+                lines.append(current)
+                current = ""
+            lines.append(word[:max_chars])
+            word = word[max_chars:]
+        candidate = f"{current} {word}" if current else word
+        if len(candidate) > max_chars:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines or [""]
+
+
+def _pdf_text(text):
+    encoded = text.encode("cp1252", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _pdf_lines(feedback):
+    """Block list -> [(font, size, space_before, x, text)] positioned lines"""
+    lines = []
+    for kind, payload in report_blocks(feedback):
+        font, size, space, indent = PDF_STYLES[kind]
+        if kind == "meta":
+            entries = [f"{label}: {value}" for label, value in payload]
+        elif kind == "list":
+            entries = [f"{index}. {item}" for index, item in enumerate(payload, 1)]
+        else:
+            entries = [payload]
+        for entry in entries:
+            for number, line in enumerate(_wrap(entry, size, PAGE_WIDTH - 2 * MARGIN - indent)):
+                # Continuation lines of a list item hang under its text
+                x = MARGIN + indent + (size if kind == "list" and number else 0)
+                lines.append((font, size, space if number == 0 else 0, x, line))
+    return lines
+
+
+def render_pdf(feedback):
+    pages, current, y = [], [], PAGE_HEIGHT - MARGIN
+    for font, size, space, x, text in _pdf_lines(feedback):
+        leading = size * 1.4
+        y -= space + leading
+        if y < MARGIN and current:
+            pages.append(current)
+            current, y = [], PAGE_HEIGHT - MARGIN - leading
+        current.append(b"BT /%s %d Tf %.1f %.1f Td (%s) Tj ET" % (font.encode(), size, x, y, _pdf_text(text)))
+    pages.append(current)
+
+    # Object numbers: 1 catalog, 2 page tree, 3-4 fonts, then (page, content) pairs
+    objects = {
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        4: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    }
+    kids = []
+    for index, commands in enumerate(pages):
+        page_number, content_number = 5 + 2 * index, 6 + 2 * index
+        kids.append(b"%d 0 R" % page_number)
+        objects[page_number] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, content_number)
+        )
+        stream = zlib.compress(b"\n".join(commands))
+        objects[content_number] = b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream)
+    objects[1] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(pages))
+
+    output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(output)
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, objects[number])
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for number in sorted(objects):
+        output += b"%010d 00000 n \n" % offsets[number]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+RENDERERS = {"pdf": render_pdf, "html": render_html, "md": render_markdown}
+
+
+def render_report(feedback, fmt):
+    return RENDERERS[fmt](feedback)
+
+
+def _render_to_file(feedback, fmt, path):
+    """Pool task: render and write atomically, so readers never see a partial artifact"""
+    content = render_report(feedback, fmt)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(content)
+    os.replace(temp_path, path)
+    return path
+
+
+# -------------------------------------
+# ARTIFACT CACHE
+# -------------------------------------
+
+class ReportCache:
+    """Content-addressed report sources and artifacts on disk, rendered in a process pool"""
+
+    def __init__(self, directory=REPORT_DIR, workers=REPORT_WORKERS):
+        self.directory = os.path.abspath(directory)
+        self.workers = workers
+        self._pool = None
+        self._inflight = {}  # (report_id, fmt) -> (Future, pool), so concurrent downloads share one render
+        self._lock = threading.Lock()
+        self._publishes = 0
+
+    def _source_path(self, report_id):
+        if not _REPORT_ID.match(report_id or ""):
+            raise ReportError("Unknown report")
+        return os.path.join(self.directory, f"{report_id}.json")
+
+    def artifact_path(self, report_id, fmt):
+        if fmt not in REPORT_FORMATS:
+            raise ReportError(f"Unsupported format '{fmt}'")
+        self._source_path(report_id)
+        return os.path.join(self.directory, f"{report_id}-r{RENDERER_VERSION}.{fmt}")
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                # Spawned (not forked) workers: the web process has threads and open sockets
+                self._pool = ProcessPoolExecutor(
+                    max_workers=max(1, self.workers), mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def _reset_pool(self, broken):
+        """Drop a pool whose worker died (OOM kill, crash) so the next render builds a new one"""
+        with self._lock:
+            if self._pool is not broken:
+                return
+            self._pool = None
+            for key, (_, pool) in list(self._inflight.items()):
+                if pool is broken:
+                    del self._inflight[key]
+        print("Report render pool broken, starting a new one")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def publish(self, feedback, prerender=REPORT_PRERENDER):
+        """Store feedback JSON; returns its report id and queues background renders"""
+        report_id = report_id_for(feedback)
+        path = self._source_path(report_id)
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(feedback, f)
+            os.replace(temp_path, path)
+
+        for fmt in prerender:
+            if fmt in REPORT_FORMATS:
+                try:
+                    self._render(report_id, fmt, feedback)
+                except Exception as e:
+                    # Only an optimization: the download renders on demand instead
+                    print(f"Report prerender ({fmt}) skipped: {e}")
+
+        self._publishes += 1
+        if self._publishes % PRUNE_EVERY == 0:
+            threading.Thread(target=self.prune, daemon=True).start()
+        return report_id
+
+    def source(self, report_id):
+        try:
+            with open(self._source_path(report_id), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ReportError("Unknown report")
+
+    def _render(self, report_id, fmt, feedback, retry=True):
+        """(Future, pool) for the artifact's render (None if it's already on disk)"""
+        key = (report_id, fmt)
+        path = self.artifact_path(report_id, fmt)
+        executor = self._executor()
+        with self._lock:
+            entry = self._inflight.get(key)
+            if entry is not None:
+                return entry
+            if os.path.exists(path):
+                return None
+            try:
+                future = executor.submit(_render_to_file, feedback, fmt, path)
+            except BrokenProcessPool:
+                future = None
+            else:
+                entry = self._inflight[key] = (future, executor)
+        if future is None:
+            self._reset_pool(executor)
+            if not retry:
+                raise BrokenProcessPool("Report render pool keeps breaking")
+            return self._render(report_id, fmt, feedback, retry=False)
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return entry
+
+    def _forget(self, key, future):
+        with self._lock:
+            # Only if it's still this render's entry, not a retry submitted since
+            if self._inflight.get(key, (None,))[0] is future:
+                del self._inflight[key]
+
+    def get(self, report_id, fmt, timeout=RENDER_TIMEOUT):
+        """Path of the rendered artifact, rendering it first if needed"""
+        path = self.artifact_path(report_id, fmt)
+        if os.path.exists(path):
+            return path
+        for attempt in range(2):
+            with self._lock:
+                entry = self._inflight.get((report_id, fmt))
+            if entry is None:
+                entry = self._render(report_id, fmt, self.source(report_id))
+            if entry is None:
+                return path
+            future, pool = entry
+            try:
+                future.result(timeout=timeout)
+                return path
+            except BrokenProcessPool:
+                # A render worker died mid-render: retry once on a fresh pool
+                self._reset_pool(pool)
+                if attempt:
+                    raise
+
+    def prune(self, max_age_days=REPORT_TTL_DAYS):
+        """Delete reports (source and artifacts) older than the TTL"""
+        cutoff = time.time() - max_age_days * 86400
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        removed = 0
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
@@ -0,0 +1,300 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from document_pool import DocumentPool
+from resume_processing import RESUME_EXTENSIONS
+
+# -------------------------------------
+# BULK RESUME INGESTION
+# -------------------------------------
+# Recruiters upload a batch of CVs (multipart files and/or zip archives). Text
+# extraction runs in a supervised parser pool (see document_pool.py: PyPDF2 is
+# CPU-bound, holds the GIL and runs under memory / CPU limits there), and each
+# extracted resume is handed to a small thread pool that makes its LLM calls (summary
+# + one opening question per requested role) under a concurrency limit. Progress is
+# yielded as events while the batch runs; every finished candidate is persisted so
+# start_interview can pick it up later by candidate_id.
+#
+# Candidate ids are content hashes, so re-uploading the same CV reuses the stored
+# result instead of paying for extraction and LLM calls again.
+#
+# Uploaded files and archive members are spooled to a per-batch temp directory as
+# they are collected, and the parsers read them from there, so a batch never sits in
+# the worker's memory. The file count and total uncompressed size are checked while
+# collecting, before anything is extracted past the limits.
+
+CANDIDATE_STORE_DIR = os.environ.get("CANDIDATE_STORE_DIR", os.path.join("data", "candidates"))
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+INGEST_LLM_CONCURRENCY = int(os.environ.get("INGEST_LLM_CONCURRENCY", "4"))
+INGEST_MAX_FILES = int(os.environ.get("INGEST_MAX_FILES", "500"))
+INGEST_MAX_BATCH_BYTES = int(os.environ.get("INGEST_MAX_BATCH_MB", "250")) * 1024 * 1024   # uncompressed, zip bomb guard
+INGEST_MAX_JOBS = int(os.environ.get("INGEST_MAX_JOBS", "1"))   # concurrent batches per worker process
+
+MAX_RESUME_BYTES = 5 * 1024 * 1024             # same cap as a single interactive upload
+COPY_CHUNK_BYTES = 1024 * 1024
+
+_CANDIDATE_ID = re.compile(r"^[0-9a-f]{16}$")
+
+ingest_slots = threading.BoundedSemaphore(INGEST_MAX_JOBS)
+
+
+class IngestError(Exception):
+    """Raised for batches that can't be accepted (bad archive, too many files, ...)"""
+
+
+def candidate_id_for(path):
+    """Content hash of a spooled resume, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def opening_key(role, persona):
+    return f"{role}:{persona}"
+
+
+# -------------------------------------
+# CANDIDATE STORE
+# -------------------------------------
+
+class CandidateStore:
+    """One JSON file per candidate; writes are atomic (temp file + rename)"""
+
+    def __init__(self, directory=CANDIDATE_STORE_DIR):
+        self.directory = directory
+
+    def _path(self, candidate_id):
+        if not _CANDIDATE_ID.match(candidate_id or ""):
+            raise KeyError(candidate_id)
+        return os.path.join(self.directory, f"{candidate_id}.json")
+
+    def get(self, candidate_id):
+        try:
+            with open(self._path(candidate_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def put(self, record):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(record["candidate_id"])
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f)
+        os.replace(temp_path, path)
+
+
+# -------------------------------------
+# BATCH INPUT
+# -------------------------------------
+
+class ResumeBatch:
+    """Resumes of one batch, spooled to disk as they are collected: files = [(filename, path)]"""
+
+    def __init__(self, max_files=INGEST_MAX_FILES, max_bytes=INGEST_MAX_BATCH_BYTES, spool_dir=None):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.directory = tempfile.mkdtemp(prefix="bulk-ingest-", dir=spool_dir)
+        self.files = []
+        self.total_bytes = 0
+
+    def _spool(self, filename, source, limit):
+        """Copy a resume stream to the spool dir, stopping at the per-file and batch limits"""
+        if len(self.files) >= self.max_files:
+            raise IngestError(f"At most {self.max_files} resumes per batch")
+        path = os.path.join(self.directory, f"{len(self.files)}{os.path.splitext(filename)[1].lower()}")
+        size = 0
+        with open(path, "wb") as f:
+            for chunk in iter(lambda: source.read(COPY_CHUNK_BYTES), b""):
+                size += len(chunk)
+                if size > MAX_RESUME_BYTES:
+                    raise IngestError(f"{filename} is larger than {MAX_RESUME_BYTES // (1024 * 1024)}MB")
+                if self.total_bytes + size > limit:
+                    raise IngestError(f"The batch expands to more than {self.max_bytes // (1024 * 1024)}MB")
+                f.write(chunk)
+        self.total_bytes += size
+        self.files.append((filename, path))
+
+    def add(self, filename, stream):
+        """Add one uploaded file (a resume or a zip archive of resumes) from a binary stream"""
+        extension = os.path.splitext(filename)[1].lower()
+        if extension in RESUME_EXTENSIONS:
+            self._spool(filename, stream, self.max_bytes)
+            return
+        if extension != ".zip":
+            raise IngestError(f"{filename}: only .pdf, .txt and .zip files are accepted")
+
+        try:
+            archive = zipfile.ZipFile(stream)
+        except zipfile.BadZipFile:
+            raise IngestError(f"{filename} is not a valid zip archive")
+
+        with archive:
+            for info in archive.infolist():
+                name = info.filename
+                base = os.path.basename(name)
+                if info.is_dir() or name.startswith("__MACOSX/") or base.startswith("."):
+                    continue
+                if os.path.splitext(base)[1].lower() not in RESUME_EXTENSIONS:
+                    continue
+                # Declared sizes are checked up front; the copy enforces the same limits
+                # in case a member inflates past what its header says
+                if info.file_size > MAX_RESUME_BYTES:
+                    raise IngestError(f"{name} is larger than {MAX_RESUME_BYTES // (1024 * 1024)}MB")
+                if self.total_bytes + info.file_size > self.max_bytes:
+                    raise IngestError(f"{filename} expands past the {self.max_bytes // (1024 * 1024)}MB batch limit")
+                try:
+                    with archive.open(info) as member:
+                        self._spool(base, member, self.max_bytes)
+                except (zipfile.BadZipFile, zipfile.LargeZipFile, RuntimeError, NotImplementedError) as e:
+                    raise IngestError(f"{filename}: can't extract {name} ({e})")
+
+    def cleanup(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# -------------------------------------
+# PIPELINE
+# -------------------------------------
+
+class _LLMPool(ThreadPoolExecutor):
+    """LLM thread pool that drops queued work when the batch is abandoned
+
+    Leaving the with block on an exception - including GeneratorExit when the client of
+    /bulk_ingest disconnects - cancels queued candidates and sets abandoned, so running
+    ones stop before their next LLM call instead of spending quota nobody will read.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.abandoned = threading.Event()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.abandoned.set()
+        self.shutdown(wait=True, cancel_futures=exc_type is not None)
+        return False
+
+
+def _prepare_candidate(record, roles, persona, summarize, opening, store, abandoned):
+    """LLM stage for one candidate: summary (if missing), then the missing opening questions"""
+    if abandoned.is_set():
+        return record
+    if not record.get("resume_summary"):
+        try:
+            record["resume_summary"] = summarize(record["resume_text"])
+        except Exception as e:
+            print(f"Bulk ingest: summary failed for {record['filename']}: {e}")
+            record["resume_summary"] = {}
+
+    questions = record.setdefault("opening_questions", {})
+    for role in roles:
+        key = opening_key(role, persona)
+        if abandoned.is_set():
+            return record
+        if key not in questions:
+            questions[key] = opening(role, persona, record["resume_text"], record["resume_summary"], True)
+
+    record["updated"] = round(time.time())
+    store.put(record)
+    return record
+
+
+def _result_event(record, status):
+    return {
+        "event": status,
+        "candidate_id": record["candidate_id"],
+        "file": record["filename"],
+        "name": (record.get("resume_summary") or {}).get("name"),
+        "opening_questions": record.get("opening_questions", {}),
+    }
+
+
+def ingest_resumes(files, roles, persona, summarize, opening, store,
+                   workers=INGEST_WORKERS, llm_concurrency=INGEST_LLM_CONCURRENCY):
+    """Process a batch; yields progress events (dicts) as work completes
+
+    files: [(filename, path)] (see ResumeBatch); summarize(text) -> dict and opening(role, persona,
+    text, summary, has_resume) -> str make the LLM calls.
+    """
+    if len(files) > INGEST_MAX_FILES:
+        raise IngestError(f"At most {INGEST_MAX_FILES} resumes per batch")
+
+    started = time.perf_counter()
+    counts = {"done": 0, "cached": 0, "failed": 0, "duplicate": 0}
+    yield {"event": "queued", "total": len(files), "roles": roles, "persona": persona}
+
+    # Its own parsers, so a large batch can't hold up interactive uploads
+    with DocumentPool(workers=workers) as extract_pool, \
+            _LLMPool(max_workers=max(1, llm_concurrency)) as llm_pool:
+        extracting = {}
+        preparing = {}
+        seen = set()
+
+        for filename, path in files:
+            candidate_id = candidate_id_for(path)
+            if candidate_id in seen:
+                counts["duplicate"] += 1
+                yield {"event": "duplicate", "file": filename, "candidate_id": candidate_id}
+                continue
+            seen.add(candidate_id)
+            record = store.get(candidate_id)
+            if record is not None:
+                missing = [role for role in roles if opening_key(role, persona) not in record.get("opening_questions", {})]
+                if not missing:
+                    counts["cached"] += 1
+                    yield _result_event(record, "cached")
+                    continue
+                preparing[llm_pool.submit(_prepare_candidate, record, roles, persona, summarize, opening, store, llm_pool.abandoned)] = filename
+                continue
+            future = extract_pool.submit(filename, path=path)
+            extracting[future] = (filename, candidate_id)
+
+        pending = set(extracting) | set(preparing)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in extracting:
+                    filename, candidate_id = extracting.pop(future)
+                    try:
+                        text = future.result()
+                    except Exception as e:
+                        counts["failed"] += 1
+                        yield {"event": "failed", "file": filename, "error": f"Could not read file: {e}"}
+                        continue
+                    if not text.strip():
+                        counts["failed"] += 1
+                        yield {"event": "failed", "file": filename, "error": "No readable text"}
+                        continue
+                    record = {
+                        "candidate_id": candidate_id,
+                        "filename": filename,
+                        "resume_text": text,
+                        "created": round(time.time()),
+                    }
+                    yield {"event": "extracted", "file": filename, "candidate_id": candidate_id, "chars": len(text)}
+                    llm_future = llm_pool.submit(_prepare_candidate, record, roles, persona, summarize, opening, store, llm_pool.abandoned)
+                    preparing[llm_future] = filename
+                    pending.add(llm_future)
+                else:
+                    filename = preparing.pop(future)
+                    try:
+                        record = future.result()
+                    except Exception as e:
+                        counts["failed"] += 1
+                        yield {"event": "failed", "file": filename, "error": f"LLM step failed: {e}"}
+                        continue
+                    counts["done"] += 1
+                    yield _result_event(record, "done")
+
+    yield {"event": "complete", **counts, "seconds": round(time.perf_counter() - started, 2)}
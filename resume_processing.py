@@ -0,0 +1,249 @@
+import os
+import re
+from collections import Counter
+from io import BytesIO
+
+# -------------------------------------
+# RESUME PREPROCESSING
+# -------------------------------------
+# Everything here is offline and runs in a single pass over the text, so it is
+# safe to call on every upload / interview start without touching the LLM.
+
+# Rough conversion used for prompt budgets (Llama tokenizers average ~4 chars/token)
+CHARS_PER_TOKEN = 4
+
+# Default prompt budgets (in tokens)
+SUMMARY_TOKEN_BUDGET = 750     # resume summary prompt (was resume_text[:3000])
+PREVIEW_TOKEN_BUDGET = 250     # opening-question / retry preview (was resume_text[:1000])
+
+# Header aliases -> canonical section name
+SECTION_ALIASES = {
+    "contact": ["contact", "contact information", "personal details", "personal information"],
+    "summary": ["summary", "professional summary", "profile", "objective", "career objective", "about me", "about"],
+    "education": ["education", "academic background", "academics", "qualifications", "academic qualifications"],
+    "experience": ["experience", "work experience", "professional experience", "employment", "employment history",
+                   "work history", "internships", "internship", "career history"],
+    "skills": ["skills", "technical skills", "core competencies", "competencies", "technologies", "tools",
+               "key skills", "skill set", "skills & tools"],
+    "projects": ["projects", "academic projects", "personal projects", "key projects", "selected projects"],
+    "certifications": ["certifications", "certificates", "licenses", "courses", "training"],
+    "achievements": ["achievements", "awards", "honors", "honours", "accomplishments", "publications"],
+    "other": ["interests", "hobbies", "languages", "references", "declaration", "extracurricular activities",
+              "activities", "volunteering"],
+}
+
+# Chunks scoring below this are never worth prompt space (hobbies, references, ...)
+MIN_CHUNK_SCORE = 0.1
+
+_HEADER_LOOKUP = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# How useful each section is to an interviewer, independent of the role
+SECTION_PRIORS = {
+    "experience": 1.0,
+    "projects": 1.0,
+    "skills": 0.9,
+    "summary": 0.6,
+    "achievements": 0.5,
+    "education": 0.5,
+    "certifications": 0.4,
+    "header": 0.3,
+    "contact": 0.1,
+    "other": 0.05,
+}
+
+# Boilerplate lines that never help an interviewer
+_BOILERPLATE_RE = re.compile(
+    r"^(curriculum vitae|resume|résumé|page \d+( of \d+)?|references available upon request|"
+    r"i hereby declare.*|declaration)$",
+    re.IGNORECASE,
+)
+
+_LIGATURES = str.maketrans({"ﬁ": "fi", "ﬂ": "fl", "ﬀ": "ff", "ﬃ": "ffi", "ﬄ": "ffl", " ": " ",
+                            "–": "-", "—": "-", "’": "'", "‘": "'",
+                            "“": '"', "”": '"', "\t": " "})
+_BULLET_RE = re.compile(r"^[•●▪◦‣⁃∙·\*•▪◦➢➤►✓✔-]+\s*")
+_HYPHEN_BREAK_RE = re.compile(r"(\w)-\n(\w)")
+_SPACES_RE = re.compile(r"[ \f\v\r]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the to with was were will i my me we our "
+    "using used use".split()
+)
+
+
+RESUME_EXTENSIONS = {".pdf", ".txt"}
+
+
+def extract_pdf_text(file_content):
+    """Extract text from PDF bytes (PyPDF2 is imported on first use)"""
+    import PyPDF2
+
+    pdf_reader = PyPDF2.PdfReader(BytesIO(file_content))
+    resume_text = ""
+    for page in pdf_reader.pages:
+        resume_text += page.extract_text() + "\n"
+    return resume_text
+
+
+def extract_resume_text(filename, file_content):
+    """Normalized text of a .pdf / .txt resume (module-level so process pools can run it)"""
+    if os.path.splitext(filename)[1].lower() == ".pdf":
+        text = extract_pdf_text(file_content)
+    else:
+        text = file_content.decode("utf-8", errors="ignore")
+    return normalize_resume_text(text)
+
+
+def normalize_resume_text(text):
+    """Clean up common PDF extraction noise (ligatures, broken hyphenation, bullets, spacing)"""
+    if not text:
+        return ""
+
+    text = text.translate(_LIGATURES).replace("\r\n", "\n")
+    text = _HYPHEN_BREAK_RE.sub(r"\1\2", text)
+
+    lines = []
+    for raw_line in text.split("\n"):
+        line = _SPACES_RE.sub(" ", raw_line).strip()
+        if line:
+            line = _BULLET_RE.sub("- ", line) if _BULLET_RE.match(line) else line
+            if _BOILERPLATE_RE.match(line):
+                continue
+        lines.append(line)
+
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def _match_header(line):
+    """Return the canonical section name if the line looks like a section header"""
+    if len(line) > 40:
+        return None
+    key = line.strip(" :-|").lower()
+    return _HEADER_LOOKUP.get(key)
+
+
+def segment_sections(text):
+    """Split normalized resume text into [(section_name, section_text), ...] in document order
+
+    Text before the first recognised header is labelled "header" (usually name and contact line).
+    """
+    sections = []
+    current_name = "header"
+    current_lines = []
+
+    for line in text.split("\n"):
+        header = _match_header(line) if line else None
+        if header:
+            if any(current_lines):
+                sections.append((current_name, "\n".join(current_lines).strip()))
+            current_name = header
+            current_lines = []
+        else:
+            current_lines.append(line)
+
+    if any(current_lines):
+        sections.append((current_name, "\n".join(current_lines).strip()))
+
+    return sections
+
+
+def _chunk_section(section_text, max_chars):
+    """Split a section into chunks on blank lines / bullets, capped at max_chars each"""
+    chunks = []
+    current = []
+    current_len = 0
+
+    for line in section_text.split("\n"):
+        starts_new = not line or line.startswith("- ")
+        if current and (starts_new or current_len + len(line) > max_chars):
+            chunks.append("\n".join(current))
+            current = []
+            current_len = 0
+        if line:
+            current.append(line[:max_chars])
+            current_len += len(line) + 1
+
+    if current:
+        chunks.append("\n".join(current))
+
+    return chunks
+
+
+def _tokenize(text):
+    return [tok.strip(".") for tok in _TOKEN_RE.findall(text.lower()) if tok not in _STOPWORDS]
+
+
+def _area_terms(areas):
+    """Turn role areas like ["data structures", "SQL"] into a weighted term set"""
+    terms = Counter()
+    for area in areas or []:
+        for tok in _tokenize(area):
+            terms[tok] += 1
+    return terms
+
+
+def score_chunk(chunk, section, area_terms):
+    """Cheap lexical relevance score: role-term hits (saturating) weighted by section prior"""
+    tokens = _tokenize(chunk)
+    if not tokens:
+        return 0.0
+
+    prior = SECTION_PRIORS.get(section, 0.3)
+    if not area_terms:
+        return prior
+
+    counts = Counter(tokens)
+    hits = 0.0
+    for term, weight in area_terms.items():
+        tf = counts.get(term, 0)
+        if tf:
+            # BM25-style saturation so one keyword-stuffed line can't dominate
+            hits += weight * (tf * 2.2) / (tf + 1.2)
+
+    density = hits / (len(tokens) ** 0.5)
+    return prior * (1.0 + density)
+
+
+def select_resume_context(text, areas=None, token_budget=PREVIEW_TOKEN_BUDGET, max_chunk_chars=400):
+    """Return the most relevant resume content that fits within token_budget
+
+    Chunks are ranked by score_chunk (role areas + section priors), greedily packed into
+    the budget, then re-emitted in original document order under their section labels.
+    """
+    normalized = normalize_resume_text(text)
+    if not normalized:
+        return ""
+
+    char_budget = token_budget * CHARS_PER_TOKEN
+    if len(normalized) <= char_budget:
+        return normalized
+    # Leave a little room for the [Section] labels added below
+    char_budget = int(char_budget * 0.95)
+
+    area_terms = _area_terms(areas)
+    candidates = []  # (score, position, section, chunk)
+    for section, section_text in segment_sections(normalized):
+        for chunk in _chunk_section(section_text, max_chunk_chars):
+            candidates.append((score_chunk(chunk, section, area_terms), len(candidates), section, chunk))
+
+    selected = []
+    used = 0
+    for score, position, section, chunk in sorted(candidates, key=lambda c: (-c[0], c[1])):
+        cost = len(chunk) + 1
+        if score < MIN_CHUNK_SCORE or used + cost > char_budget:
+            continue
+        selected.append((position, section, chunk))
+        used += cost
+
+    selected.sort()
+    parts = []
+    last_section = None
+    for _, section, chunk in selected:
+        if section != last_section and section != "header":
+            parts.append(f"[{section.title()}]")
+        parts.append(chunk)
+        last_section = section
+
+    return "\n".join(parts)
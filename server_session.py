@@ -0,0 +1,109 @@
+import secrets
+
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+from state_store import VersionConflict
+
+# -------------------------------------
+# SERVER-SIDE SESSIONS (STATELESS WORKERS)
+# -------------------------------------
+# With STATELESS_WORKERS=1 the session cookie carries only a signed, random session
+# id; everything the routes keep in `session` (interview state, resume, retry data)
+# lives in the shared state store. Any worker on any node can serve any request, as
+# long as they share STATE_STORE and SESSION_SECRET.
+#
+# Each request remembers the version it read. The write happens in commit() (from an
+# after_request hook, so a conflict can still become the response): if another
+# request for the same session wrote first, nothing is stored and VersionConflict is
+# raised instead of silently dropping one of the two updates.
+
+SESSION_KEY_PREFIX = "session:"
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, version=0, new=False):
+        def on_update(session):
+            session.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.version = version
+        self.new = new
+        self.modified = False
+        self.committed = False
+
+
+class StoreSessionInterface(SessionInterface):
+    def __init__(self, store):
+        self.store = store
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt="server-session")
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode()
+            except BadSignature:
+                sid = None
+            if sid:
+                state, version = self.store.get(SESSION_KEY_PREFIX + sid)
+                if state is not None:
+                    return ServerSession(state, sid=sid, version=version)
+        return ServerSession(sid=secrets.token_urlsafe(24), new=True)
+
+    def commit(self, session):
+        """Write the session if this request changed it; raises VersionConflict on a lost race"""
+        if not isinstance(session, ServerSession) or not session.modified:
+            return
+        key = SESSION_KEY_PREFIX + session.sid
+        if not session and not session.new:
+            self.store.delete(key)
+        elif session:
+            session.version = self.store.put(key, dict(session), expected_version=session.version)
+        session.modified = False
+        session.committed = True
+
+    def save_session(self, app, session, response):
+        # Normally commit() already ran in the after_request hook; this catches
+        # responses that bypass it (e.g. the WebSocket route)
+        if session.modified:
+            try:
+                self.commit(session)
+            except VersionConflict as e:
+                print(f"Session write dropped (stale): {e}")
+                return
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session:
+            if not session.new:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not session.committed and not self.should_set_cookie(app, session):
+            return
+        response.vary.add("Cookie")
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode(),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def state_conflict_response():
+    from flask import jsonify
+
+    response = jsonify({
+        "error": "Your interview was updated by another request at the same time - please try again.",
+        "conflict": True,
+    })
+    response.status_code = 409
+    return response
@@ -0,0 +1,297 @@
+import importlib.util
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# -------------------------------------
+# SERVER-SIDE SPEECH TO TEXT
+# -------------------------------------
+# Browsers without the Web Speech API (Firefox, many mobile browsers) stream raw
+# 16 kHz mono 16-bit PCM over the interview channel instead. Recognition runs on a
+# CPU-only Vosk model inside a process pool, so decoding never blocks the web worker.
+#
+# Each audio stream is pinned to one single-process executor (recognizers are
+# stateful), and each connection has at most one chunk in flight plus a bounded
+# buffer, so one long answer can't queue ahead of everybody else's audio.
+#
+# Enabled when the optional `vosk` package is installed and VOSK_MODEL_PATH points
+# at an unpacked model (e.g. vosk-model-small-en-us-0.15).
+
+SAMPLE_RATE = 16000
+BYTES_PER_SECOND = SAMPLE_RATE * 2
+
+VOSK_MODEL_PATH = os.environ.get("VOSK_MODEL_PATH")
+STT_WORKERS = int(os.environ.get("STT_WORKERS", "2"))
+
+CHUNK_BYTES = BYTES_PER_SECOND // 2                 # audio handed to the recognizer per task
+BUFFER_HIGH_WATERMARK = BYTES_PER_SECOND * 5        # ask the client to pause above this
+BUFFER_LOW_WATERMARK = BYTES_PER_SECOND * 1         # ...and to resume below this
+BUFFER_HARD_LIMIT = BYTES_PER_SECOND * 10           # drop the stream if the client ignores pause
+MAX_ANSWER_SECONDS = int(os.environ.get("STT_MAX_ANSWER_SECONDS", "300"))
+FINISH_TIMEOUT = 30.0
+
+POLL_INTERVAL = 0.05
+
+
+class SpeechError(Exception):
+    """Raised for client-visible transcription problems (limits exceeded, unavailable)"""
+
+
+class _WorkerCrashed(SpeechError):
+    """The stream's worker process died; its slot already has a replacement"""
+
+
+def speech_available():
+    """True if vosk is installed and a model is configured (checked without importing vosk)"""
+    if not VOSK_MODEL_PATH or not os.path.isdir(VOSK_MODEL_PATH):
+        return False
+    return importlib.util.find_spec("vosk") is not None
+
+
+# -------------------------------------
+# WORKER PROCESS SIDE
+# -------------------------------------
+# Module-level state below only exists inside pool processes.
+
+_model = None
+_recognizers = {}
+
+
+def _init_worker(model_path):
+    global _model
+    import vosk
+
+    vosk.SetLogLevel(-1)
+    _model = vosk.Model(model_path)
+
+
+def _open_stream(stream_id, sample_rate):
+    import vosk
+
+    recognizer = vosk.KaldiRecognizer(_model, sample_rate)
+    recognizer.SetWords(False)
+    _recognizers[stream_id] = recognizer
+
+
+def _feed_stream(stream_id, pcm):
+    """Feed audio; returns ("final", segment_text) at an utterance boundary, else ("partial", text)"""
+    recognizer = _recognizers[stream_id]
+    if recognizer.AcceptWaveform(pcm):
+        return "final", json.loads(recognizer.Result()).get("text", "")
+    return "partial", json.loads(recognizer.PartialResult()).get("partial", "")
+
+
+def _finish_stream(stream_id):
+    recognizer = _recognizers.pop(stream_id, None)
+    if recognizer is None:
+        return ""
+    return json.loads(recognizer.FinalResult()).get("text", "")
+
+
+def _drop_stream(stream_id):
+    _recognizers.pop(stream_id, None)
+
+
+# -------------------------------------
+# WEB WORKER SIDE
+# -------------------------------------
+
+class SpeechPool:
+    """Stream-affine pool: N single-process executors, each owning its streams' recognizers"""
+
+    def __init__(self, model_path, size):
+        self.model_path = model_path
+        self._executors = [self._new_executor() for _ in range(max(1, size))]
+        self._active = [0] * len(self._executors)
+        self._lock = threading.Lock()
+
+    def _new_executor(self):
+        # Spawned (not forked) workers: the web process has threads and open sockets
+        return ProcessPoolExecutor(
+            max_workers=1, initializer=_init_worker, initargs=(self.model_path,),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _replace(self, index, broken, shutdown=True):
+        with self._lock:
+            if self._executors[index] is not broken:
+                return
+            self._executors[index] = self._new_executor()
+        print("Speech worker crashed, starting a new one")
+        if shutdown:
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    def _check_broken(self, index, executor, future):
+        # A broken executor has already torn itself down; just swap in a new one
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._replace(index, executor, shutdown=False)
+
+    def assign(self):
+        """Pick the executor with the fewest active streams"""
+        with self._lock:
+            index = min(range(len(self._executors)), key=self._active.__getitem__)
+            self._active[index] += 1
+            return index
+
+    def release(self, index):
+        with self._lock:
+            self._active[index] -= 1
+
+    def submit(self, index, fn, *args):
+        executor = self._executors[index]
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # The worker died (OOM kill, crash) and took its streams' recognizers with it;
+            # later streams assigned to this slot start on a fresh worker
+            self._replace(index, executor)
+            raise _WorkerCrashed("Speech recognition restarted - please record your answer again")
+        future.add_done_callback(lambda done: self._check_broken(index, executor, done))
+        return future
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_speech_pool():
+    """Create the pool on first use (per web worker process)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if not speech_available():
+                raise SpeechError("Server speech recognition is not available")
+            _pool = SpeechPool(VOSK_MODEL_PATH, STT_WORKERS)
+        return _pool
+
+
+class TranscriptionStream:
+    """One answer's worth of audio from one connection
+
+    feed() buffers incoming PCM; poll() advances recognition and returns events to
+    send back ("partial" transcripts, "pause"/"resume" flow control). finish()
+    drains the buffer and returns the final transcript.
+    """
+
+    _counter = 0
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        TranscriptionStream._counter += 1
+        self.stream_id = f"{os.getpid()}-{TranscriptionStream._counter}-{time.monotonic_ns()}"
+        self.pool = get_speech_pool()
+        self.worker = self.pool.assign()
+        self.buffer = bytearray()
+        self.inflight = None
+        self.paused = False
+        self.received_bytes = 0
+        self.segments = []      # finalized utterances
+        self.partial = ""
+        self.closed = False
+        try:
+            try:
+                self._call(_open_stream, self.stream_id, sample_rate)
+            except _WorkerCrashed:
+                # A new stream has nothing to lose, so open it on the replacement worker
+                self._call(_open_stream, self.stream_id, sample_rate)
+        except BaseException:
+            self.closed = True
+            self.pool.release(self.worker)
+            raise
+
+    @staticmethod
+    def _wait(future, timeout):
+        """future.result(), with every failure turned into a SpeechError the channel can report"""
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            raise SpeechError("Speech recognition timed out")
+        except BrokenProcessPool:
+            raise _WorkerCrashed("Speech recognition restarted - please record your answer again")
+        except SpeechError:
+            raise
+        except Exception as e:
+            raise SpeechError(f"Transcription failed: {e}")
+
+    def _call(self, fn, *args):
+        return self._wait(self.pool.submit(self.worker, fn, *args), FINISH_TIMEOUT)
+
+    @property
+    def busy(self):
+        return bool(self.inflight or self.buffer)
+
+    def feed(self, pcm):
+        """Buffer a chunk of audio; returns flow-control events"""
+        self.received_bytes += len(pcm)
+        if self.received_bytes > MAX_ANSWER_SECONDS * BYTES_PER_SECOND:
+            raise SpeechError(f"Answers are limited to {MAX_ANSWER_SECONDS // 60} minutes of audio")
+        if len(self.buffer) + len(pcm) > BUFFER_HARD_LIMIT:
+            raise SpeechError("Audio is arriving faster than it can be transcribed")
+
+        self.buffer.extend(pcm)
+        if not self.paused and len(self.buffer) > BUFFER_HIGH_WATERMARK:
+            self.paused = True
+            return [("pause", {})]
+        return []
+
+    def _transcript(self):
+        return " ".join(part for part in self.segments + [self.partial] if part).strip()
+
+    def poll(self):
+        """Collect a finished chunk (if any) and submit the next one; returns events"""
+        events = []
+        if self.inflight is not None and self.inflight.done():
+            try:
+                kind, text = self.inflight.result()
+            except Exception as e:
+                raise SpeechError(f"Transcription failed: {e}")
+            finally:
+                self.inflight = None
+            if kind == "final":
+                if text:
+                    self.segments.append(text)
+                self.partial = ""
+            else:
+                self.partial = text
+            events.append(("partial", {"text": self._transcript()}))
+
+        if self.inflight is None and self.buffer:
+            chunk = bytes(self.buffer[:CHUNK_BYTES])
+            del self.buffer[:CHUNK_BYTES]
+            self.inflight = self.pool.submit(self.worker, _feed_stream, self.stream_id, chunk)
+
+        if self.paused and len(self.buffer) < BUFFER_LOW_WATERMARK:
+            self.paused = False
+            events.append(("resume", {}))
+        return events
+
+    def finish(self):
+        """Transcribe whatever is still buffered and return the full transcript"""
+        deadline = time.monotonic() + FINISH_TIMEOUT
+        while self.busy:
+            if time.monotonic() > deadline:
+                raise SpeechError("Timed out finishing transcription")
+            self.poll()
+            if self.inflight is not None:
+                self._wait(self.inflight, max(0.0, deadline - time.monotonic()))
+
+        tail = self._call(_finish_stream, self.stream_id)
+        if tail:
+            self.segments.append(tail)
+        self.partial = ""
+        self.close(drop=False)
+        return self._transcript()
+
+    def close(self, drop=True):
+        if self.closed:
+            return
+        self.closed = True
+        if drop:
+            try:
+                self.pool.submit(self.worker, _drop_stream, self.stream_id)
+            except SpeechError:
+                pass  # its worker crashed, so there is no recognizer left to drop
+        self.pool.release(self.worker)
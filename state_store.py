@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# -------------------------------------
+# SERVER-SIDE INTERVIEW STATE
+# -------------------------------------
+# Keyed by interview id. Every write bumps a version number; callers that pass the
+# version they read get optimistic concurrency (VersionConflict instead of a lost update).
+#
+# Backends share one contract (get / put / delete) and are chosen with STATE_STORE:
+#   memory (default)          per process - fine for one worker or sticky routing
+#   sqlite:///path/state.db   shared by every worker process on the host
+#   redis://host:6379/0       shared by every node (needs `pip install redis`)
+
+
+class VersionConflict(Exception):
+    """Raised when a write is based on a stale version of the state"""
+
+
+class MemoryStateStore:
+    """Per-process store; entries expire after ttl seconds without a write"""
+
+    PRUNE_EVERY = 500  # writes between sweeps of expired entries
+
+    def __init__(self, ttl=6 * 60 * 60):
+        self.ttl = ttl
+        self._entries = {}  # key -> (version, expires_at, serialized state)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key):
+        """Return (state, version), or (None, 0) if the key is unknown or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, 0
+            version, expires_at, payload = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None, 0
+        # Stored serialized so callers never share mutable objects with the store
+        return json.loads(payload), version
+
+    def put(self, key, state, expected_version=None):
+        """Write state and return the new version
+
+        If expected_version is given and doesn't match the stored version, nothing is
+        written and VersionConflict is raised.
+        """
+        payload = json.dumps(state)
+        with self._lock:
+            entry = self._entries.get(key)
+            current_version = entry[0] if entry and entry[1] >= time.time() else 0
+            if expected_version is not None and expected_version != current_version:
+                raise VersionConflict(f"{key}: expected version {expected_version}, found {current_version}")
+            new_version = current_version + 1
+            now = time.time()
+            self._entries[key] = (new_version, now + self.ttl, payload)
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                # Expired entries are otherwise only dropped when read again
+                for stale in [k for k, (_, expires_at, _) in self._entries.items() if expires_at < now]:
+                    del self._entries[stale]
+        return new_version
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class SqliteStateStore:
+    """Store in a local SQLite file, shared by every worker process on the host"""
+
+    PRUNE_EVERY = 500  # writes between sweeps of expired entries
+
+    def __init__(self, path, ttl=6 * 60 * 60):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS state "
+            "(key TEXT PRIMARY KEY, version INTEGER NOT NULL, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT version, expires_at, payload FROM state WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None, 0
+        return json.loads(row[2]), row[0]
+
+    def put(self, key, state, expected_version=None):
+        payload = json.dumps(state)
+        now = time.time()
+        conn = self._connect()
+        # BEGIN IMMEDIATE takes the write lock up front, so read-compare-write is atomic
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT version, expires_at FROM state WHERE key = ?", (key,)).fetchone()
+            current_version = row[0] if row and row[1] >= now else 0
+            if expected_version is not None and expected_version != current_version:
+                raise VersionConflict(f"{key}: expected version {expected_version}, found {current_version}")
+            new_version = current_version + 1
+            conn.execute(
+                "INSERT OR REPLACE INTO state (key, version, expires_at, payload) VALUES (?, ?, ?, ?)",
+                (key, new_version, now + self.ttl, payload),
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM state WHERE expires_at < ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return new_version
+
+    def delete(self, key):
+        self._connect().execute("DELETE FROM state WHERE key = ?", (key,))
+
+
+class RedisStateStore:
+    """Store in Redis, shared by every node; versions are checked under WATCH / MULTI"""
+
+    def __init__(self, url, ttl=6 * 60 * 60):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("STATE_STORE=redis://... needs the redis package (pip install redis)")
+        self._redis = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self.ttl = ttl
+
+    def get(self, key):
+        version, payload = self._redis.hmget(key, "version", "payload")
+        if payload is None:
+            return None, 0
+        return json.loads(payload), int(version)
+
+    def put(self, key, state, expected_version=None):
+        payload = json.dumps(state)
+        with self._redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    version = pipe.hget(key, "version")
+                    current_version = int(version) if version else 0
+                    if expected_version is not None and expected_version != current_version:
+                        pipe.unwatch()
+                        raise VersionConflict(f"{key}: expected version {expected_version}, found {current_version}")
+                    pipe.multi()
+                    pipe.hset(key, mapping={"version": current_version + 1, "payload": payload})
+                    pipe.expire(key, int(self.ttl))
+                    pipe.execute()
+                    return current_version + 1
+                except self._watch_error:
+                    # Someone wrote between WATCH and EXEC: a conflict if the caller
+                    # pinned a version, otherwise just try again on the new one
+                    if expected_version is not None:
+                        raise VersionConflict(f"{key}: written concurrently")
+
+    def delete(self, key):
+        self._redis.delete(key)
+
+
+def load_state_store(url=None, ttl=6 * 60 * 60):
+    """Build a store from a STATE_STORE-style url (memory, sqlite:///path, redis://...)"""
+    url = url or os.environ.get("STATE_STORE", "memory")
+    if url == "memory":
+        return MemoryStateStore(ttl=ttl)
+    if url.startswith("sqlite:///"):
+        return SqliteStateStore(url[len("sqlite:///"):], ttl=ttl)
+    if url.startswith(("redis://", "rediss://")):
+        return RedisStateStore(url, ttl=ttl)
+    raise RuntimeError(f"Unsupported STATE_STORE '{url}' (use memory, sqlite:///path or redis://host:port/db)")
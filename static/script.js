@@ -177,6 +177,8 @@ function initializeSpeechRecognition() {
                 }
             }
         };
+    } else if (serverSpeechAvailable()) {
+        console.log('Browser speech recognition not supported, using server-side recognition');
     } else {
         console.log('Speech recognition not supported');
         document.addEventListener('DOMContentLoaded', function() {
@@ -199,6 +201,10 @@ function toggleVoiceInput() {
     console.log('toggleVoiceInput called, isListening:', isListening);
     
     if (!recognition) {
+        if (serverSpeechAvailable()) {
+            toggleServerVoiceInput();
+            return;
+        }
         alert('Voice recognition is not supported in your browser. Please use Chrome, Edge, or Safari.');
         return;
     }
@@ -276,6 +282,138 @@ function toggleVoiceInput() {
     }
 }
 
+// Server-side Speech Recognition
+// Used when the browser has no Web Speech API: streams 16 kHz mono PCM over the
+// interview channel and shows partial transcripts as they come back. When the
+// server asks us to pause, audio is held locally until it says resume.
+const SERVER_AUDIO_SAMPLE_RATE = 16000;
+let serverAudio = null;
+let serverAudioPaused = false;
+let pendingAudio = [];
+
+function serverSpeechAvailable() {
+    return document.body.dataset.sttEnabled === 'true';
+}
+
+function toggleServerVoiceInput() {
+    if (isListening) {
+        stopServerVoiceInput();
+    } else {
+        startServerVoiceInput();
+    }
+}
+
+function downsampleToPcm16(samples, inputRate) {
+    const ratio = inputRate / SERVER_AUDIO_SAMPLE_RATE;
+    const length = Math.floor(samples.length / ratio);
+    const pcm = new Int16Array(length);
+    for (let i = 0; i < length; i++) {
+        const sample = Math.max(-1, Math.min(1, samples[Math.floor(i * ratio)]));
+        pcm[i] = sample < 0 ? sample * 0x8000 : sample * 0x7FFF;
+    }
+    return pcm.buffer;
+}
+
+function sendServerAudio(chunk) {
+    if (serverAudioPaused) {
+        pendingAudio.push(chunk);
+    } else if (channelReady()) {
+        interviewSocket.send(chunk);
+    }
+}
+
+function flushPendingAudio() {
+    while (pendingAudio.length > 0 && channelReady()) {
+        interviewSocket.send(pendingAudio.shift());
+    }
+}
+
+async function startServerVoiceInput() {
+    const voiceBtn = document.getElementById('voiceBtn');
+    const userInput = document.getElementById('userInput');
+    
+    if (!channelReady()) {
+        alert('Voice input is still connecting. Please try again in a moment.');
+        return;
+    }
+    
+    let stream;
+    try {
+        stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+    } catch (err) {
+        console.error('Microphone access denied:', err);
+        alert('Microphone access is required for voice input. Please allow microphone access and try again.');
+        return;
+    }
+    
+    voiceBaseText = userInput.value.trim();
+    if (voiceBaseText && !voiceBaseText.endsWith(' ')) {
+        voiceBaseText += ' ';
+    }
+    serverAudioPaused = false;
+    pendingAudio = [];
+    interviewSocket.send(JSON.stringify({ type: 'audio_start', sample_rate: SERVER_AUDIO_SAMPLE_RATE }));
+    
+    const AudioContextClass = window.AudioContext || window.webkitAudioContext;
+    const context = new AudioContextClass();
+    const source = context.createMediaStreamSource(stream);
+    const processor = context.createScriptProcessor(4096, 1, 1);
+    processor.onaudioprocess = function(event) {
+        sendServerAudio(downsampleToPcm16(event.inputBuffer.getChannelData(0), context.sampleRate));
+    };
+    source.connect(processor);
+    processor.connect(context.destination);
+    
+    serverAudio = { context: context, source: source, processor: processor, stream: stream };
+    isListening = true;
+    voiceBtn.classList.add('listening');
+    userInput.placeholder = 'Listening... Speak now!';
+}
+
+function stopServerVoiceInput() {
+    const voiceBtn = document.getElementById('voiceBtn');
+    isListening = false;
+    voiceBtn.classList.remove('listening');
+    
+    if (serverAudio) {
+        serverAudio.processor.disconnect();
+        serverAudio.source.disconnect();
+        serverAudio.stream.getTracks().forEach(track => track.stop());
+        serverAudio.context.close();
+        serverAudio = null;
+    }
+    
+    if (channelReady()) {
+        serverAudioPaused = false;
+        flushPendingAudio();
+        // The server submits the final transcript as the answer
+        interviewSocket.send(JSON.stringify({ type: 'audio_stop', submit: true, prefix: voiceBaseText.trim() }));
+        showLoading(true);
+    }
+}
+
+function handleTranscriptMessage(message) {
+    const userInput = document.getElementById('userInput');
+    
+    if (!message.final) {
+        userInput.value = (voiceBaseText + message.text).trim();
+        updateCharCount();
+        userInput.scrollTop = userInput.scrollHeight;
+        return;
+    }
+    
+    userInput.value = '';
+    updateCharCount();
+    userInput.placeholder = 'Type your answer here...';
+    if (message.text) {
+        const answer = (voiceBaseText + message.text).trim();
+        addMessageToChat('user', answer);
+        document.getElementById('sendBtn').disabled = true;
+    } else {
+        showLoading(false);
+    }
+}
+
 function updateCharCount() {
     const userInput = document.getElementById('userInput');
     const charCount = document.getElementById('charCount');
@@ -338,13 +476,16 @@ async function startInterview(role, persona = 'neutral') {
     document.getElementById('personaSelection').style.display = 'none';
     showLoading(true);
     
+    // Links sent to bulk-ingested candidates carry ?candidate=<candidate_id>
+    const candidateId = new URLSearchParams(window.location.search).get('candidate');
+    
     try {
         const response = await fetch('/start_interview', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
-            body: JSON.stringify({ role: role, persona: persona })
+            body: JSON.stringify({ role: role, persona: persona, candidate_id: candidateId })
         });
 
         const data = await response.json();
@@ -355,6 +496,7 @@ async function startInterview(role, persona = 'neutral') {
             updateQuestionCounter(data.question_count, data.total_questions || 6);
             
             addMessageToChat('assistant', data.question);
+            connectInterviewChannel();
             
             // Show voice tooltip on interview start
             showVoiceTooltip();
@@ -394,6 +536,13 @@ async function sendResponse() {
     sendBtn.disabled = true;
     showLoading(true);
     
+    // Prefer the live channel; the reply arrives through handleChannelMessage
+    if (channelReady()) {
+        channelTurnPending = true;
+        interviewSocket.send(JSON.stringify({ type: 'answer', response: response }));
+        return;
+    }
+    
     try {
         const apiResponse = await fetch('/send_response', {
             method: 'POST',
@@ -407,26 +556,7 @@ async function sendResponse() {
         
         if (apiResponse.ok) {
             addMessageToChat('assistant', data.question);
-            // Ensure question_count and total_questions are valid numbers
-            const questionCount = data.question_count || 1;
-            const totalQuestions = data.total_questions || 6;
-            updateQuestionCounter(questionCount, totalQuestions);
-            
-            // Check if interview is completed (from backend or from AI's message)
-            const isCompleted = data.is_completed || checkIfInterviewConcluded(data.question);
-            
-            // Also check if we've reached the goal count
-            const reachedGoal = questionCount >= totalQuestions;
-            
-            if (isCompleted || reachedGoal) {
-                interviewCompleted = true;
-                // Disable input immediately when interview is completed
-                disableInterviewInput();
-                // Show feedback prompt after a short delay
-                setTimeout(() => {
-                    showFeedbackPrompt();
-                }, 2000);
-            }
+            handleTurnResult(data);
         } else {
             alert('Error: ' + (data.error || 'Failed to send response'));
         }
@@ -439,6 +569,138 @@ async function sendResponse() {
     }
 }
 
+function handleTurnResult(data) {
+    // Ensure question_count and total_questions are valid numbers
+    const questionCount = data.question_count || 1;
+    const totalQuestions = data.total_questions || 6;
+    updateQuestionCounter(questionCount, totalQuestions);
+    
+    // Check if interview is completed (from backend or from AI's message)
+    const isCompleted = data.is_completed || checkIfInterviewConcluded(data.question);
+    
+    // Also check if we've reached the goal count
+    const reachedGoal = questionCount >= totalQuestions;
+    
+    if (isCompleted || reachedGoal) {
+        interviewCompleted = true;
+        // Disable input immediately when interview is completed
+        disableInterviewInput();
+        // Show feedback prompt after a short delay
+        setTimeout(() => {
+            showFeedbackPrompt();
+        }, 2000);
+    }
+}
+
+// Live Interview Channel (WebSocket)
+// One connection per interview carries answers, streamed interviewer tokens,
+// score updates and completion. Falls back to /send_response when unavailable.
+let interviewSocket = null;
+let streamingBubble = null;
+let channelTurnPending = false;
+
+function connectInterviewChannel() {
+    if (document.body.dataset.wsEnabled !== 'true' || !('WebSocket' in window)) {
+        return;
+    }
+    
+    closeInterviewChannel();
+    const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+    const socket = new WebSocket(`${protocol}//${window.location.host}/ws/interview`);
+    
+    socket.onmessage = function(event) {
+        handleChannelMessage(JSON.parse(event.data));
+    };
+    socket.onclose = function() {
+        if (interviewSocket === socket) {
+            interviewSocket = null;
+        }
+        // Dropped mid-turn: the reply will never arrive, so let the user send again
+        // (the next answer goes over HTTP until a new channel is opened)
+        if (channelTurnPending) {
+            channelTurnPending = false;
+            streamingBubble = null;
+            showLoading(false);
+            const sendBtn = document.getElementById('sendBtn');
+            if (sendBtn && !interviewCompleted) {
+                sendBtn.disabled = false;
+            }
+            alert('Connection lost - please send your answer again.');
+        }
+    };
+    socket.onerror = function(error) {
+        console.error('Interview channel error:', error);
+    };
+    
+    interviewSocket = socket;
+}
+
+function closeInterviewChannel() {
+    if (interviewSocket) {
+        const socket = interviewSocket;
+        interviewSocket = null;
+        socket.close();
+    }
+}
+
+function channelReady() {
+    return interviewSocket !== null && interviewSocket.readyState === WebSocket.OPEN;
+}
+
+function handleChannelMessage(message) {
+    const sendBtn = document.getElementById('sendBtn');
+    
+    switch (message.type) {
+        case 'score':
+            console.log('Answer scored:', message.performance_score, 'running average:', message.average_score);
+            break;
+        case 'token':
+            if (!streamingBubble) {
+                showLoading(false);
+                streamingBubble = addMessageToChat('assistant', '');
+            }
+            streamingBubble.textContent += message.text;
+            scrollChatToBottom();
+            break;
+        case 'question':
+            // The final text may include a closing line added server-side
+            if (streamingBubble) {
+                streamingBubble.textContent = message.question;
+            } else {
+                addMessageToChat('assistant', message.question);
+            }
+            streamingBubble = null;
+            channelTurnPending = false;
+            showLoading(false);
+            sendBtn.disabled = false;
+            handleTurnResult(message);
+            break;
+        case 'partial':
+            handleTranscriptMessage(message);
+            break;
+        case 'transcript':
+            handleTranscriptMessage(message);
+            break;
+        case 'pause':
+            serverAudioPaused = true;
+            break;
+        case 'resume':
+            serverAudioPaused = false;
+            flushPendingAudio();
+            break;
+        case 'completed':
+            closeInterviewChannel();
+            break;
+        case 'error':
+            streamingBubble = null;
+            channelTurnPending = false;
+            showLoading(false);
+            sendBtn.disabled = false;
+            alert('Error: ' + (message.error || 'Failed to send response'));
+            break;
+    }
+}
+
 function addMessageToChat(role, content) {
     const messagesContainer = document.getElementById('messages');
     const messageDiv = document.createElement('div');
@@ -457,6 +719,11 @@ function addMessageToChat(role, content) {
     
     messagesContainer.appendChild(messageDiv);
     
+    scrollChatToBottom();
+    return bubble;
+}
+
+function scrollChatToBottom() {
     const chatContainer = document.getElementById('chatContainer');
     chatContainer.scrollTop = chatContainer.scrollHeight;
 }
@@ -509,6 +776,7 @@ function disableInterviewInput() {
 }
 
 async function getFeedback() {
+    closeInterviewChannel();
     showLoading(true);
     
     try {
@@ -524,6 +792,9 @@ async function getFeedback() {
         if (response.ok) {
             currentFeedback = data; // Store feedback for download
             displayFeedback(data);
+            const hasReport = Boolean(data.report_id);
+            document.getElementById('reportFormat').style.display = hasReport ? '' : 'none';
+            document.getElementById('shareReportBtn').style.display = hasReport ? '' : 'none';
             document.getElementById('interviewContainer').style.display = 'none';
             document.getElementById('feedbackContainer').style.display = 'block';
         } else {
@@ -998,12 +1269,23 @@ function updateQuestionCounter(current, total) {
     }
 }
 
+function reportUrl(format) {
+    return `/reports/${currentFeedback.report_id}.${format}`;
+}
+
 function downloadFeedback() {
     if (!currentFeedback) {
         alert('No feedback available to download.');
         return;
     }
 
+    // Rendered and cached server-side; the plain-text export below is the fallback
+    if (currentFeedback.report_id) {
+        const format = document.getElementById('reportFormat').value;
+        window.location.href = reportUrl(format) + '?download=1';
+        return;
+    }
+
     const feedback = currentFeedback;
     const roleTitle = document.getElementById('roleTitle') ? document.getElementById('roleTitle').textContent.replace(' Interview', '') : 'Interview';
     
@@ -1079,3 +1361,18 @@ function downloadFeedback() {
     window.URL.revokeObjectURL(url);
 }
 
+async function copyReportLink() {
+    if (!currentFeedback || !currentFeedback.report_id) {
+        alert('No shareable report available.');
+        return;
+    }
+
+    const format = document.getElementById('reportFormat').value;
+    const link = window.location.origin + reportUrl(format);
+    try {
+        await navigator.clipboard.writeText(link);
+        alert('Share link copied to clipboard.');
+    } catch (error) {
+        prompt('Copy this share link:', link);
+    }
+}